@@ -0,0 +1,82 @@
+import os
+import pickle
+import tempfile
+import unittest
+import numpy as np
+from utils.cache import Memo, ResultCache, get_digest
+
+
+class TestResultCache(unittest.TestCase):
+    """
+    Test suite for the cache of results.
+    """
+
+    def test_get_digest(self):
+        """
+        Tests that the digest ignores the order of the keys.
+        """
+        self.assertEqual(
+            get_digest({"seed": 1, "arguments": {"a": 1.0, "b": 2.0}}),
+            get_digest({"arguments": {"b": 2.0, "a": 1.0}, "seed": 1}),
+        )
+        self.assertNotEqual(get_digest({"seed": 1}), get_digest({"seed": 2}))
+
+    def test_memory(self):
+        """
+        Tests for the memory tier.
+        """
+        cache = ResultCache(1)
+        cache.put("a", {"Mean": 1.0})
+        self.assertEqual(cache.get("a"), {"Mean": 1.0})
+        cache.put("b", {"Mean": 2.0})
+        self.assertIsNone(cache.get("a"))
+        self.assertFalse(ResultCache(0).enabled)
+
+    def test_disk(self):
+        """
+        Tests for the disk tier.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            cache = ResultCache(1, folder, max_files=2)
+            cache.put("a", {"individual_x": np.array([1.0, 2.0])})
+            cache.put("b", {"Mean": 2.0})
+            # It should read the results evicted from memory from the disk.
+            np.testing.assert_array_equal(
+                cache.get("a")["individual_x"], np.array([1.0, 2.0])
+            )
+            self.assertEqual(ResultCache(1, folder).get("b"), {"Mean": 2.0})
+            cache.put("c", {"Mean": 3.0})
+            self.assertEqual(len(os.listdir(folder)), 2)
+            self.assertIsNone(ResultCache(0, folder).get("missing"))
+
+    def test_memo(self):
+        """
+        Tests for the memo of the problem functions.
+        """
+        calls = []
+
+        def function(x):
+            """Sum of the solution."""
+            calls.append(x.tolist())
+            return float(np.sum(x))
+
+        memo = Memo(2)
+        memoized, [constraint] = memo.memoize(function, [lambda x: x[0] == 0])
+        self.assertEqual(memoized.__doc__, "Sum of the solution.")
+        # It should call the function once per solution.
+        self.assertEqual(memoized(np.array([0, 1])), 1.0)
+        self.assertEqual(memoized(np.array([0, 1])), 1.0)
+        self.assertEqual(calls, [[0, 1]])
+        # It should keep apart the functions and the types of the solutions.
+        self.assertTrue(constraint(np.array([0, 1])))
+        self.assertEqual(memoized(np.array([0.0, 1.0])), 1.0)
+        self.assertEqual(memo.stats(), {"size": 2, "hits": 1, "misses": 3})
+        # It should evict the least recently used solution.
+        memoized(np.array([0, 1]))
+        self.assertEqual(len(calls), 3)
+        # It should be copied to the worker processes.
+        memoized, _ = Memo(2).memoize(np.sum, [])
+        memoized(np.array([0, 1]))
+        copy = pickle.loads(pickle.dumps(memoized))
+        self.assertEqual(copy(np.array([0, 1])), 1)
+        self.assertEqual(copy.memo.stats(), {"size": 1, "hits": 1, "misses": 1})
@@ -0,0 +1,178 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from collections import namedtuple
+import services.evolutionary as ev_utils
+import services.execution as execution
+from services.checkpoints import Checkpoint, ExecutionCheckpoint
+from pyristic.heuristic import SimulatedAnnealing
+
+
+class Interrupted(Exception):
+    """
+    Exception that simulates a restart of the service.
+    """
+
+
+def interrupt(optimizer, method_name, calls):
+    """
+    Raise Interrupted when the method is called more than calls times.
+    """
+    method = getattr(optimizer, method_name)
+    counter = [0]
+
+    def wrapper(*args, **kwargs):
+        counter[0] += 1
+        if counter[0] > calls:
+            raise Interrupted()
+        return method(*args, **kwargs)
+
+    setattr(optimizer, method_name, wrapper)
+
+
+class RandomOptimizer:
+    """
+    Picklable optimizer that returns a random solution.
+    """
+
+    def __init__(self):
+        self.logger = {"best_individual": None, "best_f": None}
+
+    def optimize(self, size=3):
+        self.logger["best_individual"] = np.random.rand(int(size))
+        self.logger["best_f"] = float(self.logger["best_individual"].sum())
+
+
+class TestCheckpoints(unittest.TestCase):
+    """
+    Test suite for checkpoints file.
+    """
+
+    method = namedtuple("method", ["operator_name", "parameters"])
+
+    def test_resume_evolutionary(self):
+        """
+        Tests that a resumed evolutionary execution finds the same solution.
+        """
+        config = {
+            "crossover_operator": self.method("IntermediateCrossover", [0.5]),
+            "mutation_operator": self.method("UniformMutator", [-3, 3]),
+            "survivor_selector": self.method("MergeSelector", []),
+            "setter_invalid_solution": self.method("ContinuosFixer", [-3, 3]),
+            "parent_selector": self.method("TournamentSampler", [3, 0.5]),
+        }
+
+        def create_algorithm():
+            return ev_utils.Genetic(
+                function=lambda x: float(np.sum(x**2)),
+                decision_variables=3,
+                constraints=[],
+                bounds=[-3, 3],
+                config=ev_utils.create_evolutionary_config("GA", config),
+            )
+
+        arguments = {"generations": 12, "size_population": 20, "verbose": False}
+        expected = execution.execute_once(create_algorithm(), [], arguments, 7)
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = ExecutionCheckpoint(os.path.join(folder, "0_0.state"), 0)
+            algorithm = create_algorithm()
+            interrupt(algorithm, "survivor_selection", 5)
+            with self.assertRaises(Interrupted):
+                execution.execute_once(
+                    algorithm, [], arguments, 7, checkpoint=checkpoint
+                )
+            # It should save the population of the last generation finished.
+            self.assertEqual(checkpoint.load()["generation"], 5)
+            self.assertEqual(checkpoint.load()["population_x"].shape, (20, 3))
+            # It should continue from the population and the random state saved.
+            result = execution.execute_once(
+                create_algorithm(), [], arguments, 7, checkpoint=checkpoint
+            )
+        np.testing.assert_array_equal(result["individual_x"], expected["individual_x"])
+        self.assertEqual(result["individual_f"], expected["individual_f"])
+        self.assertNotIn("initialize_population", vars(algorithm))
+
+    def test_resume_annealing(self):
+        """
+        Tests that a resumed simulated annealing execution finds the same solution.
+        """
+        distances = np.random.RandomState(0).randint(1, 100, (8, 8))
+
+        def function(x):
+            return float(sum(distances[x[i - 1], x[i]] for i in range(len(x))))
+
+        def neighbor_generator(x, **_):
+            neighbor = x.copy()
+            first, second = np.random.choice(len(x), 2, replace=False)
+            neighbor[first], neighbor[second] = x[second], x[first]
+            return neighbor
+
+        arguments = {"initial_temperature": 100, "eps": 0.01, "verbose": False}
+        expected = execution.execute_once(
+            SimulatedAnnealing(function, [], neighbor_generator),
+            [np.arange(8)],
+            arguments,
+            7,
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = ExecutionCheckpoint(os.path.join(folder, "0_0.state"), 0)
+            algorithm = SimulatedAnnealing(function, [], neighbor_generator)
+            interrupt(algorithm, "get_neighbor", 300)
+            with self.assertRaises(Interrupted):
+                execution.execute_once(
+                    algorithm, [np.arange(8)], arguments, 7, checkpoint=checkpoint
+                )
+            # It should save the temperature reached.
+            self.assertLess(checkpoint.load()["temperature"], 100)
+            result = execution.execute_once(
+                SimulatedAnnealing(function, [], neighbor_generator),
+                [np.arange(8)],
+                arguments,
+                7,
+                checkpoint=checkpoint,
+            )
+        np.testing.assert_array_equal(result["individual_x"], expected["individual_x"])
+        self.assertEqual(result["individual_f"], expected["individual_f"])
+
+    def test_checkpoint(self):
+        """
+        Tests for the executions saved in the checkpoint folder.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            checkpoint = Checkpoint(folder, 0)
+            checkpoint.save_request({"algorithm": "SA"})
+            self.assertEqual(checkpoint.load_request(), {"algorithm": "SA"})
+            self.assertIsNone(Checkpoint(os.path.join(folder, "x")).load_request())
+            # It should forget the state of an execution when it finishes.
+            state_path = checkpoint.get_execution(0, 1).file_path
+            with open(state_path, "wb"):
+                pass
+            checkpoint.save_result(0, 1, {"individual_f": 1.0})
+            self.assertFalse(os.path.exists(state_path))
+            self.assertEqual(checkpoint.load_results(), {(0, 1): {"individual_f": 1.0}})
+            # It should keep the finished executions without repeating them.
+            saved = execution.execute_once(RandomOptimizer(), [], {"size": 3}, 1)
+            saved["individual_f"] = -1.0
+            for workers in [1, 2]:
+                checkpoint = Checkpoint(os.path.join(folder, str(workers)), 0)
+                os.makedirs(checkpoint.folder)
+                checkpoint.save_result(0, 1, saved)
+                completed = []
+                statistics = execution.run_executions(
+                    RandomOptimizer(),
+                    3,
+                    [],
+                    {"size": 3},
+                    seed=1,
+                    workers=workers,
+                    on_execution=completed.append,
+                    checkpoint=checkpoint,
+                )
+                self.assertEqual(len(completed), 3)
+                self.assertEqual(statistics["Best solution"]["f"], -1.0)
+                self.assertEqual(len(checkpoint.load_results()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
@@ -1,4 +1,5 @@
 import unittest
+import numpy as np
 from unittest.mock import patch
 from collections import namedtuple
 import services.evolutionary as ev_utils
@@ -152,6 +153,192 @@ class TestEvolutionary(unittest.TestCase):
         with self.assertRaises(Exception):
             ev_utils.create_evolutionary_algorithm("EP", evolutive_programming_config)
 
+    def test_create_memoized_algorithm(self):
+        """
+        Tests for the memo of the evolutionary algorithms.
+        """
+        problem = {
+            "function": np.sum,
+            "constraints": [],
+            "decision_variables": 2,
+            "bounds": [-1, 1],
+        }
+        # It should memoize the objective when the memo size is positive.
+        algorithm = ev_utils.create_memoized_algorithm(
+            ev_utils.Genetic, memo_size=4, **problem
+        )
+        self.assertEqual(algorithm.memo.max_size, 4)
+
+        # It should not create the memo when it is turned off.
+        algorithm = ev_utils.create_memoized_algorithm(
+            ev_utils.Genetic, memo_size=0, **problem
+        )
+        self.assertFalse(hasattr(algorithm, "memo"))
+        self.assertIs(algorithm.aptitude_function, np.sum)
+
+    def test_evolutionary_cache(self):
+        """
+        Tests for the cache of configurations.
+        """
+        config = {
+            "mutation_operator": self.method("SigmaMutator", []),
+            "survivor_selector": self.method("MergeSelector", []),
+            "setter_invalid_solution": self.method("ContinuosFixer", [-1, 1]),
+            "adaptive_mutation_operator": self.method(
+                "SigmaEpAdaptiveMutator", [3, 0.5]
+            ),
+        }
+        # It should return a new configuration that shares the cached operators.
+        first_config = ev_utils.create_evolutionary_config("EP", config)
+        second_config = ev_utils.create_evolutionary_config("EP", config)
+        self.assertIsNot(first_config, second_config)
+        self.assertIs(
+            first_config.methods["mutation_operator"],
+            second_config.methods["mutation_operator"],
+        )
+
+        # It should build another configuration when the parameters change.
+        config["adaptive_mutation_operator"] = self.method(
+            "SigmaEpAdaptiveMutator", [3, 0.7]
+        )
+        third_config = ev_utils.create_evolutionary_config("EP", config)
+        self.assertIsNot(
+            first_config.methods["adaptive_mutation_operator"],
+            third_config.methods["adaptive_mutation_operator"],
+        )
+
+        # It should evict the least recently used entry and the invalidated ones.
+        cache = ev_utils.LRUCache(2)
+        cache.put("a", 1, tags=[("first", "function")])
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3, tags=[("second", "function")])
+        self.assertEqual(cache.get("b"), None)
+        ev_utils.LRUCache.invalidate_all(("first", "function"))
+        self.assertEqual(cache.get("a"), None)
+        # It should keep the entries of the other namespaces.
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_batch_evaluator(self):
+        """
+        Tests for the batch evaluation of the populations.
+        """
+        config = {
+            "crossover_operator": self.method("IntermediateCrossover", [0.5]),
+            "mutation_operator": self.method("UniformMutator", [-3, 3]),
+            "survivor_selector": self.method("MergeSelector", []),
+            "setter_invalid_solution": self.method("ContinuosFixer", [-1, 1]),
+            "parent_selector": self.method("TournamentSampler", [3, 0.5]),
+        }
+        problem = {"decision_variables": 2, "bounds": [-3, 3]}
+        calls = []
+
+        def batch_function(population):
+            calls.append(len(population))
+            return np.sum(population**2, axis=1)
+
+        def inside_bounds(individual):
+            return bool(np.all(np.abs(individual) <= 1))
+
+        # It should find the same solution that the evaluation by individual.
+        results = []
+        for algorithm in [
+            ev_utils.Genetic(
+                function=lambda x: np.sum(x**2),
+                constraints=[inside_bounds],
+                config=ev_utils.create_evolutionary_config("GA", config),
+                **problem,
+            ),
+            ev_utils.create_batch_algorithm(
+                ev_utils.Genetic,
+                ev_utils.BatchEvaluator(batch_function, [inside_bounds]),
+                config=ev_utils.create_evolutionary_config("GA", config),
+                **problem,
+            ),
+        ]:
+            np.random.seed(3)
+            algorithm.optimize(5, 10, verbose=False)
+            results.append(algorithm.logger)
+        np.testing.assert_array_equal(
+            results[0]["best_individual"], results[1]["best_individual"]
+        )
+        self.assertEqual(results[0]["best_f"], results[1]["best_f"])
+        # It should call the function once per population.
+        self.assertEqual(len(calls), 6)
+        self.assertEqual(calls[0], 10)
+
+        # It should evaluate the constraints with the whole population.
+        evaluator = ev_utils.BatchEvaluator(
+            batch_function,
+            [lambda population: population[:, 0] > 0, inside_bounds],
+        )
+        population = np.array([[0.5, 0.5], [-0.5, 0.5], [0.5, 2.0]])
+        np.testing.assert_array_equal(
+            evaluator.is_valid(population), [True, False, False]
+        )
+
+        # It should fail when the function doesn't return a value per individual.
+        algorithm = ev_utils.create_batch_algorithm(
+            ev_utils.Genetic,
+            ev_utils.BatchEvaluator(
+                lambda population: batch_function(population)[1:], [inside_bounds]
+            ),
+            config=ev_utils.create_evolutionary_config("GA", config),
+            **problem,
+        )
+        with self.assertRaisesRegex(ValueError, "9 values for a population of 10"):
+            algorithm.optimize(5, 10, verbose=False)
+
+        # It should evaluate a new population that starts before the last one ends.
+        evaluator = algorithm.evaluator = ev_utils.BatchEvaluator(batch_function, [])
+        evaluator.optimizer = algorithm
+        algorithm.logger = {"parent_population_x": population}
+        self.assertEqual(evaluator(population[0]), 0.5)
+        self.assertEqual(evaluator(population[1]), 0.5)
+        algorithm.logger = {"parent_population_x": population[::-1].copy()}
+        self.assertEqual(evaluator(algorithm.logger["parent_population_x"][0]), 4.25)
+        self.assertEqual(evaluator.position, 1)
+        evaluator.reset()
+        self.assertEqual(evaluator.position, 0)
+
+    def test_expand_combinations(self):
+        """
+        Tests for the expand_combinations function.
+        """
+        batch = ev_utils.EvolutionaryBatch(
+            arguments={"generations": 10, "size_population": 20},
+            methods={"mutation_operator": {"operator_name": "A", "parameters": []}},
+            grid={"size_population": [20, 40], "generations": [5, 10]},
+            combinations=[
+                {},
+                {
+                    "methods": {
+                        "mutation_operator": {"operator_name": "B", "parameters": []}
+                    }
+                },
+            ],
+        )
+        combinations = ev_utils.expand_combinations(batch)
+
+        # It should cross every combination with every point of the grid.
+        self.assertEqual(len(combinations), 8)
+        self.assertEqual(ev_utils.count_combinations(batch), 8)
+        self.assertEqual(
+            combinations[1]["arguments"], {"generations": 10, "size_population": 20}
+        )
+        self.assertEqual(
+            [c["methods"]["mutation_operator"].operator_name for c in combinations],
+            ["A"] * 4 + ["B"] * 4,
+        )
+
+        # It should keep the base arguments when there isn't grid.
+        batch.grid = {}
+        self.assertEqual(ev_utils.count_combinations(batch), 2)
+        self.assertEqual(
+            ev_utils.expand_combinations(batch)[0]["arguments"],
+            {"generations": 10, "size_population": 20},
+        )
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=3)
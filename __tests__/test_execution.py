@@ -0,0 +1,325 @@
+import pickle
+import logging
+import unittest
+import numpy as np
+from pyristic.heuristic.SimulatedAnnealing_search import SimulatedAnnealing
+from pyristic.utils import get_stats
+import services.execution as execution
+from utils.cache import Memo
+
+
+class RandomOptimizer:
+    """
+    Picklable optimizer that returns a random solution.
+    """
+
+    def __init__(self):
+        self.logger = {"best_individual": None, "best_f": None}
+
+    def optimize(self, size=3):
+        self.logger["best_individual"] = np.random.rand(int(size))
+        self.logger["best_f"] = float(self.logger["best_individual"].sum())
+
+
+class LoggingOptimizer(RandomOptimizer):
+    """
+    Picklable optimizer that logs every execution.
+    """
+
+    def optimize(self, size=3):
+        super().optimize(size)
+        logging.getLogger("test_worker").warning("Execution %s", self.logger["best_f"])
+
+
+class CoolingOptimizer(RandomOptimizer):
+    """
+    Picklable optimizer that updates the temperature every step.
+    """
+
+    def optimize(self, size=3):
+        self.logger["temperature"] = 1.0
+        for step in range(int(size)):
+            self.logger["best_f"] = 1.0 / (step + 1)
+            self.logger["temperature"] = self.update_temperature()
+
+    def update_temperature(self):
+        return self.logger["temperature"] * 0.5
+
+
+class GenerationsOptimizer(RandomOptimizer):
+    """
+    Picklable optimizer with the loop of the pyristic evolutionary algorithms.
+    """
+
+    def optimize(self, generations=10):
+        self.logger["current_iter"] = 0
+        self.logger["parent_population_x"] = np.zeros((2, 1))
+        self.logger["parent_population_f"] = np.array([10.0, 20.0])
+        for _ in range(int(generations)):
+            next_generation = self.survivor_selection()
+            self.logger["parent_population_x"] = next_generation["population"]
+            self.logger["parent_population_f"] = next_generation["parent_population_f"]
+            self.logger["current_iter"] += 1
+        index = np.argmin(self.logger["parent_population_f"])
+        self.logger["best_individual"] = self.logger["parent_population_x"][index]
+        self.logger["best_f"] = self.logger["parent_population_f"][index]
+
+    def survivor_selection(self):
+        # The aptitude improves during the first three generations.
+        best_f = 10.0 - min(self.logger["current_iter"] + 1, 3)
+        return {
+            "population": np.full((2, 1), float(self.logger["current_iter"] + 1)),
+            "parent_population_f": np.array([best_f, 20.0]),
+        }
+
+
+class AnnealingOptimizer(RandomOptimizer):
+    """
+    Picklable optimizer with the loop of the pyristic simulated annealing.
+    """
+
+    def optimize(self, eps=0.001):
+        self.logger["temperature"] = 1.0
+        self.logger["best_f"] = 1.0
+        self.logger["best_individual"] = np.zeros(1)
+        while self.logger["temperature"] >= eps:
+            self.logger["temperature"] = self.update_temperature()
+            self.logger["best_f"] = max(self.logger["best_f"] - 0.25, 0.5)
+
+    def update_temperature(self):
+        return self.logger["temperature"] * 0.5
+
+
+class MemoizedOptimizer(RandomOptimizer):
+    """
+    Picklable optimizer that revisits the same solutions.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.memo = Memo(10)
+        self.function, _ = self.memo.memoize(np.sum, [])
+
+    def optimize(self, size=3):
+        for value in [1, 1, int(size)]:
+            self.logger["best_individual"] = np.array([value])
+            self.logger["best_f"] = self.function(self.logger["best_individual"])
+
+
+class TestExecution(unittest.TestCase):
+    """
+    Test suite for execution file.
+    """
+
+    def test_run_executions(self):
+        """
+        Tests for the run_executions function.
+        """
+        # It should return the same keys that pyristic get_stats.
+        expected = get_stats(RandomOptimizer(), 4, [], {"size": 3}, verbose=True)
+        stats = execution.run_executions(RandomOptimizer(), 4, [], {"size": 3})
+        self.assertEqual(set(stats.keys()), set(expected.keys()))
+        self.assertEqual(len(stats["individual_f"]), 4)
+        self.assertEqual(stats["Best solution"]["f"], min(stats["individual_f"]))
+        self.assertEqual(stats["Worst solution"]["f"], max(stats["individual_f"]))
+
+        # It should return the same results with the same seed
+        # whatever the number of workers.
+        serial = execution.run_executions(
+            RandomOptimizer(), 4, [], {"size": 3}, seed=7, workers=1
+        )
+        parallel = execution.run_executions(
+            RandomOptimizer(), 4, [], {"size": 3}, seed=7, workers=2
+        )
+        self.assertEqual(serial["individual_f"], parallel["individual_f"])
+
+        # It should return different executions when the seed isn't provided.
+        stats = execution.run_executions(RandomOptimizer(), 2, [], {"size": 3})
+        self.assertNotEqual(stats["individual_f"][0], stats["individual_f"][1])
+
+        # It should omit the executions information when verbose is false.
+        stats = execution.run_executions(
+            RandomOptimizer(), 2, [], {"size": 3}, verbose=False
+        )
+        self.assertNotIn("individual_x", stats)
+
+    def test_worker_tasks(self):
+        """
+        Tests for the tasks kept by the workers.
+        """
+        task_key = ("test", 0)
+        execution.WORKER_TASKS.clear()
+        # It should ask for the payload when the worker doesn't have the task.
+        with self.assertRaises(execution.WorkerTaskMissing):
+            execution.get_worker_task(task_key, None, None)
+
+        # It should keep the task to run it without the payload.
+        payload = pickle.dumps((RandomOptimizer(), [], {"size": 3}))
+        task = execution.get_worker_task(task_key, None, payload)
+        self.assertIs(execution.get_worker_task(task_key, None, None), task)
+        execution.WORKER_TASKS.clear()
+
+    def test_worker_logs(self):
+        """
+        Tests for the records logged in the workers.
+        """
+        # It should handle the records of the workers with the loggers of the parent.
+        with self.assertLogs("test_worker", level="WARNING") as logs:
+            stats = execution.run_executions(
+                LoggingOptimizer(), 3, [], {"size": 3}, workers=2
+            )
+            execution.stop_worker_pool()
+        self.assertEqual(
+            sorted(logs.output),
+            sorted(f"WARNING:test_worker:Execution {f}" for f in stats["individual_f"]),
+        )
+
+    def test_progress(self):
+        """
+        Tests for the progress events.
+        """
+        # It should report every step when there isn't interval.
+        optimizer = CoolingOptimizer()
+        events = []
+        reporter = execution.ProgressReporter(1, events.append, interval=0)
+        with execution.report_progress(optimizer, reporter):
+            optimizer.optimize(size=3)
+        self.assertEqual([event["step"] for event in events], [1, 2, 3])
+        self.assertEqual(events[-1]["best_f"], 1 / 3)
+        self.assertEqual(events[-1]["execution"], 1)
+        self.assertNotIn("update_temperature", vars(optimizer))
+
+        # It should send the last event of every execution with any number of workers.
+        for workers in [1, 2]:
+            events = []
+            stats = execution.run_executions(
+                CoolingOptimizer(),
+                3,
+                [],
+                {"size": 4},
+                workers=workers,
+                on_progress=events.append,
+            )
+            last_events = [event for event in events if event["step"] == 4]
+            self.assertEqual(
+                sorted(event["execution"] for event in last_events), [0, 1, 2]
+            )
+            self.assertEqual(stats["Best solution"]["f"], 0.25)
+
+    def test_run_batch_executions(self):
+        """
+        Tests for the run_batch_executions function.
+        """
+        tasks = [
+            (RandomOptimizer(), [], {"size": 3}),
+            (CoolingOptimizer(), [], {"size": 2}),
+        ]
+        single = execution.run_executions(RandomOptimizer(), 3, [], {"size": 3}, seed=5)
+
+        # It should return every task with the same results that a single run.
+        for workers in [1, 3]:
+            results = dict(
+                execution.run_batch_executions(tasks, 3, seed=5, workers=workers)
+            )
+            self.assertEqual(sorted(results), [0, 1])
+            self.assertEqual(results[0]["individual_f"], single["individual_f"])
+            self.assertEqual(results[1]["Best solution"]["f"], 0.5)
+
+    def test_stopping(self):
+        """
+        Tests for the stopping criteria of the executions.
+        """
+        optimizer = GenerationsOptimizer()
+        # Without criteria the executions don't include the reason.
+        result = execution.execute_once(optimizer, [], {"generations": 10}, 1)
+        self.assertNotIn("stop_reason", result)
+        self.assertEqual(optimizer.logger["current_iter"], 10)
+        # The target value stops in the generation that reaches it.
+        result = execution.execute_once(
+            optimizer, [], {"generations": 10}, 1, stopping={"target_value": 8.0}
+        )
+        self.assertEqual(result["stop_reason"], "target_value")
+        self.assertEqual(result["individual_f"], 8.0)
+        self.assertEqual(optimizer.logger["current_iter"], 2)
+        self.assertEqual(result["individual_x"][0], 2.0)
+        self.assertNotIn("survivor_selection", vars(optimizer))
+        # The patience counts the generations without improving.
+        result = execution.execute_once(
+            optimizer, [], {"generations": 10}, 1, stopping={"patience": 2}
+        )
+        self.assertEqual(result["stop_reason"], "patience")
+        self.assertEqual(optimizer.logger["current_iter"], 5)
+        # The executions that end before the criteria are completed.
+        result = execution.execute_once(
+            optimizer, [], {"generations": 4}, 1, stopping={"patience": 5}
+        )
+        self.assertEqual(result["stop_reason"], "completed")
+        self.assertEqual(result["individual_f"], 7.0)
+        # The max time is checked every step.
+        result = execution.execute_once(
+            optimizer, [], {"generations": 10}, 1, stopping={"max_time": 1e-9}
+        )
+        self.assertEqual(result["stop_reason"], "max_time")
+        self.assertEqual(optimizer.logger["current_iter"], 1)
+        # Simulated annealing finishes its loop with the temperature.
+        optimizer = AnnealingOptimizer()
+        result = execution.execute_once(optimizer, [], {}, 1, stopping={"patience": 2})
+        self.assertEqual(result["stop_reason"], "patience")
+        self.assertEqual(result["individual_f"], 0.5)
+        self.assertNotIn("update_temperature", vars(optimizer))
+        # Simulated annealing stops in the step that reaches the target value.
+        optimizer = SimulatedAnnealing(np.sum, [], lambda x: x - 1)
+        result = execution.execute_once(
+            optimizer,
+            [np.array([10.0]), 1.0, 1e-9],
+            {},
+            1,
+            stopping={"target_value": 5.0},
+        )
+        self.assertEqual(result["stop_reason"], "target_value")
+        self.assertEqual(result["individual_f"], 5.0)
+        self.assertIs(optimizer.function, np.sum)
+        # The max time is checked even when every neighbor is invalid.
+        optimizer = SimulatedAnnealing(np.sum, [lambda x: False], np.copy)
+        result = execution.execute_once(
+            optimizer, [np.array([10.0]), 1.0, 1e-9], {}, 1, stopping={"max_time": 0.01}
+        )
+        self.assertEqual(result["stop_reason"], "max_time")
+        self.assertEqual(result["individual_f"], 10.0)
+        self.assertNotIn("get_neighbor", vars(optimizer))
+        # The statistics include the reason of every execution.
+        for workers in [1, 2]:
+            statistics = execution.run_executions(
+                GenerationsOptimizer(),
+                3,
+                [],
+                {"generations": 10},
+                seed=1,
+                workers=workers,
+                stopping={"target_value": 9.0},
+            )
+            self.assertEqual(statistics["stop_reason"], ["target_value"] * 3)
+            self.assertEqual(statistics["Best solution"]["f"], 9.0)
+
+    def test_memo(self):
+        """
+        Tests for the memo stats of the executions.
+        """
+        optimizer = MemoizedOptimizer()
+        # It should include the hits and misses of every execution.
+        result = execution.execute_once(optimizer, [], {"size": 3}, 1)
+        self.assertEqual(result["memo"], {"hits": 1, "misses": 2})
+        result = execution.execute_once(optimizer, [], {"size": 3}, 1)
+        self.assertEqual(result["memo"], {"hits": 3, "misses": 0})
+        statistics = execution.compute_statistics(
+            [
+                {**result, "memo": {"hits": 1, "misses": 2}},
+                {**result, "memo": {"hits": 3, "misses": 0}},
+            ],
+            False,
+        )
+        self.assertEqual(statistics["memo"], {"hits": 4, "misses": 2})
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
@@ -0,0 +1,239 @@
+import io
+import os
+import pickle
+import zipfile
+import tempfile
+import unittest
+import threading
+import numpy as np
+from unittest.mock import patch
+import utils.generic as generic
+
+
+class TestModulesHandler(unittest.TestCase):
+    """
+    Test suite for the versioned modules.
+    """
+
+    def setUp(self):
+        self.storage = tempfile.TemporaryDirectory()
+        self.patcher = patch("utils.generic.LOCAL_FILE_STORAGE", self.storage.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.cleanup()
+
+    def test_create_file(self):
+        """
+        Tests for the create_file function.
+        """
+        # It should save the file and activate the module.
+        first_version = generic.create_file("function", ["X = 1\n", "Y = 2\n"])
+        self.assertTrue(os.path.exists(os.path.join(self.storage.name, "function.py")))
+        self.assertEqual(
+            generic.ModulesHandler().get_method_by_module("function", "Y"), 2
+        )
+
+        # It should reuse the compiled module when the content is the same.
+        module = generic.ModulesHandler.modules["default"]["function"][first_version]
+        self.assertEqual(
+            generic.create_file("function", "X = 1\nY = 2\n"), first_version
+        )
+        self.assertIs(
+            generic.ModulesHandler.modules["default"]["function"][first_version],
+            module,
+        )
+
+        # It should keep the version used by a snapshot after a new upload.
+        snapshot = generic.ModulesHandler().snapshot()
+        second_version = generic.create_file("function", "def f(x):\n\treturn x\n")
+        self.assertNotEqual(first_version, second_version)
+        self.assertEqual(snapshot.get_method_by_module("function", "X"), 1)
+        self.assertTrue(snapshot.has_method("function", "X"))
+        self.assertFalse(snapshot.has_method("function", "f"))
+        method = generic.ModulesHandler().get_method_by_module("function", "f")
+        self.assertEqual(pickle.loads(pickle.dumps(method))(3), 3)
+        versions = generic.ModulesHandler().list_versions()["function"]
+        self.assertEqual(versions["active"], second_version)
+
+        # It should keep the active version when the content can't be compiled.
+        with self.assertRaises(SyntaxError):
+            generic.create_file("function", "def f(x)) -> float:")
+        self.assertEqual(
+            generic.ModulesHandler().get_version("function"), second_version
+        )
+
+    def test_create_files(self):
+        """
+        Tests for the bundles of files activated together.
+        """
+        versions = generic.create_files(
+            {"function": ["X = 1\n"], "constraints": "Y = 2\n"}, "bundle"
+        )
+        modules = generic.ModulesHandler("bundle")
+        self.assertEqual(modules.get_version("constraints"), versions["constraints"])
+        self.assertEqual(modules.get_method_by_module("function", "X"), 1)
+
+        # It should keep every active version when a file can't be compiled.
+        with self.assertRaises(generic.BundleError) as context:
+            generic.create_files(
+                {
+                    "function": "X = 3\n",
+                    "constraints": "def broken(:\n",
+                    "search_space": "Z = 1 / 0\n",
+                },
+                "bundle",
+            )
+        self.assertEqual(
+            sorted(context.exception.errors), ["constraints", "search_space"]
+        )
+        self.assertTrue(
+            context.exception.errors["search_space"].startswith("ZeroDivisionError")
+        )
+        self.assertEqual(modules.get_method_by_module("function", "X"), 1)
+        self.assertEqual(len(generic.ModulesHandler.modules["bundle"]["function"]), 1)
+        self.assertIsNone(modules.get_version("search_space"))
+
+        # It should read the python files of a zip archive.
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("problem/function.py", "X = 4\n")
+            zip_file.writestr("notes.txt", "X = 5\n")
+        with self.assertRaises(generic.BundleError) as context:
+            generic.read_bundle_archive(archive.getvalue(), ["function"])
+        self.assertEqual(list(context.exception.errors), ["notes.txt"])
+        archive = io.BytesIO()
+        with zipfile.ZipFile(archive, "w") as zip_file:
+            zip_file.writestr("problem/function.py", "X = 4\n")
+        self.assertEqual(
+            generic.read_bundle_archive(archive.getvalue(), ["function"]),
+            {"function": "X = 4\n"},
+        )
+
+    def test_namespaces(self):
+        """
+        Tests for the isolation and eviction of the namespaces.
+        """
+        # It should keep the modules of every namespace apart.
+        generic.create_file("function", "X = 1\n", "first")
+        generic.create_file("function", "X = 2\n", "second")
+        self.assertEqual(
+            generic.ModulesHandler("first").get_method_by_module("function", "X"), 1
+        )
+        self.assertEqual(
+            generic.ModulesHandler("second").get_method_by_module("function", "X"), 2
+        )
+        self.assertTrue(
+            os.path.exists(
+                os.path.join(generic.get_storage_path("second"), "function.py")
+            )
+        )
+
+        # It should keep the idle namespaces while they are in use.
+        with generic.ModulesHandler("first").in_use():
+            generic.ModulesHandler.evict_idle_namespaces(idle_seconds=-1, interval=0)
+            self.assertIn("first", generic.ModulesHandler.modules)
+        self.assertNotIn("second", generic.ModulesHandler.modules)
+
+        # It should keep the files and compile them again when it is used.
+        self.assertTrue(os.path.exists(generic.get_storage_path("second")))
+        self.assertEqual(
+            generic.ModulesHandler("second").get_method_by_module("function", "X"), 2
+        )
+
+        # It should not scan the namespaces again before the interval.
+        generic.ModulesHandler.evict_idle_namespaces(idle_seconds=-1, interval=3600)
+        self.assertIn("first", generic.ModulesHandler.modules)
+
+        # It should remove the namespace once it is idle.
+        generic.ModulesHandler.evict_idle_namespaces(idle_seconds=-1, interval=0)
+        self.assertNotIn("first", generic.ModulesHandler.modules)
+
+        # It should make the other handlers wait until the namespace is loaded.
+        load_namespace = generic.ModulesHandler.load_namespace
+        started = threading.Event()
+        handlers = []
+
+        def slow_load(namespace):
+            started.set()
+            threading.Event().wait(0.2)
+            load_namespace(namespace)
+
+        with patch.object(
+            generic.ModulesHandler, "load_namespace", staticmethod(slow_load)
+        ):
+            loader = threading.Thread(
+                target=lambda: handlers.append(generic.ModulesHandler("second"))
+            )
+            loader.start()
+            started.wait()
+            self.assertEqual(
+                generic.ModulesHandler("second").get_method_by_module("function", "X"),
+                2,
+            )
+            loader.join()
+        self.assertEqual(handlers[0].get_method_by_module("function", "X"), 2)
+
+    def test_load_storage(self):
+        """
+        Tests for the modules loaded from the storage at startup.
+        """
+        namespace_path = os.path.join(self.storage.name, ".namespaces", "warm")
+        os.makedirs(namespace_path)
+        for file_name, content in [
+            ("function.py", "X = 5\n"),
+            ("constraints.py", "def broken(:\n"),
+            ("notes.txt", "X = 6\n"),
+        ]:
+            with open(
+                os.path.join(namespace_path, file_name), "w", encoding="utf-8"
+            ) as file:
+                file.write(content)
+        generic.ModulesHandler.load_storage()
+        modules = generic.ModulesHandler("warm")
+        self.assertEqual(modules.get_method_by_module("function", "X"), 5)
+        # It should skip the modules that can't be compiled and other files.
+        self.assertIsNone(modules.get_version("constraints"))
+        self.assertIsNone(modules.get_version("notes"))
+
+    def test_load_versions(self):
+        """
+        Tests for the versions loaded by the workers of the pool.
+        """
+        digest = generic.create_file("function", "X = 7\n", "worker")
+        snapshot = generic.ModulesHandler("worker").snapshot()
+        # It should compile the versions missing in the process from their files.
+        module = generic.ModulesHandler.modules["worker"]["function"].pop(digest)
+        generic.sys.modules.pop(module.__name__)
+        snapshot.load_versions()
+        self.assertEqual(snapshot.get_method_by_module("function", "X"), 7)
+        self.assertIn(module.__name__, generic.sys.modules)
+        # It should reuse the versions already compiled.
+        loaded = generic.ModulesHandler.modules["worker"]["function"][digest]
+        snapshot.load_versions()
+        self.assertIs(
+            generic.ModulesHandler.modules["worker"]["function"][digest], loaded
+        )
+
+
+class TestTransformValues(unittest.TestCase):
+    """
+    Test suite for the transform_values_dict function.
+    """
+
+    def test_transform_values_dict(self):
+        """
+        Tests for the conversion of the numpy objects.
+        """
+        # It should convert the nested arrays and scalars without modifying the input.
+        data = {"Mean": np.float64(0.5), "x": [np.arange(2)], "f": {"y": np.ones(1)}}
+        result = generic.transform_values_dict(data)
+        self.assertEqual(result, {"Mean": 0.5, "x": [[0.0, 1.0]], "f": {"y": [1.0]}})
+        self.assertIsInstance(result["Mean"], float)
+        self.assertIsInstance(result["x"][0][0], float)
+        self.assertIsInstance(data["f"]["y"], np.ndarray)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
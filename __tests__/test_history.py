@@ -0,0 +1,173 @@
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import services.execution as execution
+import services.jobs as jobs
+from services import history
+from pyristic.heuristic import SimulatedAnnealing
+
+
+def create_execution(individual_f, convergence):
+    """
+    Result of an execution traced.
+    """
+    return {
+        "execution_time": 1.0,
+        "individual_x": np.array([individual_f, 0.0]),
+        "individual_f": individual_f,
+        "convergence": np.array(convergence),
+    }
+
+
+class TestHistory(unittest.TestCase):
+    """
+    Test suite for the history of the optimizations.
+    """
+
+    def setUp(self):
+        self.storage = tempfile.TemporaryDirectory()
+        self.patcher = patch("services.history.HISTORY_FOLDER", self.storage.name)
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.cleanup()
+
+    def test_trace(self):
+        """
+        Tests for the convergence of a traced execution.
+        """
+        distances = np.random.RandomState(0).randint(1, 100, (6, 6))
+
+        def function(x):
+            return float(sum(distances[x[i - 1], x[i]] for i in range(len(x))))
+
+        def neighbor_generator(x, **_):
+            neighbor = x.copy()
+            first, second = np.random.choice(len(x), 2, replace=False)
+            neighbor[first], neighbor[second] = x[second], x[first]
+            return neighbor
+
+        arguments = {"initial_temperature": 10, "eps": 1, "verbose": False}
+        expected = execution.execute_once(
+            SimulatedAnnealing(function, [], neighbor_generator),
+            [np.arange(6)],
+            arguments,
+            3,
+        )
+        result = execution.execute_once(
+            SimulatedAnnealing(function, [], neighbor_generator),
+            [np.arange(6)],
+            arguments,
+            3,
+            trace=True,
+        )
+        # It should follow every step without changing the execution.
+        self.assertEqual(result["individual_f"], expected["individual_f"])
+        self.assertEqual(result["convergence"][-1], result["individual_f"])
+        self.assertTrue(np.all(np.diff(result["convergence"]) <= 0))
+
+    def test_record_options(self):
+        """
+        Tests for the runs saved without convergence.
+        """
+        request = {"algorithm": "SA", "num_executions": 2, "arguments": {}}
+        arguments = [np.array([10.0]), 1.0, 0.5]
+
+        # It should save the runs without convergence unless they are traced.
+        for trace, steps in [(False, 0), (True, 69)]:
+            execution.run_executions(
+                SimulatedAnnealing(np.sum, [], lambda x: x - 1),
+                2,
+                arguments,
+                {},
+                workers=1,
+                history=history.HistoryRecorder("default", {}, [request], "job"),
+                trace=trace,
+            )
+            runs = history.list_runs("default", limit=1)["runs"]
+            self.assertEqual(runs[0]["steps"], steps)
+
+        # It should save the responses answered from the cache.
+        statistics = execution.run_executions(
+            SimulatedAnnealing(np.sum, [], lambda x: x - 1), 2, arguments, {}, seed=3
+        )
+        with patch("services.jobs.HISTORY_FOLDER", self.storage.name), patch(
+            "services.jobs.HistoryRecorder", history.HistoryRecorder
+        ):
+            jobs.record_cached_run(
+                "default", jobs.ModulesHandler("default", {}), request, 3, statistics
+            )
+        run = history.list_runs("default", limit=1)["runs"][0]
+        self.assertIsNone(run["job_id"])
+        self.assertEqual(run["seed"], 3)
+        self.assertEqual(run["best_f"], statistics["Best solution"]["f"])
+        np.testing.assert_array_equal(
+            history.get_run_details("default", run["run_id"])["seeds"],
+            execution.get_execution_seeds(2, 3),
+        )
+
+    def test_record(self):
+        """
+        Tests for the runs saved, found and compared.
+        """
+        recorder = history.HistoryRecorder(
+            "default",
+            {"function": "a" * 64},
+            [
+                {"algorithm": "GA", "num_executions": 2, "arguments": {"g": 3.0}},
+                {"algorithm": "GA", "num_executions": 2, "arguments": {"g": 2.0}},
+            ],
+            "job",
+            7,
+        )
+        first = recorder.record(
+            0,
+            [create_execution(2.0, [4, 3, 2]), create_execution(1.0, [3, 1])],
+            [11, 12],
+            0.0,
+        )
+        second = recorder.record(
+            1,
+            [create_execution(3.0, [5, 3]), create_execution(4.0, [4, 4])],
+            [1, 2],
+            1.0,
+        )
+        runs = history.list_runs("default", order_by="best_f", descending=False)
+        self.assertEqual([run["run_id"] for run in runs["runs"]], [first, second])
+        self.assertEqual(runs["runs"][0]["arguments"], {"g": 3.0})
+        self.assertEqual(runs["runs"][0]["seed"], 7)
+        self.assertEqual(runs["runs"][0]["steps"], 3)
+        self.assertEqual(history.list_runs("default", max_best_f=1.5)["total"], 1)
+        self.assertEqual(history.list_runs("default", module="b" * 64)["total"], 0)
+        self.assertEqual(history.list_runs("other")["total"], 0)
+
+        details = history.get_run_details("default", first)
+        np.testing.assert_array_equal(details["seeds"], [11, 12])
+        np.testing.assert_array_equal(details["best_x"], [1.0, 0.0])
+        # It should fill with nan the steps that an execution didn't perform.
+        convergence = history.get_convergence("default", first, [1], start=1)
+        np.testing.assert_array_equal(convergence["steps"], [2, 3])
+        np.testing.assert_array_equal(convergence["convergence"], [[1.0, np.nan]])
+        with self.assertRaises(IndexError):
+            history.get_convergence("default", first, [2])
+
+        comparison = history.compare_runs("default", [first, second], 2)
+        self.assertEqual(comparison["runs"][0]["probability_better"], 0.5)
+        self.assertEqual(comparison["runs"][1]["probability_better"], 0.0)
+        np.testing.assert_array_equal(
+            comparison["runs"][0]["convergence"]["median"], [3.5, 2.0]
+        )
+
+        # It should forget the oldest runs when there are too many.
+        with patch("services.history.MAX_STORED_RUNS", 1):
+            history.forget_old_runs("default")
+        with self.assertRaises(KeyError):
+            history.get_run("default", first)
+        history.delete_run("default", second)
+        self.assertEqual(history.list_runs("default")["total"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
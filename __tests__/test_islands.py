@@ -0,0 +1,102 @@
+import unittest
+import numpy as np
+from collections import namedtuple
+import services.evolutionary as ev_utils
+import services.execution as execution
+import services.islands as islands
+
+
+def sphere(x):
+    """
+    Picklable objective of the islands.
+    """
+    return float(np.sum(x**2))
+
+
+class TestIslands(unittest.TestCase):
+    """
+    Test suite for islands file.
+    """
+
+    method = namedtuple("method", ["operator_name", "parameters"])
+
+    def test_migrate(self):
+        """
+        Tests for the migration of the best individuals.
+        """
+        self.assertEqual(islands.get_sources(3, islands.Topology.RING), [[2], [0], [1]])
+        self.assertEqual(
+            islands.get_sources(3, islands.Topology.COMPLETE),
+            [[1, 2], [0, 2], [0, 1]],
+        )
+        for index, sources in enumerate(
+            islands.get_sources(4, islands.Topology.RANDOM)
+        ):
+            self.assertNotIn(index, sources)
+
+        population = [
+            {
+                "population_x": np.array([[1.0], [2.0], [3.0]]) * offset,
+                "population_f": np.array([1.0, 2.0, 3.0]) * offset,
+                "population_sigma": None,
+            }
+            for offset in [1, 10]
+        ]
+        # It should replace the worst individuals with the best of the source.
+        islands.migrate(population, 2, islands.Topology.RING)
+        np.testing.assert_array_equal(
+            population[0]["population_x"][:, 0], [1.0, 20.0, 10.0]
+        )
+        np.testing.assert_array_equal(population[1]["population_f"], [10.0, 2.0, 1.0])
+
+    def test_island_model(self):
+        """
+        Tests that the island model is reproducible and keeps the best individual.
+        """
+        config = {
+            "crossover_operator": self.method("IntermediateCrossover", [0.5]),
+            "mutation_operator": self.method("UniformMutator", [-3, 3]),
+            "survivor_selector": self.method("MergeSelector", []),
+            "setter_invalid_solution": self.method("ContinuosFixer", [-3, 3]),
+            "parent_selector": self.method("TournamentSampler", [3, 0.5]),
+        }
+        algorithm = ev_utils.Genetic(
+            function=sphere,
+            decision_variables=3,
+            constraints=[],
+            bounds=[-3, 3],
+            config=ev_utils.create_evolutionary_config("GA", config),
+        )
+        model = islands.IslandModel(algorithm, None, 3, 4, 1, "ring")
+        results = [
+            execution.execute_once(
+                model,
+                [],
+                {"generations": 10, "size_population": 10, "verbose": False},
+                5,
+            )
+            for _ in range(2)
+        ]
+        np.testing.assert_array_equal(
+            results[0]["individual_x"], results[1]["individual_x"]
+        )
+        # It should migrate after every interval and join the populations.
+        self.assertEqual(model.logger["current_iter"], 3)
+        self.assertEqual(model.logger["parent_population_x"].shape, (30, 3))
+        self.assertEqual(
+            results[0]["individual_f"], np.min(model.logger["parent_population_f"])
+        )
+        # The stopping criteria are checked every migration.
+        result = execution.execute_once(
+            model,
+            [],
+            {"generations": 10, "size_population": 10, "verbose": False},
+            5,
+            stopping={"target_value": 1e9},
+        )
+        self.assertEqual(result["stop_reason"], "target_value")
+        self.assertEqual(model.logger["current_iter"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
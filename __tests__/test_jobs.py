@@ -0,0 +1,149 @@
+import asyncio
+import unittest
+import threading
+import services.jobs as jobs
+
+
+class TestJobManager(unittest.TestCase):
+    """
+    Test suite for the job manager.
+    """
+
+    def test_job_lifecycle(self):
+        """
+        Tests for the submit and cancel methods.
+        """
+        manager = jobs.JobManager(max_workers=1, max_stored_jobs=2)
+
+        def task(on_execution, cancel_event, on_progress):
+            on_progress({"step": 1})
+            on_execution({})
+            return {"Mean": 1.0}
+
+        # It should complete the job and count the executions.
+        job = manager.submit("test", 1, task)
+        self.assertEqual(job.future.result(), {"Mean": 1.0})
+        self.assertEqual(job.status, jobs.JobStatus.COMPLETED)
+        self.assertEqual(job.to_dict()["progress"]["completed_executions"], 1)
+        self.assertEqual(job.events_after(-1), [(0, {"step": 1})])
+        self.assertEqual(job.events_after(0), [])
+
+        # It should mark the job as failed when the task raises an exception.
+        def failing_task(on_execution, cancel_event, on_progress):
+            raise ValueError("Something has failed.")
+
+        job = manager.submit("test", 1, failing_task)
+        with self.assertRaises(ValueError):
+            job.future.result()
+        self.assertEqual(job.status, jobs.JobStatus.FAILED)
+        self.assertEqual(job.error, "Something has failed.")
+
+        # It should cancel a running job and the pending ones.
+        started = threading.Event()
+
+        def blocking_task(on_execution, cancel_event, on_progress):
+            started.set()
+            cancel_event.wait()
+            raise jobs.ExecutionCancelled()
+
+        running_job = manager.submit("test", 1, blocking_task)
+        pending_job = manager.submit("test", 1, task)
+        started.wait()
+        manager.cancel(pending_job.job_id)
+        self.assertEqual(pending_job.status, jobs.JobStatus.CANCELLED)
+        with self.assertRaises(jobs.ExecutionCancelled):
+            asyncio.run(pending_job.wait())
+        manager.cancel(running_job.job_id)
+        with self.assertRaises(jobs.ExecutionCancelled):
+            running_job.future.result()
+        self.assertEqual(running_job.status, jobs.JobStatus.CANCELLED)
+
+        # It should forget the oldest finished jobs.
+        self.assertEqual(len(manager.list()), 2)
+        with self.assertRaises(KeyError):
+            manager.get(job.job_id)
+
+    def test_admission(self):
+        """
+        Tests for the queue of the jobs waiting for a slot.
+        """
+        manager = jobs.JobManager(
+            max_workers=1, max_stored_jobs=10, max_queued_jobs=2, max_queued_cost=100
+        )
+        started = threading.Event()
+        release = threading.Event()
+        order = []
+
+        def blocking_task(on_execution, cancel_event, on_progress):
+            started.set()
+            release.wait()
+            return {}
+
+        def task(name):
+            def run(on_execution, cancel_event, on_progress):
+                order.append(name)
+                return {}
+
+            return run
+
+        running_job = manager.submit("test", 1, blocking_task, cost=50)
+        started.wait()
+        # It should reject the low priority jobs when half of the queue is taken.
+        low_job = manager.submit("test", 1, task("low"), priority=jobs.Priority.LOW)
+        with self.assertRaises(jobs.JobQueueFull) as context:
+            manager.submit("test", 1, task("low"), priority=jobs.Priority.LOW)
+        self.assertEqual(context.exception.retry_after, jobs.RETRY_AFTER_SECONDS)
+        # It should reject the jobs that exceed the cost waiting.
+        with self.assertRaises(jobs.JobQueueFull):
+            manager.submit("test", 1, task("high"), cost=200)
+        high_job = manager.submit(
+            "test", 1, task("high"), cost=100, priority=jobs.Priority.HIGH
+        )
+        with self.assertRaises(jobs.JobQueueFull):
+            manager.submit("test", 1, task("normal"))
+        # It should start the high priority jobs first.
+        release.set()
+        running_job.future.result()
+        low_job.future.result()
+        high_job.future.result()
+        self.assertEqual(order, ["high", "low"])
+        self.assertGreater(manager.throughput, 0)
+        self.assertEqual(high_job.to_dict()["priority"], "high")
+
+    def test_estimate_cost(self):
+        """
+        Tests for the evaluations estimated by request.
+        """
+        arguments = {"generations": 10, "population_size": 20, "offspring_size": 40}
+        self.assertEqual(jobs.estimate_cost(2, arguments), 800)
+        self.assertEqual(jobs.estimate_cost(2, arguments, {"islands": 3}), 2400)
+        self.assertAlmostEqual(
+            jobs.estimate_cost(1, {"initial_temperature": 1, "eps": 0.99}), 1.0
+        )
+
+    def test_result_key(self):
+        """
+        Tests for the identifier of the cached results.
+        """
+        modules = jobs.ModulesHandler("key", {"function": "a", "other": "b"})
+        key = jobs.get_result_key(modules, ["function"], 1, algorithm="GA")
+        if not jobs.RESULT_CACHE.enabled:
+            self.assertIsNone(key)
+            return
+
+        # It should ignore the versions of the modules that the request doesn't use.
+        modules.versions["other"] = "c"
+        self.assertEqual(
+            jobs.get_result_key(modules, ["function"], 1, algorithm="GA"), key
+        )
+        modules.versions["function"] = "c"
+        self.assertNotEqual(
+            jobs.get_result_key(modules, ["function"], 1, algorithm="GA"), key
+        )
+
+        # It should not cache the requests without seed.
+        self.assertIsNone(jobs.get_result_key(modules, ["function"], None))
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
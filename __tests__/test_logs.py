@@ -0,0 +1,193 @@
+import os
+import sys
+import logging
+import datetime
+import tempfile
+import unittest
+from unittest.mock import patch
+from utils import logs
+
+START = datetime.datetime(2023, 5, 1, 10, 0, 0)
+
+
+def write_log(file_path: str, count: int):
+    """
+    Write a log file with a record per minute, every third record has a traceback.
+    """
+    with open(file_path, "w", encoding="utf-8") as log_file:
+        for index in range(count):
+            created = (START + datetime.timedelta(minutes=index)).strftime(
+                "%m/%d/%Y %I:%M:%S %p"
+            )
+            level = "ERROR" if index % 3 == 0 else "INFO"
+            log_file.write(f"{created} - {level}: record {index}\n")
+            if level == "ERROR":
+                log_file.write("Traceback (most recent call last):\n  line\n")
+
+
+class TestLogs(unittest.TestCase):
+    """
+    Test suite for the reading of the log files.
+    """
+
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.folder.name, "api.log")
+        write_log(self.file_path, 300)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_pages(self):
+        """
+        Tests for the pagination by byte offsets.
+        """
+        page = logs.read_records(self.file_path, limit=10)
+        self.assertEqual(len(page["records"]), 10)
+        self.assertEqual(page["records"][0]["level"], "ERROR")
+        self.assertEqual(
+            page["records"][0]["message"],
+            "record 0\nTraceback (most recent call last):\n  line",
+        )
+        self.assertEqual(page["records"][1]["time"], "2023-05-01T10:01:00")
+        next_page = logs.read_records(
+            self.file_path, offset=page["next_offset"], limit=10
+        )
+        self.assertEqual(next_page["records"][0]["message"], "record 10")
+        # It should move an offset in the middle of a record to the next record.
+        middle = logs.read_records(
+            self.file_path, offset=page["records"][0]["offset"] + 5, limit=1
+        )
+        self.assertEqual(middle["records"][0]["message"], "record 1")
+        end = logs.read_records(self.file_path, offset=page["size"])
+        self.assertEqual(end["records"], [])
+
+    def test_tail(self):
+        """
+        Tests for the last records of the file.
+        """
+        page = logs.read_records(self.file_path, tail=3)
+        self.assertEqual(
+            [record["message"].split("\n")[0] for record in page["records"]],
+            ["record 297", "record 298", "record 299"],
+        )
+        self.assertEqual(page["next_offset"], page["size"])
+        self.assertEqual(
+            len(logs.read_records(self.file_path, tail=1000)["records"]), 100
+        )
+
+    def test_new_records(self):
+        """
+        Tests for the records read while the file is followed.
+        """
+        # It should read the records written since the offset.
+        size = os.path.getsize(self.file_path)
+        identity, page = logs.read_new_records(self.file_path, size, None)
+        self.assertEqual(page["records"], [])
+        # It should read a rotated file from the start even if it is larger.
+        rotated_path = os.path.join(self.folder.name, "rotated.log")
+        write_log(rotated_path, 400)
+        os.replace(rotated_path, self.file_path)
+        new_identity, page = logs.read_new_records(self.file_path, size, identity)
+        self.assertNotEqual(new_identity, identity)
+        self.assertEqual(page["records"][0]["message"].split("\n")[0], "record 0")
+        _, page = logs.read_new_records(self.file_path, size, new_identity)
+        self.assertNotEqual(page["records"][0]["message"].split("\n")[0], "record 0")
+        os.remove(self.file_path)
+        self.assertIsNone(logs.read_new_records(self.file_path, 0, new_identity))
+
+    def test_filters(self):
+        """
+        Tests for the level and time filters.
+        """
+        page = logs.read_records(self.file_path, level="ERROR", limit=5)
+        self.assertEqual(
+            [record["message"][:10] for record in page["records"]],
+            ["record 0\nT", "record 3\nT", "record 6\nT", "record 9\nT", "record 12\n"],
+        )
+        with patch("utils.logs.LOGS_CHUNK_SIZE", 64):
+            page = logs.read_records(
+                self.file_path,
+                since=START + datetime.timedelta(minutes=250),
+                until=START + datetime.timedelta(minutes=252),
+            )
+        self.assertEqual(
+            [record["message"].split("\n")[0] for record in page["records"]],
+            ["record 250", "record 251", "record 252"],
+        )
+
+    def test_partial_line(self):
+        """
+        Tests that a record being written isn't read.
+        """
+        with open(self.file_path, "a", encoding="utf-8") as log_file:
+            log_file.write("05/01/2023 03:00:00 PM - INFO: not fin")
+        page = logs.read_records(self.file_path, tail=1)
+        self.assertEqual(page["records"][0]["message"], "record 299")
+        self.assertLess(page["next_offset"], page["size"])
+
+
+class TestLogsPipeline(unittest.TestCase):
+    """
+    Test suite for the json records and the sampling of the logs.
+    """
+
+    def test_json_records(self):
+        """
+        Tests that the json records are read as the text records.
+        """
+        formatter = logs.JSONFormatter()
+        try:
+            raise ValueError("bad module")
+        except ValueError:
+            error = logging.LogRecord(
+                "app", logging.ERROR, __file__, 1, "Failed %s", ("GA",), True
+            )
+            error.exc_info = sys.exc_info()
+        info = logging.LogRecord("app", logging.INFO, __file__, 2, "Done", (), None)
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = os.path.join(folder, "api.log")
+            with open(file_path, "w", encoding="utf-8") as log_file:
+                log_file.write(formatter.format(error) + "\n")
+                log_file.write(formatter.format(info) + "\n")
+            page = logs.read_records(file_path, level="ERROR")
+            self.assertEqual(len(page["records"]), 1)
+            self.assertTrue(page["records"][0]["message"].startswith("Failed GA\n"))
+            self.assertIn("ValueError: bad module", page["records"][0]["message"])
+            tail = logs.read_records(file_path, tail=1)
+            self.assertEqual(tail["records"][0]["message"], "Done")
+            self.assertEqual(tail["records"][0]["level"], "INFO")
+
+    def test_debug_sampler(self):
+        """
+        Tests that one of every rate DEBUG records of a line is kept.
+        """
+        sampler = logs.DebugSampler(3)
+        kept = [
+            sampler.filter(
+                logging.LogRecord("app", logging.DEBUG, __file__, 1, "x", (), None)
+            )
+            for _ in range(7)
+        ]
+        self.assertEqual(kept, [True, False, False, True, False, False, True])
+        # It should keep the records of other lines and levels.
+        self.assertTrue(
+            sampler.filter(
+                logging.LogRecord("app", logging.DEBUG, __file__, 2, "x", (), None)
+            )
+        )
+        self.assertTrue(
+            sampler.filter(
+                logging.LogRecord("app", logging.INFO, __file__, 1, "x", (), None)
+            )
+        )
+
+    def test_parse_log_levels(self):
+        """
+        Tests for the levels by logger.
+        """
+        self.assertEqual(
+            logs.parse_log_levels("app.services=info, uvicorn = WARNING"),
+            {"app.services": "INFO", "uvicorn": "WARNING"},
+        )
+        self.assertEqual(logs.parse_log_levels(""), {})
@@ -0,0 +1,71 @@
+import unittest
+from utils.metrics import Registry, Counter, Gauge, Histogram
+
+
+class TestMetrics(unittest.TestCase):
+    """
+    Test suite for the metrics exposition.
+    """
+
+    def test_counter(self):
+        """
+        Tests for the counters.
+        """
+        registry = Registry()
+        counter = Counter("runs_total", "Runs.", ["algorithm"], registry=registry)
+        counter.inc(algorithm="GA")
+        counter.inc(2, algorithm="GA")
+        counter.inc(algorithm="SA")
+        output = registry.render()
+        self.assertIn("# TYPE runs_total counter", output)
+        self.assertIn('runs_total{algorithm="GA"} 3.0', output)
+        self.assertIn('runs_total{algorithm="SA"} 1.0', output)
+
+    def test_gauge(self):
+        """
+        Tests for the gauges.
+        """
+        registry = Registry()
+        gauge = Gauge("in_flight", "In flight.", registry=registry)
+        gauge.inc()
+        gauge.inc()
+        gauge.dec()
+        Gauge("loaded", "Loaded.", registry=registry, function=lambda: 4)
+        output = registry.render()
+        self.assertIn("in_flight 1.0", output)
+        self.assertIn("loaded 4.0", output)
+
+    def test_histogram(self):
+        """
+        Tests for the histograms.
+        """
+        registry = Registry()
+        histogram = Histogram(
+            "duration", "Duration.", ["phase"], registry=registry, buckets=[0.1, 1.0]
+        )
+        histogram.observe(0.05, phase="config")
+        histogram.observe(0.5, phase="config")
+        histogram.observe(5.0, phase="config")
+        with histogram.time(phase="execution"):
+            pass
+        output = registry.render()
+        self.assertIn('duration_bucket{phase="config",le="0.1"} 1', output)
+        self.assertIn('duration_bucket{phase="config",le="1.0"} 2', output)
+        self.assertIn('duration_bucket{phase="config",le="+Inf"} 3', output)
+        self.assertIn('duration_sum{phase="config"} 5.55', output)
+        self.assertIn('duration_count{phase="config"} 3', output)
+        self.assertIn('duration_count{phase="execution"} 1', output)
+
+    def test_disabled(self):
+        """
+        Tests that a disabled registry ignores the updates.
+        """
+        registry = Registry(enabled=False)
+        counter = Counter("runs_total", "Runs.", registry=registry)
+        histogram = Histogram("duration", "Duration.", registry=registry)
+        counter.inc()
+        histogram.observe(1.0)
+        with histogram.time():
+            pass
+        self.assertEqual(counter.values, {})
+        self.assertEqual(histogram.values, {})
@@ -0,0 +1,80 @@
+import os
+import pstats
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+from services import profiling
+
+
+def slow_task(**monitor):
+    """
+    Task that spends its time in numpy and python code.
+    """
+    total = 0.0
+    for _ in range(200):
+        total += float(np.sum(np.arange(100) ** 2))
+    return {"Mean": total, "monitor": sorted(monitor)}
+
+
+class TestProfiling(unittest.TestCase):
+    """
+    Test suite for the profiling of the optimizations.
+    """
+
+    def setUp(self):
+        self.storage = tempfile.TemporaryDirectory()
+        self.patcher = patch(
+            "services.profiling.get_storage_path", return_value=self.storage.name
+        )
+        self.patcher.start()
+
+    def tearDown(self):
+        self.patcher.stop()
+        self.storage.cleanup()
+
+    def test_get_category(self):
+        """
+        Tests for the classification of the profiled functions.
+        """
+        self.assertEqual(
+            profiling.get_category(
+                os.path.join(profiling.LOCAL_FILE_STORAGE, ".versions", "function.py")
+            ),
+            "user",
+        )
+        self.assertEqual(
+            profiling.get_category(os.path.join(profiling.PYRISTIC_PATH, "utils.py")),
+            "pyristic",
+        )
+        self.assertEqual(profiling.get_category(profiling.__file__), "app")
+        self.assertEqual(profiling.get_category("~"), "other")
+
+    def test_run_profiled(self):
+        """
+        Tests for the profile of a task.
+        """
+        statistics = profiling.run_profiled(slow_task, "default", cancel_event=None)
+        # It should keep the statistics and forward the monitor arguments.
+        self.assertEqual(statistics["monitor"], ["cancel_event"])
+        profile = statistics["profile"]
+        self.assertEqual(set(profile["categories"]), set(profiling.PROFILE_CATEGORIES))
+        self.assertAlmostEqual(
+            sum(profile["categories"].values()), profile["total_time"], places=6
+        )
+        self.assertIn(
+            "slow_task", [hotspot["function"] for hotspot in profile["hotspots"]]
+        )
+        # It should save the profile to download it.
+        file_path = profiling.get_profile_path("default", profile["profile_id"])
+        self.assertGreater(pstats.Stats(file_path).total_tt, 0)
+
+    @patch("services.profiling.MAX_STORED_PROFILES", 2)
+    def test_forget_old_profiles(self):
+        """
+        Tests that only the newest profiles are kept.
+        """
+        for _ in range(4):
+            profiling.run_profiled(slow_task, "default")
+        folder = os.path.join(self.storage.name, profiling.PROFILES_FOLDER)
+        self.assertEqual(len(os.listdir(folder)), 2)
@@ -0,0 +1,116 @@
+import io
+import json
+import unittest
+import numpy as np
+from fastapi.exceptions import HTTPException
+import utils.responses as responses
+from utils.responses import NumpyJSONResponse
+
+STATISTICS = {
+    "Worst solution": {"x": np.array([1.0, 2.0]), "f": 3.0},
+    "Best solution": {"x": np.array([0.0, 1.0]), "f": 1.0},
+    "Mean": np.float64(2.0),
+    "Standard deviation": np.float64(1.0),
+    "Median": np.float64(2.0),
+    "execution_time": [0.1, 0.2],
+    "individual_x": [np.array([1.0, 2.0]), np.array([0.0, 1.0])],
+    "individual_f": [3.0, 1.0],
+}
+
+
+class TestNumpyJSONResponse(unittest.TestCase):
+    """
+    Test suite for the numpy json response.
+    """
+
+    def test_render(self):
+        """
+        Tests for the render method.
+        """
+        # It should serialize the arrays and the numpy scalars.
+        content = {
+            "Mean": np.float64(0.5),
+            "individual_x": [np.arange(3, dtype=float), np.arange(6)[::2]],
+            "individual_f": [np.float32(1.5)],
+        }
+        self.assertEqual(
+            json.loads(NumpyJSONResponse(content).body),
+            {
+                "Mean": 0.5,
+                "individual_x": [[0.0, 1.0, 2.0], [0, 2, 4]],
+                "individual_f": [1.5],
+            },
+        )
+
+        # It should fail with the objects that aren't serializable.
+        with self.assertRaises(TypeError):
+            NumpyJSONResponse({"value": object()})
+
+
+class TestResultResponse(unittest.TestCase):
+    """
+    Test suite for the content negotiation of the results.
+    """
+
+    def test_parse_accept(self):
+        """
+        Tests for the parse_accept function.
+        """
+        # It should order by quality and keep the order of the header on ties.
+        self.assertEqual(
+            responses.parse_accept(
+                "application/json;q=0.5, application/x-npz, */*;q=0"
+            ),
+            ["application/x-npz", "application/json"],
+        )
+
+    def test_create_result_response(self):
+        """
+        Tests for the create_result_response function.
+        """
+        # It should answer with json by default.
+        response = responses.create_result_response(STATISTICS, "*/*")
+        self.assertEqual(json.loads(response.body)["Best solution"]["f"], 1.0)
+
+        # It should save the arrays in a npz file.
+        response = responses.create_result_response(STATISTICS, "application/x-npz")
+        self.assertEqual(response.media_type, "application/x-npz")
+        with np.load(io.BytesIO(response.body)) as arrays:
+            self.assertEqual(arrays["individual_x"].shape, (2, 2))
+            self.assertEqual(float(arrays["best_f"]), 1.0)
+
+        # It should answer not acceptable when the format isn't supported.
+        with self.assertRaises(HTTPException) as context:
+            responses.create_result_response(STATISTICS, "text/html")
+        self.assertEqual(context.exception.status_code, 406)
+
+    @unittest.skipIf(responses.msgpack is None, "msgpack is not installed")
+    def test_msgpack_response(self):
+        """
+        Tests for the msgpack format.
+        """
+        # It should send the raw buffer of every array.
+        response = responses.create_result_response(STATISTICS, "application/msgpack")
+        packed = responses.msgpack.unpackb(response.body)["individual_x"]
+        array = np.frombuffer(packed["data"], dtype=packed["dtype"])
+        self.assertEqual(
+            array.reshape(packed["shape"]).tolist(), [[1.0, 2.0], [0.0, 1.0]]
+        )
+
+    @unittest.skipIf(responses.pyarrow is None, "pyarrow is not installed")
+    def test_arrow_response(self):
+        """
+        Tests for the Arrow IPC format.
+        """
+        # It should write a row by execution and the summary in the metadata.
+        response = responses.create_result_response(
+            STATISTICS, "application/vnd.apache.arrow.stream"
+        )
+        table = responses.pyarrow.ipc.open_stream(response.body).read_all()
+        self.assertEqual(table.column("individual_f").to_pylist(), [3.0, 1.0])
+        self.assertEqual(table.column("individual_x").to_pylist()[1], [0.0, 1.0])
+        self.assertEqual(json.loads(table.schema.metadata[b"statistics"])["mean"], 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=3)
@@ -1,4 +1,6 @@
 """Constants for general settings."""
+import os
+
 OAPI_TAGS = [
     {
         "name": "Utilities",
@@ -11,7 +13,86 @@ OAPI_TAGS = [
             "that perform the problem defined previously."
         ),
     },
+    {
+        "name": "Jobs",
+        "description": (
+            "It helps you perform a metaheuristic in background, "
+            "check its progress and get the result later."
+        ),
+    },
+    {
+        "name": "History",
+        "description": (
+            "It helps you find, inspect and compare the optimizations "
+            "performed before."
+        ),
+    },
 ]
 LOCAL_FILE_STORAGE = "tmp_files"
+VERSIONS_FOLDER = ".versions"
+NAMESPACES_FOLDER = ".namespaces"
+DEFAULT_NAMESPACE = "default"
+NAMESPACE_HEADER = "X-Pyristic-Namespace"
+NAMESPACE_PATTERN = "^[A-Za-z0-9_-]{1,64}$"
+NAMESPACE_IDLE_SECONDS = float(os.getenv("PYRISTIC_NAMESPACE_IDLE_SECONDS", "3600"))
+EVICTION_INTERVAL_SECONDS = float(os.getenv("PYRISTIC_EVICTION_INTERVAL_SECONDS", "60"))
+MAX_MODULE_VERSIONS = int(os.getenv("PYRISTIC_MAX_MODULE_VERSIONS", "10"))
+MAX_BUNDLE_BYTES = int(os.getenv("PYRISTIC_MAX_BUNDLE_BYTES", str(10 * 1024 * 1024)))
 ROOT_PATH = "/pyristic_api"
 LOGS_FILE = "api.log"
+LOGS_FORMAT = "%(asctime)s - %(levelname)s: %(message)s"
+LOGS_DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+LOG_LEVEL = os.getenv("PYRISTIC_LOG_LEVEL", "DEBUG")
+LOG_LEVELS = os.getenv("PYRISTIC_LOG_LEVELS", "")
+LOGS_JSON = os.getenv("PYRISTIC_LOGS_JSON", "true").lower() in ("1", "true", "yes")
+LOGS_DEBUG_SAMPLE_RATE = int(os.getenv("PYRISTIC_LOGS_DEBUG_SAMPLE_RATE", "10"))
+LOGS_MAX_BYTES = int(os.getenv("PYRISTIC_LOGS_MAX_BYTES", str(10 * 1024 * 1024)))
+LOGS_BACKUP_COUNT = int(os.getenv("PYRISTIC_LOGS_BACKUP_COUNT", "5"))
+LOGS_CHUNK_SIZE = 64 * 1024
+LOGS_SCAN_BYTES = 4 * 1024 * 1024
+LOGS_FOLLOW_INTERVAL = 1.0
+MAX_LOG_RECORDS = 1000
+EXECUTION_WORKERS = int(
+    os.getenv("PYRISTIC_EXECUTION_WORKERS", str(os.cpu_count() or 1))
+)
+EXECUTION_START_METHOD = os.getenv("PYRISTIC_EXECUTION_START_METHOD", "fork")
+MAX_CONCURRENT_JOBS = int(os.getenv("PYRISTIC_MAX_CONCURRENT_JOBS", "2"))
+MAX_QUEUED_JOBS = int(os.getenv("PYRISTIC_MAX_QUEUED_JOBS", "32"))
+MAX_QUEUED_COST = float(os.getenv("PYRISTIC_MAX_QUEUED_COST", "1e9"))
+RETRY_AFTER_SECONDS = int(os.getenv("PYRISTIC_RETRY_AFTER_SECONDS", "5"))
+MAX_RETRY_AFTER_SECONDS = 3600
+CONFIG_CACHE_SIZE = int(os.getenv("PYRISTIC_CONFIG_CACHE_SIZE", "64"))
+MAX_STORED_JOBS = int(os.getenv("PYRISTIC_MAX_STORED_JOBS", "100"))
+PROGRESS_INTERVAL_SECONDS = float(os.getenv("PYRISTIC_PROGRESS_INTERVAL", "0.5"))
+MAX_JOB_EVENTS = int(os.getenv("PYRISTIC_MAX_JOB_EVENTS", "1000"))
+METRICS_ENABLED = os.getenv("PYRISTIC_METRICS_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MAX_BATCH_COMBINATIONS = int(os.getenv("PYRISTIC_MAX_BATCH_COMBINATIONS", "256"))
+RESULT_CACHE_SIZE = int(os.getenv("PYRISTIC_RESULT_CACHE_SIZE", "128"))
+RESULT_CACHE_FOLDER = os.getenv("PYRISTIC_RESULT_CACHE_FOLDER", "")
+MAX_RESULT_CACHE_FILES = int(os.getenv("PYRISTIC_MAX_RESULT_CACHE_FILES", "1000"))
+MEMO_CACHE_SIZE = int(os.getenv("PYRISTIC_MEMO_CACHE_SIZE", "0"))
+PROFILES_FOLDER = ".profiles"
+MAX_STORED_PROFILES = int(os.getenv("PYRISTIC_MAX_STORED_PROFILES", "20"))
+PROFILE_HOTSPOTS = 20
+CHECKPOINTS_FOLDER = ".checkpoints"
+CHECKPOINT_INTERVAL_SECONDS = float(
+    os.getenv("PYRISTIC_CHECKPOINT_INTERVAL_SECONDS", "30")
+)
+MAX_STORED_CHECKPOINTS = int(os.getenv("PYRISTIC_MAX_STORED_CHECKPOINTS", "20"))
+HISTORY_FOLDER = os.getenv(
+    "PYRISTIC_HISTORY_FOLDER", os.path.join(LOCAL_FILE_STORAGE, ".history")
+)
+MAX_STORED_RUNS = int(os.getenv("PYRISTIC_MAX_STORED_RUNS", "1000"))
+MAX_HISTORY_RUNS = 1000
+HISTORY_POINTS = 100
+EVOLUTIONARY_FILES = ["function", "constraints", "search_space"]
+SA_FILES = [
+    "function",
+    "constraints",
+    "SA_neighbor_generator",
+    "generator_initial_solution",
+]
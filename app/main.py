@@ -1,9 +1,16 @@
 """Initialization of the API instance."""
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.utils.generic import create_logger
+from app.utils.generic import create_logger, ModulesHandler
+from app.utils.responses import NumpyJSONResponse
+from app.utils.metrics import MetricsMiddleware
+from app.services.execution import start_worker_pool, stop_worker_pool
+from app.services.jobs import JobQueueFull
 from app.constants import OAPI_TAGS, LOGS_FILE
 from app.routes.heuristic_routes import heuristics_router
+from app.routes.job_routes import jobs_router
+from app.routes.history_routes import history_router
 from app.routes.utilities_routes import utilities_router
 
 app = FastAPI(
@@ -14,15 +21,19 @@ app = FastAPI(
     ),
     docs_url="/",
     openapi_tags=OAPI_TAGS,
+    default_response_class=NumpyJSONResponse,
 )
 
 app.include_router(heuristics_router)
+app.include_router(jobs_router)
+app.include_router(history_router)
 app.include_router(utilities_router)
 
 origins = [
     "http://localhost:3000",
 ]
 
+app.add_middleware(MetricsMiddleware)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -32,3 +43,31 @@ app.add_middleware(
 )
 
 LOGGER = create_logger(LOGS_FILE)
+
+
+@app.exception_handler(JobQueueFull)
+async def reject_job(_request: Request, exc: JobQueueFull):
+    """Answer that the optimization can't be admitted and when to retry it."""
+    return JSONResponse(
+        status_code=429,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+@app.on_event("startup")
+def load_modules():
+    """Compile the modules saved in the storage before the first request."""
+    ModulesHandler.load_storage()
+
+
+@app.on_event("startup")
+def start_workers():
+    """Fork the workers after the modules are compiled, so they inherit them."""
+    start_worker_pool()
+
+
+@app.on_event("shutdown")
+def stop_workers():
+    """Stop the workers of the optimizations."""
+    stop_worker_pool()
@@ -17,10 +17,58 @@ class EvolutionaryOperators(pydantic.BaseModel):
     methods: typing.Dict[str, EvolutionaryOperatorConfig]
 
 
+class EarlyStopping(pydantic.BaseModel):
+    """Criteria that stop every execution before its generations or temperature end."""
+
+    max_time: typing.Optional[pydantic.PositiveFloat] = None
+    target_value: typing.Optional[float] = None
+    patience: typing.Optional[pydantic.PositiveInt] = None
+
+
+class Topology(str, Enum):
+    """Connections between the islands used by the migrations."""
+
+    RING = "ring"
+    COMPLETE = "complete"
+    RANDOM = "random"
+
+
+class IslandMode(pydantic.BaseModel):
+    """Populations evolved in parallel that exchange their best individuals."""
+
+    islands: pydantic.conint(ge=2)
+    migration_interval: pydantic.PositiveInt = 5
+    migrants: pydantic.PositiveInt = 1
+    topology: Topology = Topology.RING
+
+
 class OptimizerArguments(pydantic.BaseModel):
     """Arguments for the optimize method in the metaheuristic."""
 
     arguments: typing.Dict[str, float]
+    stopping: EarlyStopping = EarlyStopping()
+    islands: typing.Optional[IslandMode] = None
+    memo: typing.Optional[pydantic.conint(ge=0)] = None
+
+
+class EvolutionaryCombination(pydantic.BaseModel):
+    """Arguments and operators that replace the base ones in a batch combination."""
+
+    arguments: typing.Dict[str, float] = {}
+    methods: typing.Dict[str, EvolutionaryOperatorConfig] = {}
+
+
+class EvolutionaryBatch(pydantic.BaseModel):
+    """
+    Combinations of arguments and operators performed with the same modules.
+
+    Every combination of the list is crossed with every point of the arguments grid.
+    """
+
+    arguments: typing.Dict[str, float]
+    methods: typing.Dict[str, EvolutionaryOperatorConfig]
+    grid: typing.Dict[str, typing.List[float]] = {}
+    combinations: typing.List[EvolutionaryCombination] = []
 
 
 class EvolutionaryAlgorithm(str, Enum):
@@ -60,3 +108,46 @@ class StringInput(pydantic.BaseModel):
     """Content type."""
 
     content: typing.Union[str, typing.List[str]]
+
+
+class FileBundle(pydantic.BaseModel):
+    """Content of several files uploaded together."""
+
+    files: typing.Dict[FileType, typing.Union[str, typing.List[str]]]
+
+
+class HistoryOrder(str, Enum):
+    """Columns accepted to sort the runs of the history."""
+
+    STARTED_AT = "started_at"
+    BEST_F = "best_f"
+    MEAN_F = "mean_f"
+    EXECUTION_TIME = "execution_time"
+
+
+class LogLevel(str, Enum):
+    """Levels accepted to filter the logs."""
+
+    DEBUG = "DEBUG"
+    INFO = "INFO"
+    WARNING = "WARNING"
+    ERROR = "ERROR"
+    CRITICAL = "CRITICAL"
+
+
+class Priority(str, Enum):
+    """Classes that order the jobs waiting for a free slot."""
+
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+class JobStatus(str, Enum):
+    """States of an optimization job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
@@ -1,14 +1,39 @@
 """Routes that perform the selected metaheuristic."""
 import logging
-import traceback
-from fastapi import HTTPException, Depends, APIRouter
-from fastapi.responses import JSONResponse
-from pyristic.utils import get_stats
-from app.services import evolutionary as ea_utils
-from app.services import simulated_annealing as sa_utils
-from app.utils.validations import ValidateFiles
-from app.utils.generic import transform_values_dict, ModulesHandler
-from app.models import EvolutionaryAlgorithm, OptimizerArguments, EvolutionaryOperators
+import typing
+import asyncio
+import functools
+from fastapi import HTTPException, Depends, APIRouter, Header
+from fastapi.responses import StreamingResponse, Response
+from starlette.background import BackgroundTask
+from app.services.jobs import (
+    JOB_MANAGER,
+    RESULT_CACHE,
+    Job,
+    get_result_key,
+    get_request_options,
+    record_cached_run,
+    submit_evolutionary_request,
+    submit_evolutionary_batch_job,
+    submit_sa_request,
+)
+from app.services.execution import ExecutionCancelled
+from app.utils.generic import ModulesHandler
+from app.utils.validations import (
+    ValidateFiles,
+    get_namespace,
+    validate_batch_combinations,
+    validate_memo,
+)
+from app.utils.responses import create_result_response, dumps, RESULT_RESPONSES
+from app.constants import EVOLUTIONARY_FILES, SA_FILES, PROGRESS_INTERVAL_SECONDS
+from app.models import (
+    EvolutionaryAlgorithm,
+    OptimizerArguments,
+    EvolutionaryOperators,
+    JobStatus,
+    Priority,
+)
 
 LOGGER = logging.getLogger(__name__)
 
@@ -18,96 +43,275 @@ heuristics_router = APIRouter(
 )
 
 
+async def create_cached_response(
+    submit: typing.Callable[[], Job],
+    result_key: typing.Optional[str],
+    accept: str,
+    on_hit: typing.Optional[typing.Callable[[dict], None]] = None,
+) -> Response:
+    """
+    Answer with the cached statistics of the request or perform it in a job.
+
+    The X-Cache header says if the statistics were cached, it is only sent when
+    the request can be cached. A request rejected by the job manager is answered
+    with 429, see reject_job, and a job cancelled while the request waits with 409.
+
+    Arguments:
+        - submit: callable that schedules the job of the request.
+        - result_key: identifier of the result, None when it can't be cached.
+        - accept: media types accepted, json by default or npz, msgpack (needs the
+            msgpack package) and arrow (needs the pyarrow package).
+        - on_hit: callable that receives the cached statistics after the response
+            is sent.
+    """
+    statistics_algorithm = RESULT_CACHE.get(result_key) if result_key else None
+    cache_status = "HIT"
+    if statistics_algorithm is None:
+        cache_status = "MISS"
+        job = submit()
+        try:
+            statistics_algorithm = await job.wait()
+            LOGGER.info("End with success.")
+        except ExecutionCancelled as exc:
+            raise HTTPException(
+                status_code=409, detail=f"The job {job.job_id} was cancelled."
+            ) from exc
+        except Exception as exc:
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+        if result_key:
+            RESULT_CACHE.put(result_key, statistics_algorithm)
+    response = create_result_response(statistics_algorithm, accept)
+    if result_key:
+        response.headers["X-Cache"] = cache_status
+    if cache_status == "HIT" and on_hit is not None:
+        response.background = BackgroundTask(on_hit, statistics_algorithm)
+    return response
+
+
 @heuristics_router.post(
     "/evolutionary/{optimizer}",
     status_code=200,
-    dependencies=[Depends(ValidateFiles(["function", "constraints", "search_space"]))],
+    dependencies=[Depends(ValidateFiles(EVOLUTIONARY_FILES))],
+    responses=RESULT_RESPONSES,
 )
-def execute_optimizer_request(
+async def execute_optimizer_request(  # pylint: disable=too-many-arguments,too-many-positional-arguments
     optimizer: EvolutionaryAlgorithm,
     num_executions: int,
     arguments_optimizer: OptimizerArguments,
     config_operators: EvolutionaryOperators,
+    seed: typing.Optional[int] = None,
+    profile: bool = False,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+    accept: str = Header("*/*"),
 ):
     """
     Perform an evolutionary algorithm.
 
+    The statistics of the requests with a seed are cached by the content of the
+    modules and the body, so the same request is answered right away. The requests
+    with a max_time aren't cached because the generations performed depend on the
+    load of the server.
+
     Arguments:
         - optimizer: the evolutionary algorithm selected.
         - num_executions: integer number that is the number of times executed the algorithm.
         - arguments_optimizer: dictionary with the key arguments for the optimize method.
         - config_operators: dictionary with the operators applied to the algorithm.
+        - seed: integer number that makes the executions reproducible.
+        - profile: perform the executions under the profiler and include the time
+            spent by the user modules, pyristic and the api with the hotspots.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+        - accept: media types accepted, json by default or npz, msgpack (needs the
+            msgpack package) and arrow (needs the pyarrow package).
     """
-    try:
-        LOGGER.info("Creating configuration for %s", optimizer)
-        configuration = ea_utils.create_evolutionary_config(
-            optimizer, config_operators.methods
-        )
-        LOGGER.info("\n%s", configuration)
-        evolutionary_algorithm = ea_utils.create_evolutionary_algorithm(
-            optimizer, configuration
-        )
-        LOGGER.info("Execute %s - %s", optimizer, num_executions)
-        statistics_algorithm = transform_values_dict(
-            get_stats(
-                evolutionary_algorithm,
-                num_executions,
-                [],
-                arguments_optimizer.arguments,
-                verbose=True,
-            )
+    validate_memo(arguments_optimizer, namespace)
+    modules = ModulesHandler(namespace).snapshot()
+    request = {
+        "algorithm": optimizer.value,
+        "num_executions": num_executions,
+        "arguments": arguments_optimizer.arguments,
+        **get_request_options(arguments_optimizer),
+        "methods": {
+            operator_type: operator.dict()
+            for operator_type, operator in config_operators.methods.items()
+        },
+    }
+    result_key = None
+    if not profile and "max_time" not in request["stopping"]:
+        result_key = get_result_key(
+            modules,
+            EVOLUTIONARY_FILES
+            + [
+                f"{optimizer.value}_{operator_type}"
+                for operator_type, operator in config_operators.methods.items()
+                if operator.operator_name == "CustomMethod"
+            ],
+            seed,
+            **request,
         )
-        LOGGER.info("End with success.")
-    except Exception as exc:
-        error_detail = traceback.format_exc()
-        LOGGER.error(error_detail)
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return JSONResponse(content=statistics_algorithm)
+    return await create_cached_response(
+        functools.partial(
+            submit_evolutionary_request,
+            optimizer=optimizer,
+            num_executions=num_executions,
+            arguments_optimizer=arguments_optimizer,
+            config_operators=config_operators,
+            namespace=namespace,
+            profile=profile,
+            modules=modules,
+            seed=seed,
+            priority=priority,
+            trace=trace,
+        ),
+        result_key,
+        accept,
+        functools.partial(record_cached_run, namespace, modules, request, seed),
+    )
+
+
+async def stream_batch_entries(job: Job) -> typing.AsyncIterator[bytes]:
+    """
+    Send a json line for every combination of the batch as soon as it finishes.
+
+    When the job fails a last line with the error is sent, and the job is cancelled
+    if the client disconnects before it finishes.
+
+    Arguments:
+        - job: the batch job followed.
+    """
+    sent = 0
+    try:
+        while True:
+            finished = job.finished
+            entries = job.result[sent:]
+            if entries:
+                sent += len(entries)
+                yield b"".join(dumps(entry) + b"\n" for entry in entries)
+            if finished:
+                if job.status != JobStatus.COMPLETED:
+                    yield dumps({"error": job.error, "status": job.status.value})
+                    yield b"\n"
+                return
+            await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+    finally:
+        if not job.finished:
+            JOB_MANAGER.cancel(job.job_id)
+
+
+@heuristics_router.post(
+    "/evolutionary/{optimizer}/batch",
+    status_code=200,
+    dependencies=[Depends(ValidateFiles(EVOLUTIONARY_FILES))],
+)
+async def execute_batch_request(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    combinations: typing.List[dict] = Depends(validate_batch_combinations),
+    seed: typing.Optional[int] = None,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Perform every combination of a parameter sweep sharing the workers.
+
+    The response is a stream with a json line for every combination as soon as it
+    finishes, the X-Job-ID header allows to follow or cancel the job.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed every
+            combination.
+        - combinations: the combinations expanded from the batch of the body.
+        - seed: integer number that makes the executions reproducible.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+    """
+    job = submit_evolutionary_batch_job(
+        optimizer,
+        num_executions,
+        combinations=combinations,
+        namespace=namespace,
+        priority=priority,
+        seed=seed,
+        trace=trace,
+    )
+    return StreamingResponse(
+        stream_batch_entries(job),
+        media_type="application/x-ndjson",
+        headers={"X-Job-ID": job.job_id},
+    )
 
 
 @heuristics_router.post(
     "/SimulatedAnnealing",
     status_code=200,
-    dependencies=[
-        Depends(
-            ValidateFiles(
-                [
-                    "function",
-                    "constraints",
-                    "SA_neighbor_generator",
-                    "generator_initial_solution",
-                ]
-            )
-        )
-    ],
+    dependencies=[Depends(ValidateFiles(SA_FILES))],
+    responses=RESULT_RESPONSES,
 )
-def execute_sa_request(num_executions: int, arguments_optimizer: OptimizerArguments):
+async def execute_sa_request(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    num_executions: int,
+    arguments_optimizer: OptimizerArguments,
+    seed: typing.Optional[int] = None,
+    profile: bool = False,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+    accept: str = Header("*/*"),
+):
     """
     Perform Simulated Annealing algorithm.
 
+    The statistics of the requests with a seed are cached as the evolutionary ones.
+
     Arguments:
         - num_executions: integer number that is the number of times executed the algorithm.
         - arguments_optimizer: dictionary with the key arguments for the optimize method.
+        - seed: integer number that makes the executions reproducible.
+        - profile: perform the executions under the profiler and include the time
+            spent by the user modules, pyristic and the api with the hotspots.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+        - accept: media types accepted, json by default or npz, msgpack (needs the
+            msgpack package) and arrow (needs the pyarrow package).
     """
-    try:
-        LOGGER.info("Starting SA optimization execution")
-        get_initial_solution = ModulesHandler().get_method_by_module(
-            "generator_initial_solution", "generate_initial_solution"
-        )
-        sa_algorithm = sa_utils.create_simulatedannealing_algorithm()
-        LOGGER.info("created SA algorithm")
-        statistics_algorithm = transform_values_dict(
-            get_stats(
-                sa_algorithm,
-                num_executions,
-                [get_initial_solution],
-                arguments_optimizer.arguments,
-                verbose=True,
-            )
-        )
-        LOGGER.info("End with success.")
-    except Exception as exc:
-        error_detail = traceback.format_exc()
-        LOGGER.error(error_detail)
-        raise HTTPException(status_code=404, detail=str(exc)) from exc
-    return JSONResponse(content=statistics_algorithm)
+    modules = ModulesHandler(namespace).snapshot()
+    options = get_request_options(arguments_optimizer)
+    request = {
+        "algorithm": "SA",
+        "num_executions": num_executions,
+        "arguments": arguments_optimizer.arguments,
+        "stopping": options["stopping"],
+        "memo": options["memo"],
+    }
+    result_key = None
+    if not profile and "max_time" not in request["stopping"]:
+        result_key = get_result_key(modules, SA_FILES, seed, **request)
+    return await create_cached_response(
+        functools.partial(
+            submit_sa_request,
+            num_executions=num_executions,
+            arguments_optimizer=arguments_optimizer,
+            namespace=namespace,
+            profile=profile,
+            modules=modules,
+            seed=seed,
+            priority=priority,
+            trace=trace,
+        ),
+        result_key,
+        accept,
+        functools.partial(record_cached_run, namespace, modules, request, seed),
+    )
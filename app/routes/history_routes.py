@@ -0,0 +1,174 @@
+"""Routes that find and compare the optimizations performed before."""
+import typing
+import datetime
+from fastapi import HTTPException, Depends, APIRouter, Path, Query
+from app.services import history
+from app.utils.validations import get_namespace
+from app.utils.responses import NumpyJSONResponse
+from app.constants import HISTORY_FOLDER, HISTORY_POINTS, MAX_HISTORY_RUNS
+from app.models import HistoryOrder
+
+RUN_ID = Path(..., regex="^[0-9a-f]{32}$")
+
+
+def check_history() -> None:
+    """Answer with not found when the history is disabled."""
+    if not HISTORY_FOLDER:
+        raise HTTPException(status_code=404, detail="The history is disabled.")
+
+
+history_router = APIRouter(
+    prefix="/history",
+    tags=["History"],
+    dependencies=[Depends(check_history)],
+)
+
+
+@history_router.get("", status_code=200)
+def list_runs(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    algorithm: typing.Optional[str] = None,
+    job_id: typing.Optional[str] = None,
+    module: typing.Optional[str] = Query(None, regex="^[0-9a-f]{64}$"),
+    since: typing.Optional[datetime.datetime] = None,
+    until: typing.Optional[datetime.datetime] = None,
+    max_best_f: typing.Optional[float] = None,
+    order_by: HistoryOrder = HistoryOrder.STARTED_AT,
+    descending: bool = True,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_HISTORY_RUNS),
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Show a page of the runs saved in the history, without their executions.
+
+    Every run has its algorithm, arguments, operators, stopping criteria, islands,
+    seed, module versions, times and the statistics of its aptitudes.
+
+    Arguments:
+        - algorithm: only the runs of the algorithm, GA, EP, EE or SA.
+        - job_id: only the runs of the job.
+        - module: only the runs that used the module version.
+        - since: ignore the runs started before this time.
+        - until: ignore the runs started after this time.
+        - max_best_f: only the runs whose best aptitude is lower or equal.
+        - order_by: started_at, best_f, mean_f or execution_time.
+        - descending: sort from the highest value.
+        - offset: number of runs skipped.
+        - limit: maximum number of runs returned.
+        - namespace: string that isolates the modules of a user.
+    """
+    return NumpyJSONResponse(
+        content=history.list_runs(
+            namespace,
+            order_by=order_by,
+            descending=descending,
+            offset=offset,
+            limit=limit,
+            algorithm=algorithm,
+            job_id=job_id,
+            module=module,
+            since=since and since.timestamp(),
+            until=until and until.timestamp(),
+            max_best_f=max_best_f,
+        )
+    )
+
+
+@history_router.get("/compare", status_code=200)
+def compare_runs(
+    run_ids: typing.List[str] = Query(..., min_items=1, regex="^[0-9a-f]{32}$"),
+    points: int = Query(HISTORY_POINTS, ge=1, le=10 * HISTORY_POINTS),
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Compare several runs with the first one.
+
+    Every run includes the best, median and worst aptitude of its executions at
+    points steps of the convergence, and probability_better, the probability
+    that one of its executions finds a lower aptitude than one of the first run.
+
+    Arguments:
+        - run_ids: identifiers of the runs, the first one is the baseline.
+        - points: maximum number of steps of the convergence summarized.
+        - namespace: string that isolates the modules of a user.
+    """
+    try:
+        return NumpyJSONResponse(
+            content=history.compare_runs(namespace, run_ids, points)
+        )
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The run {exc.args[0]} not found."
+        ) from exc
+
+
+@history_router.get("/{run_id}", status_code=200)
+def get_run(run_id: str = RUN_ID, namespace: str = Depends(get_namespace)):
+    """
+    Show a run with the aptitude, time and seed of every execution.
+
+    Arguments:
+        - run_id: identifier of the run.
+        - namespace: string that isolates the modules of a user.
+    """
+    try:
+        return NumpyJSONResponse(content=history.get_run_details(namespace, run_id))
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The run {run_id} not found."
+        ) from exc
+
+
+@history_router.get("/{run_id}/convergence", status_code=200)
+def get_convergence(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    run_id: str = RUN_ID,
+    executions: typing.Optional[typing.List[int]] = Query(None),
+    start: int = Query(0, ge=0),
+    stop: typing.Optional[int] = Query(None, ge=1),
+    step: typing.Optional[int] = Query(None, ge=1),
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Show the best aptitude after some steps of the executions of a run.
+
+    Only the steps requested are read, by default at most HISTORY_POINTS steps
+    of every execution. The steps that an execution didn't perform are null.
+
+    Arguments:
+        - run_id: identifier of the run.
+        - executions: indexes of the executions, all of them by default.
+        - start: index of the first step.
+        - stop: index after the last step, the end by default.
+        - step: distance between two steps returned.
+        - namespace: string that isolates the modules of a user.
+    """
+    try:
+        return NumpyJSONResponse(
+            content=history.get_convergence(
+                namespace, run_id, executions, start=start, stop=stop, step=step
+            )
+        )
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The run {run_id} not found."
+        ) from exc
+    except IndexError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
+
+@history_router.delete("/{run_id}", status_code=200)
+def delete_run(run_id: str = RUN_ID, namespace: str = Depends(get_namespace)):
+    """
+    Remove a run from the history.
+
+    Arguments:
+        - run_id: identifier of the run.
+        - namespace: string that isolates the modules of a user.
+    """
+    try:
+        history.delete_run(namespace, run_id)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The run {run_id} not found."
+        ) from exc
+    return f"Deleted with success {run_id}"
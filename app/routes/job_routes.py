@@ -0,0 +1,339 @@
+"""Routes that perform the metaheuristics in background jobs."""
+import json
+import typing
+import asyncio
+from fastapi import HTTPException, Depends, APIRouter, Header
+from fastapi.responses import JSONResponse, StreamingResponse
+from app.services.jobs import (
+    JOB_MANAGER,
+    Job,
+    submit_evolutionary_request,
+    submit_evolutionary_batch_job,
+    submit_sa_request,
+    resume_job,
+)
+from app.utils.validations import (
+    ValidateFiles,
+    get_namespace,
+    validate_batch_combinations,
+    validate_memo,
+)
+from app.utils.responses import (
+    create_result_response,
+    NumpyJSONResponse,
+    RESULT_RESPONSES,
+)
+from app.constants import EVOLUTIONARY_FILES, SA_FILES, PROGRESS_INTERVAL_SECONDS
+from app.models import (
+    EvolutionaryAlgorithm,
+    OptimizerArguments,
+    EvolutionaryOperators,
+    JobStatus,
+    Priority,
+)
+
+jobs_router = APIRouter(
+    prefix="/jobs",
+    tags=["Jobs"],
+)
+
+
+def get_job(job_id: str, namespace: str = Depends(get_namespace)) -> Job:
+    """
+    Find the job of the namespace or answer with not found.
+
+    Arguments:
+        - job_id: string returned when the job was submitted.
+        - namespace: string that isolates the jobs of a user.
+    """
+    try:
+        return JOB_MANAGER.get(job_id, namespace)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The job {job_id} not found."
+        ) from exc
+
+
+def format_event(event: str, data: dict, event_id: typing.Optional[int] = None) -> str:
+    """
+    Write a message with the Server-Sent Events format.
+
+    Arguments:
+        - event: name of the event.
+        - data: dictionary sent as json.
+        - event_id: identifier that allows the client to resume the stream.
+    """
+    message = "" if event_id is None else f"id: {event_id}\n"
+    return f"{message}event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def stream_job_events(job: Job, last_event_id: int) -> typing.AsyncIterator[str]:
+    """
+    Send the progress events of the job until it finishes.
+
+    The events received during an interval are sent together, so the stream
+    doesn't slow down the executions.
+
+    Arguments:
+        - job: the job followed.
+        - last_event_id: identifier of the last event received by the client.
+    """
+    while True:
+        finished = job.finished
+        events = job.events_after(last_event_id)
+        if events:
+            last_event_id = events[-1][0]
+            yield "".join(
+                format_event("progress", event, index) for index, event in events
+            )
+        if finished:
+            yield format_event("end", job.to_dict())
+            return
+        await asyncio.sleep(PROGRESS_INTERVAL_SECONDS)
+
+
+@jobs_router.post(
+    "/evolutionary/{optimizer}",
+    status_code=202,
+    dependencies=[Depends(ValidateFiles(EVOLUTIONARY_FILES))],
+)
+def submit_optimizer_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    arguments_optimizer: OptimizerArguments,
+    config_operators: EvolutionaryOperators,
+    seed: typing.Optional[int] = None,
+    profile: bool = False,
+    checkpoint: bool = False,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Schedule an evolutionary algorithm and return the job created.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments_optimizer: dictionary with the key arguments for the optimize method.
+        - config_operators: dictionary with the operators applied to the algorithm.
+        - seed: integer number that makes the executions reproducible.
+        - profile: perform the executions under the profiler and include the time
+            spent by the user modules, pyristic and the api with the hotspots.
+        - checkpoint: save the executions in the disk while they run, so the job
+            can be resumed with /jobs/{job_id}/resume after a restart.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+    """
+    if checkpoint and arguments_optimizer.islands:
+        raise HTTPException(
+            status_code=422, detail="The island mode can't be checkpointed."
+        )
+    validate_memo(arguments_optimizer, namespace)
+    job = submit_evolutionary_request(
+        optimizer,
+        num_executions,
+        arguments_optimizer,
+        config_operators,
+        namespace,
+        profile,
+        checkpoint=checkpoint,
+        priority=priority,
+        seed=seed,
+        trace=trace,
+    )
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@jobs_router.post(
+    "/evolutionary/{optimizer}/batch",
+    status_code=202,
+    dependencies=[Depends(ValidateFiles(EVOLUTIONARY_FILES))],
+)
+def submit_batch_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    combinations: typing.List[dict] = Depends(validate_batch_combinations),
+    seed: typing.Optional[int] = None,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Schedule every combination of a parameter sweep and return the job created.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed every
+            combination.
+        - combinations: the combinations expanded from the batch of the body.
+        - seed: integer number that makes the executions reproducible.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+    """
+    job = submit_evolutionary_batch_job(
+        optimizer,
+        num_executions,
+        combinations,
+        namespace,
+        priority,
+        seed=seed,
+        trace=trace,
+    )
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@jobs_router.post(
+    "/SimulatedAnnealing",
+    status_code=202,
+    dependencies=[Depends(ValidateFiles(SA_FILES))],
+)
+def submit_sa_job_request(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    num_executions: int,
+    arguments_optimizer: OptimizerArguments,
+    seed: typing.Optional[int] = None,
+    profile: bool = False,
+    checkpoint: bool = False,
+    trace: bool = False,
+    priority: Priority = Priority.NORMAL,
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Schedule Simulated Annealing algorithm and return the job created.
+
+    Arguments:
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments_optimizer: dictionary with the key arguments for the optimize method.
+        - seed: integer number that makes the executions reproducible.
+        - profile: perform the executions under the profiler and include the time
+            spent by the user modules, pyristic and the api with the hotspots.
+        - checkpoint: save the executions in the disk while they run, so the job
+            can be resumed with /jobs/{job_id}/resume after a restart.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+        - priority: class that orders the request while it waits for a free slot,
+            high, normal or low.
+        - namespace: string that isolates the modules of a user.
+    """
+    job = submit_sa_request(
+        num_executions,
+        arguments_optimizer,
+        namespace,
+        profile,
+        checkpoint=checkpoint,
+        priority=priority,
+        seed=seed,
+        trace=trace,
+    )
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@jobs_router.get("", status_code=200)
+def list_jobs(namespace: str = Depends(get_namespace)):
+    """
+    Show the jobs of the namespace kept in memory.
+
+    Arguments:
+        - namespace: string that isolates the jobs of a user.
+    """
+    return JSONResponse(content=[job.to_dict() for job in JOB_MANAGER.list(namespace)])
+
+
+@jobs_router.get("/{job_id}", status_code=200)
+def get_job_status(job: Job = Depends(get_job)):
+    """
+    Show the status and progress of a job.
+
+    Arguments:
+        - job: the job found with the identifier of the path.
+    """
+    return JSONResponse(content=job.to_dict())
+
+
+@jobs_router.get("/{job_id}/events", status_code=200)
+def get_job_events(
+    job: Job = Depends(get_job),
+    last_event_id: int = Header(-1, alias="Last-Event-ID"),
+):
+    """
+    Stream the progress of a job with Server-Sent Events.
+
+    Every progress event has the execution index, the generation or temperature
+    step, the best aptitude found and the elapsed time of the execution. The stream
+    finishes with an end event that has the job status.
+
+    Arguments:
+        - job: the job found with the identifier of the path.
+        - last_event_id: identifier of the last event received when reconnecting.
+    """
+    return StreamingResponse(
+        stream_job_events(job, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@jobs_router.post("/{job_id}/cancel", status_code=200)
+def cancel_job(job: Job = Depends(get_job)):
+    """
+    Cancel a job, the running execution finishes before stopping.
+
+    Arguments:
+        - job: the job found with the identifier of the path.
+    """
+    return JSONResponse(content=JOB_MANAGER.cancel(job.job_id).to_dict())
+
+
+@jobs_router.post("/{job_id}/resume", status_code=202)
+def resume_job_request(job_id: str, namespace: str = Depends(get_namespace)):
+    """
+    Continue a checkpointed job from its last checkpoint.
+
+    The job keeps its identifier, the executions finished aren't repeated and the
+    executions in progress continue from their last saved state.
+
+    Arguments:
+        - job_id: string returned when the job was submitted with checkpoint.
+        - namespace: string that isolates the jobs of a user.
+    """
+    try:
+        job = resume_job(job_id, namespace)
+    except KeyError as exc:
+        raise HTTPException(
+            status_code=404, detail=f"The job {job_id} doesn't have a checkpoint."
+        ) from exc
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except OSError as exc:
+        raise HTTPException(
+            status_code=409,
+            detail=f"The module versions of the job {job_id} aren't stored anymore.",
+        ) from exc
+    return JSONResponse(status_code=202, content=job.to_dict())
+
+
+@jobs_router.get("/{job_id}/result", status_code=200, responses=RESULT_RESPONSES)
+def get_job_result(job: Job = Depends(get_job), accept: str = Header("*/*")):
+    """
+    Show the statistics obtained by a completed job.
+
+    Arguments:
+        - job: the job found with the identifier of the path.
+        - accept: media types accepted, json by default or npz, msgpack (needs the
+            msgpack package) and arrow (needs the pyarrow package).
+    """
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=404, detail=job.error)
+    if job.status != JobStatus.COMPLETED:
+        raise HTTPException(
+            status_code=409, detail=f"The job {job.job_id} is {job.status.value}."
+        )
+    if isinstance(job.result, list):
+        return NumpyJSONResponse(content=job.result)
+    return create_result_response(job.result, accept)
@@ -1,11 +1,31 @@
 """Routes that help us to know information about the metaheuristic performed."""
+import os
+import typing
 import logging
+import datetime
 import traceback
-from fastapi import HTTPException, APIRouter
-from fastapi.responses import JSONResponse
-from app.utils.generic import create_file
-from app.constants import LOGS_FILE
-from app.models import FileType, StringInput
+import pydantic
+from fastapi import HTTPException, Depends, APIRouter, Path, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import (
+    JSONResponse,
+    PlainTextResponse,
+    FileResponse,
+    StreamingResponse,
+)
+from app.utils.generic import (
+    create_file,
+    create_files,
+    read_bundle_archive,
+    BundleError,
+    ModulesHandler,
+)
+from app.services.profiling import get_profile_path
+from app.utils.validations import get_namespace
+from app.utils.metrics import REGISTRY
+from app.utils.logs import get_log_path, read_records, follow_records
+from app.constants import LOGS_BACKUP_COUNT, MAX_LOG_RECORDS, MAX_BUNDLE_BYTES
+from app.models import FileType, FileBundle, StringInput, LogLevel
 
 LOGGER = logging.getLogger(__name__)
 
@@ -21,27 +41,173 @@ def get_verification_response():
 
 
 @utilities_router.get("/logs", status_code=200)
-def get_logs():
-    """Show logs obtained from the api's."""
-    with open(LOGS_FILE, "r", encoding="utf-8") as log_file:
-        content = log_file.read()
-    return JSONResponse(content={"content": content})
+def get_logs(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LOG_RECORDS),
+    tail: typing.Optional[int] = Query(None, ge=1, le=MAX_LOG_RECORDS),
+    level: typing.Optional[LogLevel] = None,
+    since: typing.Optional[datetime.datetime] = None,
+    until: typing.Optional[datetime.datetime] = None,
+    rotation: int = Query(0, ge=0, le=LOGS_BACKUP_COUNT),
+    follow: bool = False,
+):
+    """
+    Show a page of the records logged by the api.
+
+    Every record has its byte offset, time, level and message. The response
+    includes next_offset to request the next page and the size of the file.
+
+    Arguments:
+        - offset: byte offset where the page starts.
+        - limit: maximum number of records returned.
+        - tail: return the last records of the file instead of starting at the offset.
+        - level: minimum level of the records returned.
+        - since: ignore the records written before this time.
+        - until: ignore the records written after this time.
+        - rotation: 0 for the current file, n for the rotated file with suffix .n.
+        - follow: stream a json line for every new record from the offset, or
+            from the tail, until the client disconnects.
+    """
+    file_path = get_log_path(rotation)
+    if not os.path.exists(file_path):
+        raise HTTPException(status_code=404, detail="The log file not found.")
+    level = level and level.value
+    page = read_records(
+        file_path,
+        offset=offset,
+        limit=limit,
+        tail=tail,
+        level=level,
+        since=since,
+        until=until,
+    )
+    if follow:
+        records = page["records"]
+        start = records[0]["offset"] if records else page["next_offset"]
+        return StreamingResponse(
+            follow_records(file_path, start, level),
+            media_type="application/x-ndjson",
+        )
+    return JSONResponse(content=page)
 
 
 @utilities_router.post("/create-file/{file_name}", status_code=200)
-def create_file_request(file_name: FileType, text_content: StringInput):
+def create_file_request(
+    file_name: FileType,
+    text_content: StringInput,
+    namespace: str = Depends(get_namespace),
+):
     """
     Create a file with the content.
 
     Arguments:
         - file_name: string indicating the file name where to save the content.
         - text_content: string with python code. This content is saved as a python file.
+        - namespace: string that isolates the modules of a user.
+    """
+    try:
+        version = create_file(file_name.value, text_content.content, namespace)
+        LOGGER.info("Uploaded file %s - %s - %s", namespace, file_name.value, version)
+    except Exception as exc:
+        error_detail = traceback.format_exc()
+        LOGGER.error(error_detail)
+        raise HTTPException(status_code=500, detail=str(exc)) from exc
+    return f"Created with success {file_name.value}"
+
+
+@utilities_router.post(
+    "/create-bundle",
+    status_code=200,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": FileBundle.schema()},
+                "application/zip": {"schema": {"type": "string", "format": "binary"}},
+            },
+        }
+    },
+)
+async def create_bundle_request(
+    request: Request, namespace: str = Depends(get_namespace)
+):
+    """
+    Create the files of a problem together and activate them in a single step.
+
+    The body is a json with the content of every file, or a zip archive with the
+    python files named as the file types. Every file is compiled before any of
+    them is activated, when a file fails the previous versions stay active and
+    the error of every file is returned.
+
+    Arguments:
+        - request: json or zip body with the files.
+        - namespace: string that isolates the modules of a user.
     """
+    data = await request.body()
+    if len(data) > MAX_BUNDLE_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"The bundle exceeds the limit of {MAX_BUNDLE_BYTES} bytes.",
+        )
     try:
-        create_file(file_name, text_content.content)
-        LOGGER.info("Uploaded file %s", file_name)
+        if request.headers.get("content-type", "").startswith("application/zip"):
+            contents = read_bundle_archive(data, [file.value for file in FileType])
+        else:
+            bundle = FileBundle.parse_raw(data)
+            contents = {file.value: content for file, content in bundle.files.items()}
+        versions = await run_in_threadpool(create_files, contents, namespace)
+    except pydantic.ValidationError as exc:
+        raise HTTPException(status_code=422, detail=exc.errors()) from exc
+    except BundleError as exc:
+        raise HTTPException(status_code=422, detail={"errors": exc.errors}) from exc
     except Exception as exc:
         error_detail = traceback.format_exc()
         LOGGER.error(error_detail)
         raise HTTPException(status_code=500, detail=str(exc)) from exc
-    return f"Created with success {file_name}"
+    LOGGER.info("Uploaded bundle %s - %s", namespace, versions)
+    return JSONResponse(content=versions)
+
+
+@utilities_router.get("/modules", status_code=200)
+def get_module_versions(namespace: str = Depends(get_namespace)):
+    """
+    Show the versions stored of every module uploaded and the active one.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+    """
+    return JSONResponse(content=ModulesHandler(namespace).list_versions())
+
+
+@utilities_router.get("/profiles/{profile_id}", status_code=200)
+def download_profile(
+    profile_id: str = Path(..., regex="^[0-9a-f]{32}$"),
+    namespace: str = Depends(get_namespace),
+):
+    """
+    Download a profile saved by an optimization, it can be opened with pstats.
+
+    Arguments:
+        - profile_id: identifier included in the summary of the profile.
+        - namespace: string that isolates the modules of a user.
+    """
+    file_path = get_profile_path(namespace, profile_id)
+    if not os.path.exists(file_path):
+        raise HTTPException(
+            status_code=404, detail=f"The profile {profile_id} not found."
+        )
+    return FileResponse(
+        file_path,
+        media_type="application/octet-stream",
+        filename=f"{profile_id}.prof",
+    )
+
+
+@utilities_router.get("/metrics", status_code=200)
+def get_metrics():
+    """Show the metrics of the service in the Prometheus text format."""
+    if not REGISTRY.enabled:
+        raise HTTPException(status_code=404, detail="The metrics are disabled.")
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
@@ -0,0 +1,335 @@
+"""Checkpoints that allow us to resume the optimizations saved in the disk."""
+import os
+import copy
+import time
+import random
+import pickle
+import shutil
+import typing
+import contextlib
+import numpy as np
+from app.constants import (
+    CHECKPOINTS_FOLDER,
+    CHECKPOINT_INTERVAL_SECONDS,
+    MAX_STORED_CHECKPOINTS,
+)
+from app.utils.generic import get_storage_path
+
+RUN_FILE = "run.pickle"
+
+
+def get_checkpoint_folder(namespace: str, job_id: str) -> str:
+    """
+    Location where the checkpoint of a job is saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - job_id: identifier of the job.
+    """
+    return os.path.join(get_storage_path(namespace), CHECKPOINTS_FOLDER, job_id)
+
+
+def save_object(file_path: str, value: typing.Any) -> None:
+    """
+    Pickle an object in a single step, so a restart never leaves it half written.
+
+    Arguments:
+        - file_path: location of the file.
+        - value: object to save.
+    """
+    temporal_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temporal_path, "wb") as checkpoint_file:
+        pickle.dump(value, checkpoint_file, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporal_path, file_path)
+
+
+def load_object(file_path: str) -> typing.Optional[typing.Any]:
+    """
+    Unpickle an object, None when the file doesn't exist or can't be read.
+
+    Arguments:
+        - file_path: location of the file.
+    """
+    try:
+        with open(file_path, "rb") as checkpoint_file:
+            return pickle.load(checkpoint_file)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def get_random_state() -> dict:
+    """Return the state of the random generators used by pyristic."""
+    return {"numpy": np.random.get_state(), "random": random.getstate()}
+
+
+def set_random_state(state: dict) -> None:
+    """
+    Restore the state of the random generators.
+
+    Arguments:
+        - state: dictionary returned by get_random_state.
+    """
+    np.random.set_state(state["numpy"])
+    random.setstate(state["random"])
+
+
+class ExecutionCheckpoint:
+    """State of an execution saved every interval seconds."""
+
+    def __init__(self, file_path: str, interval: float):
+        """
+        Locate the state of the execution.
+
+        Arguments:
+            - file_path: location of the state.
+            - interval: seconds between two saves of the state.
+        """
+        self.file_path = file_path
+        self.interval = interval
+
+    def load(self) -> typing.Optional[dict]:
+        """Return the last state saved, None when the execution didn't save one."""
+        return load_object(self.file_path)
+
+    @contextlib.contextmanager
+    def save_periodically(self, optimizer, state: typing.Optional[dict] = None):
+        """
+        Instrument the optimizer to save its state.
+
+        The evolutionary algorithms save the population selected every generation
+        and simulated annealing saves its candidate before every neighbor, when the
+        random generators have the state needed to continue from there.
+
+        Arguments:
+            - optimizer: pyristic search algorithm.
+            - state: state that the execution resumes, the saved states continue
+                its generations and execution time.
+        """
+        start_time = time.time()
+        last_saved = [start_time]
+        generation = 0 if state is None else state.get("generation", 0)
+        elapsed_time = 0.0 if state is None else state["execution_time"]
+
+        def save(**values):
+            now = time.time()
+            if now - last_saved[0] < self.interval:
+                return
+            last_saved[0] = now
+            save_object(
+                self.file_path,
+                {
+                    **values,
+                    "random_state": get_random_state(),
+                    "execution_time": elapsed_time + now - start_time,
+                },
+            )
+
+        if hasattr(optimizer, "survivor_selection"):
+            method_name = "survivor_selection"
+            method = optimizer.survivor_selection
+
+            def hook(**kwargs):
+                next_generation = method(**kwargs)
+                save(
+                    generation=generation + optimizer.logger["current_iter"] + 1,
+                    population_x=next_generation.get(
+                        "parent_population_x", next_generation.get("population")
+                    ),
+                    population_sigma=next_generation.get("parent_population_sigma"),
+                )
+                return next_generation
+
+        elif hasattr(optimizer, "get_neighbor"):
+            method_name = "get_neighbor"
+            method = optimizer.get_neighbor
+
+            def hook(solution, **kwargs):
+                save(
+                    candidate=copy.deepcopy(solution),
+                    temperature=optimizer.logger["temperature"],
+                    best_individual=copy.deepcopy(optimizer.logger["best_individual"]),
+                    best_f=optimizer.logger["best_f"],
+                )
+                return method(solution, **kwargs)
+
+        else:
+            yield
+            return
+        with replace_method(optimizer, method_name, hook):
+            yield
+
+
+@contextlib.contextmanager
+def replace_method(optimizer, method_name: str, method: typing.Callable):
+    """
+    Replace a method of the optimizer restoring the previous one at the end.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - method_name: name of the method.
+        - method: callable used while the context is open.
+    """
+    missing = object()
+    previous = vars(optimizer).get(method_name, missing)
+    setattr(optimizer, method_name, method)
+    try:
+        yield
+    finally:
+        if previous is missing:
+            delattr(optimizer, method_name)
+        else:
+            setattr(optimizer, method_name, previous)
+
+
+@contextlib.contextmanager
+def resume_execution(
+    optimizer, state: dict, optimizer_args: list, optimizer_additional_args: dict
+):
+    """
+    Continue an execution from its state and yield the arguments of optimize.
+
+    The evolutionary algorithms start from the population saved for the remaining
+    generations, and simulated annealing starts from the candidate and temperature
+    saved keeping the best solution found before.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - state: state saved by save_periodically.
+        - optimizer_args: positional arguments for the optimize method.
+        - optimizer_additional_args: key arguments for the optimize method.
+    """
+    if "generation" in state:
+        with contextlib.ExitStack() as stack:
+            stack.enter_context(
+                replace_method(
+                    optimizer,
+                    "initialize_population",
+                    lambda *_, **__: state["population_x"].copy(),
+                )
+            )
+            if state["population_sigma"] is not None:
+                stack.enter_context(
+                    replace_method(
+                        optimizer,
+                        "initialize_step_weights",
+                        lambda *_, **__: state["population_sigma"].copy(),
+                    )
+                )
+            yield optimizer_args, {
+                **optimizer_additional_args,
+                "generations": int(optimizer_additional_args["generations"])
+                - state["generation"],
+            }
+        return
+    yield [state["candidate"], *optimizer_args[1:]], {
+        **optimizer_additional_args,
+        "initial_temperature": state["temperature"],
+    }
+    if state["best_f"] < optimizer.logger["best_f"]:
+        optimizer.logger["best_individual"] = state["best_individual"]
+        optimizer.logger["best_f"] = state["best_f"]
+
+
+class Checkpoint:
+    """Folder with the request and the executions of a job."""
+
+    def __init__(self, folder: str, interval: float = CHECKPOINT_INTERVAL_SECONDS):
+        """
+        Locate the checkpoint.
+
+        Arguments:
+            - folder: location of the checkpoint.
+            - interval: seconds between two saves of the state of an execution.
+        """
+        self.folder = folder
+        self.interval = interval
+
+    def save_request(self, request: dict) -> None:
+        """
+        Save what the job needs to be submitted again.
+
+        Arguments:
+            - request: algorithm, arguments, operators, seed and module versions.
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        save_object(os.path.join(self.folder, RUN_FILE), request)
+
+    def load_request(self) -> typing.Optional[dict]:
+        """Return the request saved, None when the folder isn't a checkpoint."""
+        return load_object(os.path.join(self.folder, RUN_FILE))
+
+    def get_execution(self, task_index: int, execution: int) -> ExecutionCheckpoint:
+        """
+        Return the checkpoint of an execution in progress.
+
+        Arguments:
+            - task_index: index of the task.
+            - execution: index of the execution in the task.
+        """
+        return ExecutionCheckpoint(
+            os.path.join(self.folder, f"{task_index}_{execution}.state"), self.interval
+        )
+
+    def save_result(self, task_index: int, execution: int, result: dict) -> None:
+        """
+        Save a finished execution and forget its state.
+
+        Arguments:
+            - task_index: index of the task.
+            - execution: index of the execution in the task.
+            - result: result of the execution.
+        """
+        save_object(
+            os.path.join(self.folder, f"{task_index}_{execution}.result"), result
+        )
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(self.get_execution(task_index, execution).file_path)
+
+    def load_results(self) -> typing.Dict[typing.Tuple[int, int], dict]:
+        """Return the finished executions by task and execution indexes."""
+        results = {}
+        for file_name in os.listdir(self.folder):
+            name, extension = os.path.splitext(file_name)
+            if extension != ".result":
+                continue
+            result = load_object(os.path.join(self.folder, file_name))
+            if result is not None:
+                task_index, execution = map(int, name.split("_"))
+                results[(task_index, execution)] = result
+        return results
+
+
+def forget_old_checkpoints(namespace: str) -> None:
+    """
+    Remove the oldest checkpoints of the namespace when there are too many.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+    """
+    folder = os.path.join(get_storage_path(namespace), CHECKPOINTS_FOLDER)
+    checkpoints = sorted(
+        (os.path.join(folder, job_id) for job_id in os.listdir(folder)),
+        key=os.path.getmtime,
+    )
+    for checkpoint_path in checkpoints[
+        : max(len(checkpoints) - MAX_STORED_CHECKPOINTS, 0)
+    ]:
+        shutil.rmtree(checkpoint_path, ignore_errors=True)
+
+
+def run_checkpointed(
+    task: typing.Callable[..., dict], checkpoint: Checkpoint, **monitor
+) -> dict:
+    """
+    Perform the task and remove its checkpoint when it finishes successfully.
+
+    The checkpoints of the failed and cancelled tasks are kept to resume them.
+
+    Arguments:
+        - task: callable that returns the statistics of the executions.
+        - checkpoint: checkpoint of the task.
+        - monitor: key arguments forwarded to the task by the job manager.
+    """
+    statistics = task(**monitor)
+    shutil.rmtree(checkpoint.folder, ignore_errors=True)
+    return statistics
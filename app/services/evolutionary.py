@@ -1,14 +1,38 @@
 """Methods required to implement a evolutionary algorithm of pyristic."""
+import math
 import typing
+import logging
+import itertools
+import functools
+import numpy as np
 from pyristic.heuristic import Genetic, EvolutionStrategy, EvolutionaryProgramming
 from pyristic.utils.evolutionary_config import OptimizerConfig
 import pyristic.utils.operators as pc_method
 import pyristic.utils.helpers as pc_utils
-from app.models import EvolutionaryAlgorithm, EvolutionaryOperators
+from app.models import (
+    EvolutionaryAlgorithm,
+    EvolutionaryOperators,
+    EvolutionaryBatch,
+    EvolutionaryCombination,
+)
 from app.utils.generic import ModulesHandler
+from app.utils.cache import LRUCache, Memo, freeze
+from app.services.execution import run_executions, run_batch_executions, track_run
+from app.services.islands import IslandModel
+from app.utils.metrics import PHASE_DURATION
+from app.constants import CONFIG_CACHE_SIZE, MEMO_CACHE_SIZE
 
+LOGGER = logging.getLogger(__name__)
+EVOLUTIONARY_CACHE = LRUCache(CONFIG_CACHE_SIZE)
+ALGORITHMS = {
+    "GA": Genetic,
+    "EE": EvolutionStrategy,
+    "EP": EvolutionaryProgramming,
+}
+PROBLEM_MODULES = ["function", "search_space", "constraints"]
 
-def get_evolutionary_method(algorithm, operator_type, config):
+
+def get_evolutionary_method(algorithm, operator_type, config, modules=None):
     """
     Provide the official method or custom method that envolve any step.
 
@@ -16,6 +40,7 @@ def get_evolutionary_method(algorithm, operator_type, config):
         - algorithm: It helps us to know the algorithm GA,EE or EP.
         - operator_type: It says the method to configure.
         - config: Object that has all configuration and provide us the method name.
+        - modules: handler pinned to the module versions, by default the active ones.
     """
     method_name = config[operator_type].operator_name
     if method_name != "CustomMethod":
@@ -23,21 +48,24 @@ def get_evolutionary_method(algorithm, operator_type, config):
         if operator_type == "setter_invalid_solution":
             search_location = pc_utils
         return getattr(search_location, method_name)
-    return ModulesHandler().get_method_by_module(
+    return (modules or ModulesHandler()).get_method_by_module(
         f"{algorithm}_{operator_type}", "CustomMethod"
     )
 
 
-def create_evolutionary_config(
-    algorithm_type: EvolutionaryAlgorithm, config: EvolutionaryOperators
+def build_evolutionary_config(
+    algorithm_type: str,
+    config: EvolutionaryOperators,
+    modules: typing.Optional[ModulesHandler] = None,
 ) -> OptimizerConfig:
     """
-    Create the evolutionary configuration for the specific algorithm.
+    Build the evolutionary configuration for the specific algorithm.
 
     Arguments:
         - algorithm_type: Recives a string that correspond to one of the three
             types of algorithms (GA,EE,EP).
         - config: dictionary with the operators desired
+        - modules: handler pinned to the module versions, by default the active ones.
     """
     optional_methods = ["init_population"]
     methods_to_set = [
@@ -62,7 +90,7 @@ def create_evolutionary_config(
         if not config.get(operator_type, False) and operator_type in optional_methods:
             continue
 
-        method = get_evolutionary_method(algorithm_type, operator_type, config)
+        method = get_evolutionary_method(algorithm_type, operator_type, config, modules)
         try:
             pyristic_config.methods[operator_type] = method(
                 *config[operator_type].parameters
@@ -76,32 +104,433 @@ def create_evolutionary_config(
     return pyristic_config
 
 
+def create_evolutionary_config(
+    algorithm_type: EvolutionaryAlgorithm,
+    config: EvolutionaryOperators,
+    modules: typing.Optional[ModulesHandler] = None,
+) -> OptimizerConfig:
+    """
+    Create the evolutionary configuration for the specific algorithm.
+
+    The configurations are cached by namespace, algorithm, operators and version of
+    the custom modules, so every call returns a copy that shares the operator instances.
+
+    Arguments:
+        - algorithm_type: Recives a string that correspond to one of the three
+            types of algorithms (GA,EE,EP).
+        - config: dictionary with the operators desired
+        - modules: handler pinned to the module versions, by default the active ones.
+    """
+    algorithm_type = EvolutionaryAlgorithm(algorithm_type).value
+    modules = modules or ModulesHandler()
+    custom_modules = [
+        f"{algorithm_type}_{operator_type}"
+        for operator_type, operator in config.items()
+        if operator.operator_name == "CustomMethod"
+    ]
+    key = (
+        "config",
+        modules.namespace,
+        algorithm_type,
+        freeze(
+            {
+                operator_type: [operator.operator_name, operator.parameters]
+                for operator_type, operator in config.items()
+            }
+        ),
+        tuple(modules.get_version(module) for module in custom_modules),
+    )
+    with PHASE_DURATION.time(phase="config"):
+        cached_config = EVOLUTIONARY_CACHE.get_or_create(
+            key,
+            functools.partial(
+                build_evolutionary_config, algorithm_type, config, modules
+            ),
+            tags=[(modules.namespace, module) for module in custom_modules],
+        )
+    pyristic_config = OptimizerConfig()
+    pyristic_config.methods.update(cached_config.methods)
+    return pyristic_config
+
+
+class BatchEvaluator:
+    """
+    Aptitude function that evaluates the whole population with one call.
+
+    pyristic calls the aptitude function once per individual, so the first call of
+    every population evaluates all of them with the batch function of the module,
+    fixing the invalid offspring before, and the next calls return the values.
+    A population is evaluated again when the individual received isn't the next
+    row of the population evaluated, so a stopped execution doesn't shift the
+    values of the next one. The constraints receive the population and return one
+    boolean per individual, the ones that return a single value are evaluated
+    individual by individual.
+    """
+
+    def __init__(
+        self,
+        function: typing.Callable[[np.ndarray], np.ndarray],
+        constraints: typing.List[typing.Callable[[np.ndarray], typing.Any]],
+    ):
+        """
+        Keep the batch functions of the problem.
+
+        Arguments:
+            - function: callable that returns the aptitude of every row of the
+                population matrix.
+            - constraints: callables that return if every row is valid.
+        """
+        self.function = function
+        self.constraints = constraints
+        self.optimizer = None
+        self.population = None
+        self.values = None
+        self.position = 0
+
+    def __call__(self, individual: np.ndarray) -> float:
+        """
+        Return the aptitude of the individual in the position evaluated.
+
+        Arguments:
+            - individual: row of the population that pyristic evaluates.
+        """
+        if self.position == 0 or not np.may_share_memory(
+            individual, self.population[self.position]
+        ):
+            self.population, self.values = self.evaluate(individual)
+            self.position = 0
+        value = self.values[self.position]
+        self.position = (self.position + 1) % len(self.values)
+        return value
+
+    def reset(self) -> None:
+        """Forget the population evaluated, it is called before every execution."""
+        self.population = None
+        self.values = None
+        self.position = 0
+
+    def evaluate(self, individual: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        Evaluate the population of the individual and return it with its values.
+
+        The initial population is only evaluated, as pyristic does, while the
+        invalid offspring are fixed with the fixer of the optimizer. ValueError is
+        raised when the batch function doesn't return one value per individual.
+
+        Arguments:
+            - individual: first row of the population.
+        """
+        logger = self.optimizer.logger
+        offspring = logger.get("offspring_population_x")
+        if offspring is not None and np.may_share_memory(individual, offspring):
+            population = offspring
+            for index in np.flatnonzero(~self.is_valid(population)):
+                population[index] = self.optimizer.fixer(index)
+        else:
+            population = logger["parent_population_x"]
+        values = np.asarray(self.function(population), dtype=float).reshape(-1)
+        if len(values) != len(population):
+            raise ValueError(
+                f"batch_aptitude_function returned {len(values)} values "
+                f"for a population of {len(population)} individuals."
+            )
+        return population, values
+
+    def is_valid(self, population: np.ndarray) -> np.ndarray:
+        """
+        Check the constraints of every individual.
+
+        Arguments:
+            - population: matrix with one individual per row.
+        """
+        valid = np.ones(len(population), dtype=bool)
+        for constraint in self.constraints:
+            result = np.asarray(constraint(population), dtype=bool)
+            if result.shape != valid.shape:
+                result = np.array([bool(constraint(row)) for row in population])
+            valid &= result
+        return valid
+
+
+def create_batch_algorithm(
+    algorithm: typing.Callable[
+        ..., typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]
+    ],
+    evaluator: BatchEvaluator,
+    **problem,
+) -> typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]:
+    """
+    Create an algorithm that evaluates the populations with its own evaluator.
+
+    The evaluator is kept in the evaluator attribute of the algorithm, so it is
+    reset before every execution, see execution.execute_once.
+
+    Arguments:
+        - algorithm: class of the evolutionary algorithm.
+        - evaluator: batch evaluator shared by the cached factory, it is copied
+            because it keeps the state of the population evaluated.
+        - problem: key arguments of the algorithm besides the function and the
+            constraints, that the evaluator checks.
+    """
+    evaluator = BatchEvaluator(evaluator.function, evaluator.constraints)
+    optimizer = algorithm(function=evaluator, constraints=[], **problem)
+    evaluator.optimizer = optimizer
+    optimizer.evaluator = evaluator
+    return optimizer
+
+
+def create_memoized_algorithm(
+    algorithm: typing.Callable[
+        ..., typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]
+    ],
+    function: typing.Callable[[np.ndarray], float],
+    constraints: typing.List[typing.Callable[[np.ndarray], bool]],
+    memo_size: int = MEMO_CACHE_SIZE,
+    **problem,
+) -> typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]:
+    """
+    Create an algorithm with its own memo of the objective and the constraints.
+
+    The algorithm doesn't have memo when the memo size isn't positive.
+
+    Arguments:
+        - algorithm: class of the evolutionary algorithm.
+        - function: objective of the problem.
+        - constraints: callables that check if an individual is valid.
+        - memo_size: results kept by the memo.
+        - problem: the rest of key arguments of the algorithm.
+    """
+    if memo_size <= 0:
+        return algorithm(function=function, constraints=constraints, **problem)
+    memo = Memo(memo_size)
+    function, constraints = memo.memoize(function, constraints)
+    optimizer = algorithm(function=function, constraints=constraints, **problem)
+    optimizer.memo = memo
+    return optimizer
+
+
+def create_algorithm_factory(
+    algorithm_type: str, modules: ModulesHandler
+) -> typing.Callable[
+    ..., typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]
+]:
+    """
+    Create a callable that builds the algorithm once it receives the configuration.
+
+    The function modules that define batch_aptitude_function evaluate every
+    population with one call, see BatchEvaluator, and their factory doesn't receive
+    a memo size. Otherwise the objective and the constraints are memoized when the
+    memo size received by the factory is positive, see create_memoized_algorithm.
+
+    Arguments:
+        - algorithm_type: string that represent the tipe of algorithm.
+        - modules: handler pinned to the module versions.
+    """
+    if modules.has_method("function", "batch_aptitude_function"):
+        return functools.partial(
+            create_batch_algorithm,
+            ALGORITHMS[algorithm_type],
+            BatchEvaluator(
+                modules.get_method_by_module("function", "batch_aptitude_function"),
+                modules.get_method_by_module("constraints", "ARRAY_CONSTRAINTS"),
+            ),
+            decision_variables=modules.get_method_by_module(
+                "search_space", "DECISION_VARIABLES"
+            ),
+            bounds=modules.get_method_by_module("search_space", "BOUNDS"),
+        )
+    return functools.partial(
+        create_memoized_algorithm,
+        ALGORITHMS[algorithm_type],
+        function=modules.get_method_by_module("function", "aptitude_function"),
+        decision_variables=modules.get_method_by_module(
+            "search_space", "DECISION_VARIABLES"
+        ),
+        constraints=modules.get_method_by_module("constraints", "ARRAY_CONSTRAINTS"),
+        bounds=modules.get_method_by_module("search_space", "BOUNDS"),
+    )
+
+
 def create_evolutionary_algorithm(
-    algorithm_type: EvolutionaryAlgorithm, evolutionary_config: OptimizerConfig
+    algorithm_type: EvolutionaryAlgorithm,
+    evolutionary_config: OptimizerConfig,
+    modules: typing.Optional[ModulesHandler] = None,
+    memo_size: typing.Optional[int] = None,
 ) -> typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming]:
     """
     Create an instance of evolutionary algorithm selected with the configuration.
 
+    The problem definition is cached by namespace, algorithm and version of the
+    uploaded modules. The populations evaluated in batch aren't memoized, see
+    create_algorithm_factory.
+
     Arguments:
         - algorithm_type: string that represent the tipe of algorithm.
         - evolutionary_config: Optimization configuration that provides the methods
             needed for the algorithm.
+        - modules: handler pinned to the module versions, by default the active ones.
+        - memo_size: results kept by the memo, by default PYRISTIC_MEMO_CACHE_SIZE.
     """
-    initialize_arguments = {
-        "function": ModulesHandler().get_method_by_module(
-            "function", "aptitude_function"
-        ),
-        "decision_variables": ModulesHandler().get_method_by_module(
-            "search_space", "DECISION_VARIABLES"
-        ),
-        "constraints": ModulesHandler().get_method_by_module(
-            "constraints", "ARRAY_CONSTRAINTS"
-        ),
-        "bounds": ModulesHandler().get_method_by_module("search_space", "BOUNDS"),
-        "config": evolutionary_config,
-    }
-    if algorithm_type == "GA":
-        return Genetic(**initialize_arguments)
-    if algorithm_type == "EE":
-        return EvolutionStrategy(**initialize_arguments)
-    return EvolutionaryProgramming(**initialize_arguments)
+    algorithm_type = EvolutionaryAlgorithm(algorithm_type).value
+    modules = modules or ModulesHandler()
+    key = (
+        "algorithm",
+        modules.namespace,
+        algorithm_type,
+        tuple(modules.get_version(module) for module in PROBLEM_MODULES),
+    )
+    with PHASE_DURATION.time(phase="algorithm"):
+        factory = EVOLUTIONARY_CACHE.get_or_create(
+            key,
+            functools.partial(create_algorithm_factory, algorithm_type, modules),
+            tags=[(modules.namespace, module) for module in PROBLEM_MODULES],
+        )
+        if modules.has_method("function", "batch_aptitude_function"):
+            return factory(config=evolutionary_config)
+        return factory(
+            config=evolutionary_config,
+            memo_size=MEMO_CACHE_SIZE if memo_size is None else memo_size,
+        )
+
+
+def run_evolutionary_algorithm(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    algorithm_type: EvolutionaryAlgorithm,
+    config: EvolutionaryOperators,
+    num_executions: int,
+    arguments: dict,
+    modules: typing.Optional[ModulesHandler] = None,
+    islands: typing.Optional[dict] = None,
+    memo: typing.Optional[int] = None,
+    **execution_options,
+) -> dict:
+    """
+    Create the evolutionary algorithm and perform it several times.
+
+    With islands, every execution evolves several populations in the workers, so
+    the executions are performed one after another, see IslandModel.
+
+    Arguments:
+        - algorithm_type: string that represent the type of algorithm.
+        - config: dictionary with the operators desired.
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments: dictionary with the key arguments for the optimize method.
+        - modules: handler pinned to the module versions, by default the active ones.
+        - islands: key arguments of IslandModel.
+        - memo: results kept by the memo of every execution, by default
+            PYRISTIC_MEMO_CACHE_SIZE, 0 turns it off.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    modules = modules or ModulesHandler()
+    algorithm_name = EvolutionaryAlgorithm(algorithm_type).value
+    with modules.in_use(), track_run(algorithm_name):
+        LOGGER.info("Creating configuration for %s", algorithm_type)
+        configuration = create_evolutionary_config(algorithm_type, config, modules)
+        LOGGER.debug("\n%s", configuration)
+        evolutionary_algorithm = create_evolutionary_algorithm(
+            algorithm_type, configuration, modules, memo
+        )
+        if islands:
+            evolutionary_algorithm = IslandModel(
+                evolutionary_algorithm, modules, **islands
+            )
+            execution_options = {**execution_options, "workers": 1}
+        LOGGER.info("Execute %s - %s", algorithm_type, num_executions)
+        return run_executions(
+            evolutionary_algorithm,
+            num_executions,
+            [],
+            {**arguments, "verbose": False},
+            modules=modules,
+            **execution_options,
+        )
+
+
+def count_combinations(batch: EvolutionaryBatch) -> int:
+    """
+    Count the combinations of the batch without creating them.
+
+    Arguments:
+        - batch: base arguments and operators with the combinations and grid to sweep.
+    """
+    return max(1, len(batch.combinations or [])) * math.prod(
+        len(values) for values in batch.grid.values()
+    )
+
+
+def expand_combinations(batch: EvolutionaryBatch) -> typing.List[dict]:
+    """
+    Create the arguments and operators of every combination in the batch.
+
+    Arguments:
+        - batch: base arguments and operators with the combinations and grid to sweep.
+    """
+    grid_points = [
+        dict(zip(batch.grid, values))
+        for values in itertools.product(*batch.grid.values())
+    ]
+    return [
+        {
+            "arguments": {**batch.arguments, **combination.arguments, **grid_point},
+            "methods": {**batch.methods, **combination.methods},
+        }
+        for combination in batch.combinations or [EvolutionaryCombination()]
+        for grid_point in grid_points
+    ]
+
+
+def run_evolutionary_batch(
+    algorithm_type: EvolutionaryAlgorithm,
+    combinations: typing.List[dict],
+    num_executions: int,
+    modules: typing.Optional[ModulesHandler] = None,
+    **execution_options,
+) -> typing.Iterator[dict]:
+    """
+    Perform every combination with the same modules and yield them as they finish.
+
+    The configurations are taken from the cache, so the combinations that share
+    operators don't build them again.
+
+    Arguments:
+        - algorithm_type: string that represent the type of algorithm.
+        - combinations: list of dictionaries with the arguments and methods.
+        - num_executions: integer number that is the number of times executed every
+            combination.
+        - modules: handler pinned to the module versions, by default the active ones.
+        - execution_options: key arguments forwarded to run_batch_executions.
+    """
+    modules = modules or ModulesHandler()
+    algorithm_name = EvolutionaryAlgorithm(algorithm_type).value
+    with modules.in_use(), track_run(algorithm_name):
+        LOGGER.info(
+            "Creating %s combinations for %s", len(combinations), algorithm_type
+        )
+        tasks = [
+            (
+                create_evolutionary_algorithm(
+                    algorithm_type,
+                    create_evolutionary_config(
+                        algorithm_type, combination["methods"], modules
+                    ),
+                    modules,
+                ),
+                [],
+                {**combination["arguments"], "verbose": False},
+            )
+            for combination in combinations
+        ]
+        for index, statistics in run_batch_executions(
+            tasks, num_executions, modules=modules, **execution_options
+        ):
+            LOGGER.info("Combination %s of %s finished", index, algorithm_type)
+            yield {
+                "combination": index,
+                "arguments": combinations[index]["arguments"],
+                "methods": {
+                    operator_type: operator.dict()
+                    for operator_type, operator in combinations[index][
+                        "methods"
+                    ].items()
+                },
+                "statistics": statistics,
+            }
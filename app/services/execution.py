@@ -0,0 +1,974 @@
+"""Execution engine that spreads the repetitions of an optimizer over a process pool."""
+import logging
+import logging.handlers
+import collections
+import math
+import time
+import queue
+import pickle
+import random
+import itertools
+import typing
+import functools
+import threading
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from app.utils.cache import LRUCache, Memo
+from app.utils.generic import ModulesHandler, ForwardHandler, create_worker_logger
+from app.services.checkpoints import (
+    Checkpoint,
+    ExecutionCheckpoint,
+    replace_method,
+    resume_execution,
+    set_random_state,
+)
+from app.services.history import HistoryRecorder
+from app.utils.metrics import (
+    RUNS,
+    RUN_FAILURES,
+    RUN_CANCELLATIONS,
+    EXECUTIONS,
+    OPTIMIZATIONS_IN_FLIGHT,
+    PHASE_DURATION,
+)
+from app.constants import (
+    EXECUTION_WORKERS,
+    EXECUTION_START_METHOD,
+    PROGRESS_INTERVAL_SECONDS,
+)
+
+CANCEL_POLL_SECONDS = 0.5
+WORKER_TASKS_SIZE = 8
+RUN_IDS = itertools.count()
+WORKER_POOL = {
+    "pool": None,
+    "manager": None,
+    "listener": None,
+    "lock": threading.Lock(),
+}
+WORKER_TASKS = LRUCache(WORKER_TASKS_SIZE)
+
+
+class WorkerTaskMissing(Exception):
+    """The worker doesn't have the task, the parent submits it with its payload."""
+
+
+class ExecutionCancelled(Exception):
+    """The executions were stopped before finishing."""
+
+
+class ExecutionStopped(Exception):
+    """An evolutionary algorithm reached one of its stopping criteria."""
+
+
+class StoppingCriteria:
+    """Decide when an execution stops before its generations or temperature end."""
+
+    def __init__(
+        self,
+        max_time: typing.Optional[float] = None,
+        target_value: typing.Optional[float] = None,
+        patience: typing.Optional[int] = None,
+    ):
+        """
+        Start the clock of the execution.
+
+        Arguments:
+            - max_time: seconds that the execution can take.
+            - target_value: aptitude that is good enough to stop.
+            - patience: generations or temperature steps without improving the best
+                aptitude before stopping.
+        """
+        self.max_time = max_time
+        self.target_value = target_value
+        self.patience = patience
+        self.start_time = time.time()
+        self.best_f = math.inf
+        self.steps_without_improvement = 0
+        self.reason = None
+
+    def check(self, get_best_f: typing.Callable[[], float]) -> bool:
+        """
+        Register a finished step and check if the execution must stop.
+
+        Arguments:
+            - get_best_f: callable that returns the best aptitude found so far, it
+                is only called when the target value or the patience are used.
+        """
+        if self.target_value is not None or self.patience is not None:
+            best_f = get_best_f()
+            if best_f < self.best_f:
+                self.best_f = best_f
+                self.steps_without_improvement = 0
+            else:
+                self.steps_without_improvement += 1
+            if self.target_value is not None and best_f <= self.target_value:
+                self.reason = "target_value"
+            elif (
+                self.patience is not None
+                and self.steps_without_improvement >= self.patience
+            ):
+                self.reason = "patience"
+        if self.reason is None:
+            self.check_time()
+        return self.reason is not None
+
+    def check_time(self) -> bool:
+        """Check if the execution must stop by its time, without finishing a step."""
+        if self.max_time is not None and time.time() - self.start_time >= self.max_time:
+            self.reason = "max_time"
+        return self.reason is not None
+
+
+class ProgressReporter:
+    """Send the progress of an execution at most once per interval."""
+
+    def __init__(
+        self,
+        execution: int,
+        send: typing.Callable[[dict], None],
+        interval: float = PROGRESS_INTERVAL_SECONDS,
+    ):
+        """
+        Start the clock of the execution.
+
+        Arguments:
+            - execution: index of the execution reported.
+            - send: callable that receives every progress event.
+            - interval: minimum seconds between two events.
+        """
+        self.execution = execution
+        self.send = send
+        self.interval = interval
+        self.start_time = time.time()
+        self.last_sent = self.start_time
+        self.last_step = 0
+
+    def step(self, step: int, get_best_f: typing.Callable[[], float]) -> None:
+        """
+        Register a finished step, the best value is computed only when it is sent.
+
+        Arguments:
+            - step: number of generations or temperature steps finished.
+            - get_best_f: callable that returns the best aptitude found so far.
+        """
+        self.last_step = step
+        now = time.time()
+        if now - self.last_sent >= self.interval:
+            self.last_sent = now
+            self.send(self.create_event(get_best_f(), now))
+
+    def finish(self, best_f: float) -> None:
+        """
+        Send the last event of the execution without throttling.
+
+        Arguments:
+            - best_f: best aptitude found by the execution.
+        """
+        self.send(self.create_event(best_f, time.time()))
+
+    def create_event(self, best_f: float, now: float) -> dict:
+        """Progress event of the execution."""
+        return {
+            "execution": self.execution,
+            "step": self.last_step,
+            "best_f": float(best_f),
+            "elapsed_time": now - self.start_time,
+        }
+
+
+def keep_generation(logger: dict, next_generation: dict) -> None:
+    """
+    Save the generation selected as the loop of the evolutionary algorithms does.
+
+    Arguments:
+        - logger: dictionary with the state of the optimizer.
+        - next_generation: result of the survivor selection.
+    """
+    logger["parent_population_x"] = next_generation.get(
+        "parent_population_x", next_generation.get("population")
+    )
+    if "parent_population_sigma" in next_generation:
+        logger["parent_population_sigma"] = next_generation["parent_population_sigma"]
+    logger["parent_population_f"] = next_generation["parent_population_f"]
+    logger["current_iter"] += 1
+
+
+def keep_best(logger: dict) -> None:
+    """
+    Save the best individual of the population as the evolutionary algorithms do.
+
+    Arguments:
+        - logger: dictionary with the state of the optimizer.
+    """
+    index = np.argmin(logger["parent_population_f"])
+    logger["best_individual"] = logger["parent_population_x"][index]
+    logger["best_f"] = logger["parent_population_f"][index]
+
+
+@contextlib.contextmanager
+def monitor_steps(
+    optimizer,
+    on_step: typing.Callable[[int, typing.Callable[[], float]], bool],
+    should_stop: typing.Optional[typing.Callable[[], bool]] = None,
+):
+    """
+    Instrument the method that the optimizer calls once per generation or step.
+
+    The evolutionary algorithms call survivor_selection every generation and
+    simulated annealing calls update_temperature every step. Other optimizers are
+    only followed when they finish.
+
+    When on_step asks to stop, the evolutionary algorithms keep the selected
+    generation and raise ExecutionStopped, while simulated annealing receives a
+    temperature below any eps to finish its loop. Simulated annealing saves its
+    best solution after update_temperature, so the best aptitude of the step also
+    considers the last neighbor evaluated: a neighbor better than the best is
+    always accepted.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - on_step: callable that receives the number of steps finished and a
+            callable that returns the best aptitude, it returns True to stop.
+        - should_stop: callable checked before every neighbor of simulated
+            annealing, even when the invalid neighbors don't finish the step, it
+            returns True to raise ExecutionStopped.
+    """
+    if hasattr(optimizer, "survivor_selection"):
+        method_name = "survivor_selection"
+        survivor_selection = optimizer.survivor_selection
+
+        def hook(**kwargs):
+            next_generation = survivor_selection(**kwargs)
+            if on_step(
+                optimizer.logger["current_iter"] + 1,
+                lambda: np.min(next_generation["parent_population_f"]),
+            ):
+                keep_generation(optimizer.logger, next_generation)
+                raise ExecutionStopped()
+            return next_generation
+
+    elif hasattr(optimizer, "update_temperature"):
+        with monitor_temperature(optimizer, on_step, should_stop):
+            yield
+        return
+    else:
+        yield
+        return
+    setattr(optimizer, method_name, hook)
+    try:
+        yield
+    finally:
+        delattr(optimizer, method_name)
+
+
+@contextlib.contextmanager
+def monitor_temperature(
+    optimizer,
+    on_step: typing.Callable[[int, typing.Callable[[], float]], bool],
+    should_stop: typing.Optional[typing.Callable[[], bool]] = None,
+):
+    """
+    Instrument the steps of simulated annealing, see monitor_steps.
+
+    Arguments:
+        - optimizer: pyristic simulated annealing.
+        - on_step: callable that receives the number of steps finished and a
+            callable that returns the best aptitude, it returns True to stop.
+        - should_stop: callable checked before every neighbor, it returns True to
+            raise ExecutionStopped.
+    """
+    update_temperature = optimizer.update_temperature
+    steps = itertools.count(1)
+    evaluated = {"f": math.inf}
+
+    def get_best_f() -> float:
+        return min(optimizer.logger["best_f"], evaluated["f"])
+
+    def hook(**kwargs):
+        temperature = update_temperature(**kwargs)
+        if on_step(next(steps), get_best_f):
+            return -math.inf
+        return temperature
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(replace_method(optimizer, "update_temperature", hook))
+        function = getattr(optimizer, "function", None)
+        if function is not None:
+
+            def evaluate(solution):
+                evaluated["f"] = function(solution)
+                return evaluated["f"]
+
+            stack.enter_context(replace_method(optimizer, "function", evaluate))
+        if should_stop is not None and hasattr(optimizer, "get_neighbor"):
+            get_neighbor = optimizer.get_neighbor
+
+            def neighbor_hook(solution, **kwargs):
+                if should_stop():
+                    raise ExecutionStopped()
+                return get_neighbor(solution, **kwargs)
+
+            stack.enter_context(
+                replace_method(optimizer, "get_neighbor", neighbor_hook)
+            )
+        yield
+
+
+def report_progress(optimizer, reporter: ProgressReporter):
+    """
+    Send the progress of the optimizer every generation or step.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - reporter: object that throttles the events of the execution.
+    """
+    return monitor_steps(optimizer, reporter.step)
+
+
+def send_to_progress_queue(progress_queue, event: dict) -> None:
+    """Send a progress event from the worker process to the parent."""
+    progress_queue.put(event)
+
+
+def prepare_worker(records) -> None:
+    """
+    Send the logs to the parent and load the problem modules when it is needed.
+
+    The forked workers already have pyristic, NumPy and the modules compiled by the
+    parent, the spawned ones compile the modules saved in the storage.
+
+    Arguments:
+        - records: queue of the log records read by the parent.
+    """
+    create_worker_logger(records)
+    if multiprocessing.get_start_method() != "fork":
+        ModulesHandler.load_storage()
+
+
+def get_worker_pool() -> ProcessPoolExecutor:
+    """Return the pool shared by every optimization, it is created the first time."""
+    with WORKER_POOL["lock"]:
+        if WORKER_POOL["pool"] is None:
+            context = multiprocessing.get_context(EXECUTION_START_METHOD)
+            if WORKER_POOL["listener"] is None:
+                WORKER_POOL["listener"] = logging.handlers.QueueListener(
+                    context.Queue(), ForwardHandler()
+                )
+                WORKER_POOL["listener"].start()
+            WORKER_POOL["pool"] = ProcessPoolExecutor(
+                max_workers=EXECUTION_WORKERS,
+                mp_context=context,
+                initializer=prepare_worker,
+                initargs=(WORKER_POOL["listener"].queue,),
+            )
+        return WORKER_POOL["pool"]
+
+
+def get_progress_queue():
+    """Create a queue that the workers of the pool can receive as an argument."""
+    with WORKER_POOL["lock"]:
+        if WORKER_POOL["manager"] is None:
+            WORKER_POOL["manager"] = multiprocessing.get_context(
+                EXECUTION_START_METHOD
+            ).Manager()
+        return WORKER_POOL["manager"].Queue()
+
+
+def start_worker_pool() -> None:
+    """Start every worker of the pool before the first optimization."""
+    if EXECUTION_WORKERS <= 1:
+        return
+    pool = get_worker_pool()
+    wait([pool.submit(time.sleep, 0.1) for _ in range(EXECUTION_WORKERS)])
+
+
+def stop_worker_pool() -> None:
+    """Stop the workers of the pool, the manager of the progress queues and the logs."""
+    with WORKER_POOL["lock"]:
+        pool, WORKER_POOL["pool"] = WORKER_POOL["pool"], None
+        manager, WORKER_POOL["manager"] = WORKER_POOL["manager"], None
+        listener, WORKER_POOL["listener"] = WORKER_POOL["listener"], None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+    if manager is not None:
+        manager.shutdown()
+    if listener is not None:
+        listener.stop()
+
+
+def discard_worker_pool(pool: ProcessPoolExecutor) -> None:
+    """
+    Forget a pool that can't run more tasks, the next optimization creates another.
+
+    Arguments:
+        - pool: pool broken by a worker that exited abruptly.
+    """
+    with WORKER_POOL["lock"]:
+        if WORKER_POOL["pool"] is pool:
+            WORKER_POOL["pool"] = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def execute_in_worker(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    task_key: tuple,
+    modules: typing.Optional[ModulesHandler],
+    payload: typing.Optional[bytes],
+    seed: int,
+    execution: int,
+    on_progress: typing.Optional[typing.Callable[[dict], None]],
+    stopping: typing.Optional[dict],
+    checkpoint: typing.Optional[ExecutionCheckpoint],
+    trace: bool = False,
+) -> dict:
+    """
+    Perform an execution of a task in a worker of the pool.
+
+    The task is unpickled once per worker and kept for the next executions, after
+    compiling the module versions that the worker doesn't have yet, see
+    get_worker_task.
+
+    Arguments:
+        - task_key: identifies the task of the optimization.
+        - modules: handler pinned to the module versions used by the task.
+        - payload: the optimizer and its arguments pickled, None when the worker
+            should have the task already.
+        - seed: integer used to seed the random generators before the execution.
+        - execution: index of the execution, it identifies the progress events.
+        - on_progress: callable that receives the progress events.
+        - stopping: key arguments of StoppingCriteria.
+        - checkpoint: file where the state of the execution is saved.
+        - trace: include the convergence of the execution.
+    """
+    task = get_worker_task(task_key, modules, payload)
+    return execute_once(
+        *task, seed, execution, on_progress, stopping, checkpoint, trace
+    )
+
+
+def get_worker_task(
+    task_key: tuple,
+    modules: typing.Optional[ModulesHandler],
+    payload: typing.Optional[bytes],
+) -> typing.Any:
+    """
+    Unpickle a task in a worker of the pool once and keep it for the next calls.
+
+    Arguments:
+        - task_key: identifies the task.
+        - modules: handler pinned to the module versions used by the task, the
+            versions that the worker doesn't have yet are compiled first.
+        - payload: the task pickled, None when the worker should have it already,
+            WorkerTaskMissing is raised when it doesn't.
+    """
+    task = WORKER_TASKS.get(task_key)
+    if task is None:
+        if payload is None:
+            raise WorkerTaskMissing(task_key)
+        if modules is not None:
+            modules.load_versions()
+        task = pickle.loads(payload)
+        WORKER_TASKS.put(task_key, task)
+    return task
+
+
+def get_execution_seeds(
+    num_executions: int, seed: typing.Optional[int] = None
+) -> typing.List[int]:
+    """
+    Create an independent seed for every execution.
+
+    Arguments:
+        - num_executions: integer number that is the number of seeds to create.
+        - seed: root seed, when it is None the seeds are taken from the OS entropy.
+    """
+    sequences = np.random.SeedSequence(seed).spawn(num_executions)
+    return [int(sequence.generate_state(1)[0]) for sequence in sequences]
+
+
+def execute_once(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals
+    optimizer,
+    optimizer_args: list,
+    optimizer_additional_args: dict,
+    seed: int,
+    execution: int = 0,
+    on_progress: typing.Optional[typing.Callable[[dict], None]] = None,
+    stopping: typing.Optional[dict] = None,
+    checkpoint: typing.Optional[ExecutionCheckpoint] = None,
+    trace: bool = False,
+) -> dict:
+    """
+    Perform a single execution of the optimizer.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - optimizer_args: positional arguments for the optimize method.
+        - optimizer_additional_args: key arguments for the optimize method.
+        - seed: integer used to seed the random generators before the execution.
+        - execution: index of the execution, it identifies the progress events.
+        - on_progress: callable that receives the progress events.
+        - stopping: key arguments of StoppingCriteria, the execution includes the
+            stop_reason when they are given.
+        - checkpoint: state of the execution saved periodically, the execution
+            continues from it instead of the seed when it was saved before.
+        - trace: include the convergence, the best aptitude after every generation
+            or step, a resumed execution traces the steps performed after resuming.
+
+    The hits and misses of the memo are included when the optimizer has one, see
+    cache.Memo. The batch evaluator of the optimizer, when it has one, is reset
+    so the execution starts with a new population.
+    """
+    state = None if checkpoint is None else checkpoint.load()
+    evaluator = getattr(optimizer, "evaluator", None)
+    if evaluator is not None:
+        evaluator.reset()
+    if state is None:
+        random.seed(seed)
+        np.random.seed(seed)
+    else:
+        set_random_state(state["random_state"])
+    memo = getattr(optimizer, "memo", None)
+    memo_stats = None if memo is None else memo.stats()
+    start_time = time.time()
+    if on_progress is None and not stopping and checkpoint is None and not trace:
+        optimizer.optimize(*optimizer_args, **optimizer_additional_args)
+        return add_memo_stats(
+            {
+                "execution_time": time.time() - start_time,
+                "individual_x": optimizer.logger["best_individual"],
+                "individual_f": optimizer.logger["best_f"],
+            },
+            memo,
+            memo_stats,
+        )
+    reporter = None if on_progress is None else ProgressReporter(execution, on_progress)
+    criteria = StoppingCriteria(**stopping) if stopping else None
+    convergence = []
+
+    def on_step(step: int, get_best_f: typing.Callable[[], float]) -> bool:
+        if trace:
+            convergence.append(float(get_best_f()))
+        if reporter is not None:
+            reporter.step(step, get_best_f)
+        return criteria is not None and criteria.check(get_best_f)
+
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(
+            monitor_steps(
+                optimizer,
+                on_step,
+                None if criteria is None else criteria.check_time,
+            )
+        )
+        if checkpoint is not None:
+            stack.enter_context(checkpoint.save_periodically(optimizer, state))
+        if state is not None:
+            optimizer_args, optimizer_additional_args = stack.enter_context(
+                resume_execution(
+                    optimizer, state, optimizer_args, optimizer_additional_args
+                )
+            )
+        try:
+            optimizer.optimize(*optimizer_args, **optimizer_additional_args)
+        except ExecutionStopped:
+            if hasattr(optimizer, "survivor_selection"):
+                keep_best(optimizer.logger)
+    if reporter is not None:
+        reporter.finish(optimizer.logger["best_f"])
+    result = {
+        "execution_time": time.time()
+        - start_time
+        + (0.0 if state is None else state["execution_time"]),
+        "individual_x": optimizer.logger["best_individual"],
+        "individual_f": optimizer.logger["best_f"],
+    }
+    if criteria is not None:
+        result["stop_reason"] = criteria.reason or "completed"
+    if trace:
+        result["convergence"] = np.asarray(convergence)
+    return add_memo_stats(result, memo, memo_stats)
+
+
+def add_memo_stats(
+    result: dict, memo: typing.Optional[Memo], memo_stats: typing.Optional[dict]
+) -> dict:
+    """
+    Include the hits and misses of the memo during the execution.
+
+    Arguments:
+        - result: result of the execution.
+        - memo: memo of the optimizer, None when it isn't memoized.
+        - memo_stats: stats of the memo before the execution.
+    """
+    if memo is not None:
+        result["memo"] = {
+            counter: memo.stats()[counter] - memo_stats[counter]
+            for counter in ["hits", "misses"]
+        }
+    return result
+
+
+def compute_statistics(executions: typing.List[dict], verbose: bool = True) -> dict:
+    """
+    Merge the executions in the same statistics that pyristic get_stats returns.
+
+    The criterion that stopped every execution is included when they were
+    performed with stopping criteria, and the hits and misses of the memo when the
+    optimizer has one.
+
+    Arguments:
+        - executions: list with the result of every execution.
+        - verbose: include the information of every execution.
+    """
+    data_by_execution = {
+        key: [execution[key] for execution in executions]
+        for key in ["execution_time", "individual_x", "individual_f"]
+    }
+    ind_worst = np.argmax(data_by_execution["individual_f"])
+    ind_best = np.argmin(data_by_execution["individual_f"])
+    stats = {
+        "Worst solution": {
+            "x": data_by_execution["individual_x"][ind_worst],
+            "f": data_by_execution["individual_f"][ind_worst],
+        },
+        "Best solution": {
+            "x": data_by_execution["individual_x"][ind_best],
+            "f": data_by_execution["individual_f"][ind_best],
+        },
+        "Mean": np.mean(data_by_execution["individual_f"]),
+        "Standard deviation": np.std(data_by_execution["individual_f"]),
+        "Median": np.median(data_by_execution["individual_f"]),
+    }
+    if verbose:
+        stats.update(data_by_execution)
+    if "stop_reason" in executions[0]:
+        stats["stop_reason"] = [execution["stop_reason"] for execution in executions]
+    if "memo" in executions[0]:
+        stats["memo"] = {
+            counter: sum(execution["memo"][counter] for execution in executions)
+            for counter in ["hits", "misses"]
+        }
+    return stats
+
+
+def _run_serial(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    tasks: list,
+    seeds: list,
+    monitor: tuple,
+    stopping: typing.Optional[dict],
+    checkpoint: typing.Optional[Checkpoint],
+    trace: bool,
+) -> typing.Iterator[typing.Tuple[int, typing.List[dict]]]:
+    """Perform the executions of every task one after another in this process."""
+    on_execution, cancel_event, on_progress = monitor
+    finished = {} if checkpoint is None else checkpoint.load_results()
+    for task_index, task in enumerate(tasks):
+        executions = []
+        for execution, execution_seed in enumerate(seeds):
+            if (task_index, execution) in finished:
+                executions.append(finished[(task_index, execution)])
+                on_execution(executions[-1])
+                continue
+            if cancel_event.is_set():
+                raise ExecutionCancelled()
+            executions.append(
+                execute_once(
+                    *task,
+                    execution_seed,
+                    task_index * len(seeds) + execution,
+                    on_progress,
+                    stopping,
+                    None
+                    if checkpoint is None
+                    else checkpoint.get_execution(task_index, execution),
+                    trace,
+                )
+            )
+            if checkpoint is not None:
+                checkpoint.save_result(task_index, execution, executions[-1])
+            on_execution(executions[-1])
+        yield task_index, executions
+
+
+def _drain_progress_queue(progress_queue, on_progress) -> None:
+    """Forward the progress events received from the workers."""
+    if progress_queue is None:
+        return
+    while True:
+        try:
+            on_progress(progress_queue.get_nowait())
+        except queue.Empty:
+            return
+
+
+def _run_in_pool(  # pylint: disable=too-many-arguments,too-many-positional-arguments,too-many-locals,too-many-branches
+    tasks: list,
+    seeds: list,
+    monitor: tuple,
+    stopping: typing.Optional[dict],
+    workers: int,
+    modules: typing.Optional[ModulesHandler],
+    checkpoint: typing.Optional[Checkpoint],
+    trace: bool,
+) -> typing.Iterator[typing.Tuple[int, typing.List[dict]]]:
+    """
+    Perform the executions of every task in the shared pool keeping the seed order.
+
+    Every task is pickled once and at most workers executions are submitted at the
+    same time, so the optimizations running together share the pool. The executions
+    are submitted with the key of their task only, the payload is sent again just
+    to the workers that don't have the task yet.
+    """
+    on_execution, cancel_event, on_progress = monitor
+    progress_queue = None if on_progress is None else get_progress_queue()
+    send_progress = (
+        None
+        if progress_queue is None
+        else functools.partial(send_to_progress_queue, progress_queue)
+    )
+    run_id = next(RUN_IDS)
+    payloads = [pickle.dumps(task) for task in tasks]
+    if modules is not None:
+        modules = modules.snapshot()
+    executions = [[None] * len(seeds) for _ in tasks]
+    remaining = [len(seeds)] * len(tasks)
+    finished = {} if checkpoint is None else checkpoint.load_results()
+    for (task_index, execution), result in finished.items():
+        executions[task_index][execution] = result
+        on_execution(result)
+        remaining[task_index] -= 1
+    for task_index, task_executions in enumerate(executions):
+        if not remaining[task_index]:
+            yield task_index, task_executions
+    submissions = collections.deque(
+        (task_index, execution, False)
+        for task_index in range(len(tasks))
+        for execution in range(len(seeds))
+        if (task_index, execution) not in finished
+    )
+    pool = get_worker_pool()
+    futures = {}
+    try:
+        while True:
+            while submissions and len(futures) < workers:
+                task_index, execution, with_payload = submissions.popleft()
+                future = pool.submit(
+                    execute_in_worker,
+                    (run_id, task_index),
+                    modules,
+                    payloads[task_index] if with_payload else None,
+                    seeds[execution],
+                    task_index * len(seeds) + execution,
+                    send_progress,
+                    stopping,
+                    None
+                    if checkpoint is None
+                    else checkpoint.get_execution(task_index, execution),
+                    trace,
+                )
+                futures[future] = (task_index, execution)
+            if not futures:
+                break
+            if cancel_event.is_set():
+                raise ExecutionCancelled()
+            done, _ = wait(
+                futures, timeout=CANCEL_POLL_SECONDS, return_when=FIRST_COMPLETED
+            )
+            _drain_progress_queue(progress_queue, on_progress)
+            for future in done:
+                task_index, execution = futures.pop(future)
+                try:
+                    executions[task_index][execution] = future.result()
+                except WorkerTaskMissing:
+                    submissions.appendleft((task_index, execution, True))
+                    continue
+                if checkpoint is not None:
+                    checkpoint.save_result(
+                        task_index, execution, executions[task_index][execution]
+                    )
+                on_execution(executions[task_index][execution])
+                remaining[task_index] -= 1
+                if not remaining[task_index]:
+                    yield task_index, executions[task_index]
+    except BrokenProcessPool:
+        discard_worker_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+        _drain_progress_queue(progress_queue, on_progress)
+
+
+def _create_monitor(
+    on_execution: typing.Optional[typing.Callable[[dict], None]],
+    cancel_event: typing.Optional[threading.Event],
+    on_progress: typing.Optional[typing.Callable[[dict], None]],
+) -> tuple:
+    """Group the callbacks that follow the executions."""
+
+    def execution_done(execution: dict) -> None:
+        EXECUTIONS.inc()
+        PHASE_DURATION.observe(execution["execution_time"], phase="execution")
+        if on_execution is not None:
+            on_execution(execution)
+
+    return (execution_done, cancel_event or threading.Event(), on_progress)
+
+
+@contextlib.contextmanager
+def track_run(algorithm: str):
+    """
+    Count the optimization and keep it as in flight in the metrics.
+
+    Arguments:
+        - algorithm: name of the algorithm performed.
+    """
+    RUNS.inc(algorithm=algorithm)
+    OPTIMIZATIONS_IN_FLIGHT.inc()
+    try:
+        yield
+    except ExecutionCancelled:
+        RUN_CANCELLATIONS.inc(algorithm=algorithm)
+        raise
+    except Exception:
+        RUN_FAILURES.inc(algorithm=algorithm)
+        raise
+    finally:
+        OPTIMIZATIONS_IN_FLIGHT.dec()
+
+
+def run_executions(  # pylint: disable=too-many-arguments,too-many-locals
+    optimizer,
+    num_executions: int,
+    optimizer_args: list,
+    optimizer_additional_args: dict,
+    *,
+    seed: typing.Optional[int] = None,
+    workers: int = EXECUTION_WORKERS,
+    verbose: bool = True,
+    on_execution: typing.Optional[typing.Callable[[dict], None]] = None,
+    cancel_event: typing.Optional[threading.Event] = None,
+    on_progress: typing.Optional[typing.Callable[[dict], None]] = None,
+    stopping: typing.Optional[dict] = None,
+    modules: typing.Optional[ModulesHandler] = None,
+    checkpoint: typing.Optional[Checkpoint] = None,
+    history: typing.Optional[HistoryRecorder] = None,
+    trace: bool = False,
+) -> dict:
+    """
+    Perform the optimizer several times and return its statistics.
+
+    The executions are independent, so they run in the pool of warm workers shared
+    by the optimizations when more than one worker is available. Every execution
+    receives its own seed, then the results are the same whatever the number of
+    workers.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - optimizer_args: positional arguments for the optimize method.
+        - optimizer_additional_args: key arguments for the optimize method.
+        - seed: integer that makes the executions reproducible.
+        - workers: maximum number of processes used.
+        - verbose: include the information of every execution.
+        - on_execution: callback that receives every finished execution.
+        - cancel_event: when it is set, the pending executions are discarded and
+            ExecutionCancelled is raised.
+        - on_progress: callback that receives the progress of the executions, at
+            most one event per execution every PROGRESS_INTERVAL_SECONDS.
+        - stopping: dictionary with the max_time, target_value and patience that
+            stop every execution early.
+        - modules: handler of the modules used by the optimizer, the workers of
+            the pool compile the versions they don't have yet.
+        - checkpoint: folder where the finished executions and the state of the
+            running ones are saved, the executions found there aren't repeated.
+        - history: recorder that saves the executions in the history.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+    """
+    ((_, statistics),) = run_batch_executions(
+        [(optimizer, optimizer_args, optimizer_additional_args)],
+        num_executions,
+        seed=seed,
+        workers=workers,
+        verbose=verbose,
+        on_execution=on_execution,
+        cancel_event=cancel_event,
+        on_progress=on_progress,
+        stopping=stopping,
+        modules=modules,
+        checkpoint=checkpoint,
+        history=history,
+        trace=trace,
+    )
+    return statistics
+
+
+def run_batch_executions(  # pylint: disable=too-many-arguments,too-many-locals
+    tasks: typing.List[tuple],
+    num_executions: int,
+    *,
+    seed: typing.Optional[int] = None,
+    workers: int = EXECUTION_WORKERS,
+    verbose: bool = True,
+    on_execution: typing.Optional[typing.Callable[[dict], None]] = None,
+    cancel_event: typing.Optional[threading.Event] = None,
+    on_progress: typing.Optional[typing.Callable[[dict], None]] = None,
+    stopping: typing.Optional[dict] = None,
+    modules: typing.Optional[ModulesHandler] = None,
+    checkpoint: typing.Optional[Checkpoint] = None,
+    history: typing.Optional[HistoryRecorder] = None,
+    trace: bool = False,
+) -> typing.Iterator[typing.Tuple[int, dict]]:
+    """
+    Perform several optimizers sharing the same workers.
+
+    The statistics of every task are yielded with its index as soon as its executions
+    finish. All the tasks use the same seeds, so their differences don't come from
+    the random numbers. The executions are numbered consecutively across the tasks
+    in the progress events.
+
+    Arguments:
+        - tasks: list of tuples with the optimizer, the positional arguments and the
+            key arguments for the optimize method.
+        - num_executions: integer number that is the number of times executed every task.
+        - seed: integer that makes the executions reproducible.
+        - workers: maximum number of processes used.
+        - verbose: include the information of every execution.
+        - on_execution: callback that receives every finished execution.
+        - cancel_event: when it is set, the pending executions are discarded and
+            ExecutionCancelled is raised.
+        - on_progress: callback that receives the progress of the executions, at
+            most one event per execution every PROGRESS_INTERVAL_SECONDS.
+        - stopping: dictionary with the max_time, target_value and patience that
+            stop every execution early.
+        - modules: handler of the modules used by the optimizer, the workers of
+            the pool compile the versions they don't have yet.
+        - checkpoint: folder where the finished executions and the state of the
+            running ones are saved, the executions found there aren't repeated.
+        - history: recorder that saves the executions of every task when the task
+            finishes.
+        - trace: save the convergence of every execution in the history, the
+            executions are slower because the best aptitude is read every step.
+    """
+    started_at = time.time()
+    seeds = get_execution_seeds(num_executions, seed)
+    monitor = _create_monitor(on_execution, cancel_event, on_progress)
+    workers = min(workers, num_executions * len(tasks))
+    trace = trace and history is not None
+    if workers <= 1:
+        finished_tasks = _run_serial(tasks, seeds, monitor, stopping, checkpoint, trace)
+    else:
+        finished_tasks = _run_in_pool(
+            tasks, seeds, monitor, stopping, workers, modules, checkpoint, trace
+        )
+    for task_index, executions in finished_tasks:
+        with PHASE_DURATION.time(phase="statistics"):
+            statistics = compute_statistics(executions, verbose)
+        if history is not None:
+            with PHASE_DURATION.time(phase="history"):
+                history.record(task_index, executions, seeds, started_at)
+        yield task_index, statistics
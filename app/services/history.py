@@ -0,0 +1,514 @@
+"""History of the optimizations performed, so they can be compared later."""
+import os
+import json
+import math
+import time
+import uuid
+import shutil
+import typing
+import sqlite3
+import logging
+import contextlib
+import numpy as np
+from app.constants import HISTORY_FOLDER, HISTORY_POINTS, MAX_STORED_RUNS
+from app.models import HistoryOrder
+from app.utils.responses import dumps
+
+LOGGER = logging.getLogger(__name__)
+DATABASE_FILE = "history.sqlite"
+JSON_COLUMNS = ["seed", "arguments", "methods", "stopping", "islands", "modules"]
+FILTERS = {
+    "algorithm": "algorithm = ?",
+    "job_id": "job_id = ?",
+    "module": "modules LIKE ?",
+    "since": "started_at >= ?",
+    "until": "started_at <= ?",
+    "max_best_f": "best_f <= ?",
+}
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    job_id TEXT,
+    algorithm TEXT NOT NULL,
+    num_executions INTEGER NOT NULL,
+    seed TEXT NOT NULL,
+    arguments TEXT NOT NULL,
+    methods TEXT NOT NULL,
+    stopping TEXT NOT NULL,
+    islands TEXT NOT NULL,
+    modules TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    finished_at REAL NOT NULL,
+    execution_time REAL NOT NULL,
+    steps INTEGER NOT NULL,
+    best_f REAL,
+    worst_f REAL,
+    mean_f REAL,
+    std_f REAL,
+    median_f REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_namespace ON runs (namespace, started_at);
+"""
+
+
+@contextlib.contextmanager
+def connect() -> typing.Iterator[sqlite3.Connection]:
+    """Open the database of the history, the changes are committed at the end."""
+    os.makedirs(HISTORY_FOLDER, exist_ok=True)
+    connection = sqlite3.connect(os.path.join(HISTORY_FOLDER, DATABASE_FILE), 30)
+    connection.row_factory = sqlite3.Row
+    try:
+        with connection:
+            connection.executescript(SCHEMA)
+            yield connection
+    finally:
+        connection.close()
+
+
+def get_run_folder(namespace: str, run_id: str) -> str:
+    """
+    Location where the arrays of a run are saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+    """
+    return os.path.join(HISTORY_FOLDER, namespace, run_id)
+
+
+def stack_values(values: list) -> typing.Optional[np.ndarray]:
+    """
+    Join the values of the executions in a numeric array, None when they differ in shape.
+
+    Arguments:
+        - values: the value of every execution.
+    """
+    try:
+        array = np.asarray(values)
+    except ValueError:
+        return None
+    return None if array.dtype == object else array
+
+
+def stack_traces(traces: typing.List[np.ndarray]) -> np.ndarray:
+    """
+    Join the convergence of the executions filling with nan the steps not performed.
+
+    Arguments:
+        - traces: best aptitude after every step of every execution.
+    """
+    convergence = np.full(
+        (len(traces), max((len(trace) for trace in traces), default=0)), np.nan
+    )
+    for index, trace in enumerate(traces):
+        convergence[index, : len(trace)] = trace
+    return convergence
+
+
+class HistoryRecorder:
+    """Save the runs of an optimization in the history when they finish."""
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        namespace: str,
+        modules: typing.Dict[str, str],
+        requests: typing.List[dict],
+        job_id: typing.Optional[str] = None,
+        seed: typing.Optional[int] = None,
+    ):
+        """
+        Keep what identifies the runs of the optimization.
+
+        Arguments:
+            - namespace: string that isolates the modules of a user.
+            - modules: version of every module used, see ModulesHandler.versions.
+            - requests: algorithm, num_executions, arguments, methods, stopping and
+                islands of every task performed.
+            - job_id: identifier of the job that performs the optimization.
+            - seed: integer number that makes the executions reproducible.
+        """
+        self.namespace = namespace
+        self.modules = modules
+        self.requests = requests
+        self.job_id = job_id
+        self.seed = seed
+
+    def record(
+        self,
+        task_index: int,
+        executions: typing.List[dict],
+        seeds: typing.List[int],
+        started_at: float,
+    ) -> typing.Optional[str]:
+        """
+        Save the executions of a task and return the identifier of the run.
+
+        The arrays of the executions are saved before the row of the run, so the
+        runs found in the database are complete. A run that can't be saved is
+        logged without failing the optimization.
+
+        Arguments:
+            - task_index: index of the task in the requests.
+            - executions: result of every execution with its convergence.
+            - seeds: seed of every execution.
+            - started_at: time when the executions started.
+        """
+        run_id = uuid.uuid4().hex
+        request = self.requests[task_index]
+        try:
+            individual_f = save_arrays(
+                get_run_folder(self.namespace, run_id), executions, seeds
+            )
+            row = {
+                "run_id": run_id,
+                "namespace": self.namespace,
+                "job_id": self.job_id,
+                "algorithm": request["algorithm"],
+                "num_executions": request["num_executions"],
+                "seed": self.seed,
+                "arguments": request["arguments"],
+                "methods": request.get("methods", {}),
+                "stopping": request.get("stopping") or {},
+                "islands": request.get("islands"),
+                "modules": self.modules,
+                "started_at": started_at,
+                "finished_at": time.time(),
+                "execution_time": float(
+                    sum(execution["execution_time"] for execution in executions)
+                ),
+                "steps": max(
+                    (len(execution.get("convergence", [])) for execution in executions),
+                    default=0,
+                ),
+                "best_f": float(np.min(individual_f)),
+                "worst_f": float(np.max(individual_f)),
+                "mean_f": float(np.mean(individual_f)),
+                "std_f": float(np.std(individual_f)),
+                "median_f": float(np.median(individual_f)),
+            }
+            for column in JSON_COLUMNS:
+                row[column] = dumps(row[column]).decode()
+            with connect() as connection:
+                connection.execute(
+                    f"INSERT INTO runs ({', '.join(row)}) "
+                    f"VALUES ({', '.join(['?'] * len(row))})",
+                    tuple(row.values()),
+                )
+            forget_old_runs(self.namespace)
+        except (OSError, TypeError, sqlite3.Error) as exc:
+            LOGGER.error("The run %s wasn't saved in the history: %s", run_id, exc)
+            return None
+        return run_id
+
+
+def save_arrays(folder: str, executions: typing.List[dict], seeds: list) -> np.ndarray:
+    """
+    Save the arrays of the executions as numpy files and return their aptitudes.
+
+    The solutions are only saved when all of them have the same shape.
+
+    Arguments:
+        - folder: location of the run.
+        - executions: result of every execution with its convergence.
+        - seeds: seed of every execution.
+    """
+    arrays = {
+        "individual_f": np.asarray(
+            [execution["individual_f"] for execution in executions], dtype=float
+        ),
+        "execution_time": np.asarray(
+            [execution["execution_time"] for execution in executions], dtype=float
+        ),
+        "seeds": np.asarray(seeds, dtype=np.int64),
+        "individual_x": stack_values(
+            [execution["individual_x"] for execution in executions]
+        ),
+        "convergence": stack_traces(
+            [execution.get("convergence", []) for execution in executions]
+        ),
+    }
+    temporal_folder = f"{folder}.tmp"
+    os.makedirs(temporal_folder, exist_ok=True)
+    for name, array in arrays.items():
+        if array is not None:
+            np.save(os.path.join(temporal_folder, f"{name}.npy"), array)
+    os.replace(temporal_folder, folder)
+    return arrays["individual_f"]
+
+
+def to_run(row: sqlite3.Row) -> dict:
+    """
+    Convert a row of the database in the summary of a run.
+
+    Arguments:
+        - row: row of the runs table.
+    """
+    run = dict(row)
+    for column in JSON_COLUMNS:
+        run[column] = json.loads(run[column])
+    return run
+
+
+def list_runs(  # pylint: disable=too-many-arguments
+    namespace: str,
+    *,
+    order_by: HistoryOrder = HistoryOrder.STARTED_AT,
+    descending: bool = True,
+    offset: int = 0,
+    limit: int = 100,
+    **filters,
+) -> dict:
+    """
+    Find the runs of the namespace without reading their arrays.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - order_by: column that sorts the runs.
+        - descending: sort from the highest value.
+        - offset: number of runs skipped.
+        - limit: maximum number of runs returned.
+        - filters: algorithm, job_id, module version, since and until timestamps
+            of the start and max_best_f, the filters with None are ignored.
+    """
+    conditions = ["namespace = ?"]
+    parameters = [namespace]
+    for name, value in filters.items():
+        if value is None:
+            continue
+        conditions.append(FILTERS[name])
+        parameters.append(f'%"{value}"%' if name == "module" else value)
+    where = " AND ".join(conditions)
+    with connect() as connection:
+        total = connection.execute(
+            f"SELECT COUNT(*) FROM runs WHERE {where}", parameters
+        ).fetchone()[0]
+        rows = connection.execute(
+            f"SELECT * FROM runs WHERE {where} "
+            f"ORDER BY {HistoryOrder(order_by).value} {'DESC' if descending else 'ASC'} "
+            "LIMIT ? OFFSET ?",
+            [*parameters, limit, offset],
+        ).fetchall()
+    return {"total": total, "runs": [to_run(row) for row in rows]}
+
+
+def get_run(namespace: str, run_id: str) -> dict:
+    """
+    Return the summary of a run, KeyError is raised when it isn't in the history.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+    """
+    with connect() as connection:
+        row = connection.execute(
+            "SELECT * FROM runs WHERE namespace = ? AND run_id = ?",
+            (namespace, run_id),
+        ).fetchone()
+    if row is None:
+        raise KeyError(run_id)
+    return to_run(row)
+
+
+def load_array(namespace: str, run_id: str, name: str) -> typing.Optional[np.ndarray]:
+    """
+    Map an array of a run from the disk without reading it, None when it wasn't saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+        - name: individual_f, execution_time, seeds, individual_x or convergence.
+    """
+    file_path = os.path.join(get_run_folder(namespace, run_id), f"{name}.npy")
+    if not os.path.exists(file_path):
+        return None
+    return np.load(file_path, mmap_mode="r")
+
+
+def get_run_details(namespace: str, run_id: str) -> dict:
+    """
+    Return the summary of a run with the aptitude, time and seed of every execution.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+    """
+    run = get_run(namespace, run_id)
+    individual_f = np.asarray(load_array(namespace, run_id, "individual_f"))
+    individual_x = load_array(namespace, run_id, "individual_x")
+    run["best_x"] = (
+        None
+        if individual_x is None
+        else np.asarray(individual_x[np.argmin(individual_f)])
+    )
+    for name in ["individual_f", "execution_time", "seeds"]:
+        run[name] = np.asarray(load_array(namespace, run_id, name))
+    return run
+
+
+def get_step_indexes(
+    steps: int, start: int, stop: typing.Optional[int], step: typing.Optional[int]
+) -> slice:
+    """
+    Select the steps of a convergence, by default at most HISTORY_POINTS of them.
+
+    Arguments:
+        - steps: number of steps of the convergence.
+        - start: index of the first step.
+        - stop: index after the last step, the end by default.
+        - step: distance between two steps selected.
+    """
+    stop = steps if stop is None else min(stop, steps)
+    if step is None:
+        step = max(math.ceil((stop - start) / HISTORY_POINTS), 1)
+    return slice(start, stop, step)
+
+
+def get_convergence(  # pylint: disable=too-many-arguments
+    namespace: str,
+    run_id: str,
+    executions: typing.Optional[typing.List[int]] = None,
+    *,
+    start: int = 0,
+    stop: typing.Optional[int] = None,
+    step: typing.Optional[int] = None,
+) -> dict:
+    """
+    Read some steps of the convergence of the executions of a run.
+
+    Only the steps selected are read from the disk. The steps are numbered from
+    1, and the steps that an execution didn't perform are nan.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+        - executions: indexes of the executions, all of them by default.
+        - start: index of the first step.
+        - stop: index after the last step, the end by default.
+        - step: distance between two steps, by default at most HISTORY_POINTS
+            steps are returned.
+
+    Raises KeyError when the run isn't in the history and IndexError when an
+    execution doesn't exist.
+    """
+    get_run(namespace, run_id)
+    convergence = load_array(namespace, run_id, "convergence")
+    if executions is None:
+        executions = list(range(convergence.shape[0]))
+    for execution in executions:
+        if not 0 <= execution < convergence.shape[0]:
+            raise IndexError(f"The run {run_id} has no execution {execution}.")
+    indexes = get_step_indexes(convergence.shape[1], start, stop, step)
+    return {
+        "run_id": run_id,
+        "executions": executions,
+        "steps": np.arange(convergence.shape[1])[indexes] + 1,
+        "convergence": np.asarray(convergence[executions, indexes]),
+    }
+
+
+def summarize_convergence(
+    convergence: np.ndarray, points: int = HISTORY_POINTS
+) -> dict:
+    """
+    Return the best, median and worst aptitude of the executions at some steps.
+
+    Arguments:
+        - convergence: convergence of the executions mapped from the disk.
+        - points: maximum number of steps summarized.
+    """
+    indexes = get_step_indexes(
+        convergence.shape[1], 0, None, max(math.ceil(convergence.shape[1] / points), 1)
+    )
+    columns = np.asarray(convergence[:, indexes])
+    if not columns.size:
+        return {"steps": [], "best": [], "median": [], "worst": []}
+    return {
+        "steps": np.arange(convergence.shape[1])[indexes] + 1,
+        "best": np.nanmin(columns, axis=0),
+        "median": np.nanmedian(columns, axis=0),
+        "worst": np.nanmax(columns, axis=0),
+    }
+
+
+def get_probability_better(first: np.ndarray, second: np.ndarray) -> float:
+    """
+    Probability that an execution of the first run finds a lower aptitude than one of the second.
+
+    It is the Vargha-Delaney A statistic, the ties count as a half.
+
+    Arguments:
+        - first: aptitude of the executions of the first run.
+        - second: aptitude of the executions of the second run.
+    """
+    second = np.sort(second)
+    lower = np.searchsorted(second, first, side="left")
+    higher = np.searchsorted(second, first, side="right")
+    better = np.sum(len(second) - higher) + 0.5 * np.sum(higher - lower)
+    return float(better / (len(first) * len(second)))
+
+
+def compare_runs(
+    namespace: str, run_ids: typing.List[str], points: int = HISTORY_POINTS
+) -> dict:
+    """
+    Compare the runs with the first one, reading only the steps summarized.
+
+    Every run includes the summary of its convergence and the probability that
+    its executions find a lower aptitude than the executions of the first run.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_ids: identifiers of the runs, the first one is the baseline.
+        - points: maximum number of steps summarized.
+    """
+    runs = [get_run(namespace, run_id) for run_id in run_ids]
+    baseline = np.asarray(load_array(namespace, run_ids[0], "individual_f"))
+    for run in runs:
+        run["probability_better"] = get_probability_better(
+            np.asarray(load_array(namespace, run["run_id"], "individual_f")), baseline
+        )
+        run["convergence"] = summarize_convergence(
+            load_array(namespace, run["run_id"], "convergence"), points
+        )
+    return {"baseline": run_ids[0], "runs": runs}
+
+
+def delete_run(namespace: str, run_id: str) -> None:
+    """
+    Remove a run from the history, KeyError is raised when it isn't there.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - run_id: identifier of the run.
+    """
+    with connect() as connection:
+        deleted = connection.execute(
+            "DELETE FROM runs WHERE namespace = ? AND run_id = ?", (namespace, run_id)
+        ).rowcount
+    if not deleted:
+        raise KeyError(run_id)
+    shutil.rmtree(get_run_folder(namespace, run_id), ignore_errors=True)
+
+
+def forget_old_runs(namespace: str) -> None:
+    """
+    Remove the oldest runs of the namespace when there are too many.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+    """
+    with connect() as connection:
+        run_ids = [
+            row["run_id"]
+            for row in connection.execute(
+                "SELECT run_id FROM runs WHERE namespace = ? "
+                "ORDER BY started_at DESC LIMIT -1 OFFSET ?",
+                (namespace, MAX_STORED_RUNS),
+            )
+        ]
+        connection.executemany(
+            "DELETE FROM runs WHERE run_id = ?", [(run_id,) for run_id in run_ids]
+        )
+    for run_id in run_ids:
+        shutil.rmtree(get_run_folder(namespace, run_id), ignore_errors=True)
@@ -0,0 +1,216 @@
+"""Island model that evolves several populations of an algorithm in the workers."""
+import pickle
+import typing
+import contextlib
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from pyristic.heuristic import Genetic, EvolutionStrategy, EvolutionaryProgramming
+from app.models import Topology
+from app.utils.generic import ModulesHandler
+from app.services.checkpoints import (
+    get_random_state,
+    set_random_state,
+    resume_execution,
+)
+from app.services.execution import (
+    RUN_IDS,
+    get_worker_pool,
+    get_worker_task,
+    discard_worker_pool,
+    keep_generation,
+    keep_best,
+)
+
+
+def evolve_island(
+    task_key: tuple,
+    modules: typing.Optional[ModulesHandler],
+    payload: bytes,
+    island: dict,
+    arguments: dict,
+) -> dict:
+    """
+    Evolve the population of an island for some generations in a worker of the pool.
+
+    Arguments:
+        - task_key: identifies the algorithm of the island model.
+        - modules: handler pinned to the module versions used by the algorithm.
+        - payload: the algorithm pickled.
+        - island: seed of a new island, or the population and random state that
+            the island had after the last migration.
+        - arguments: key arguments for the optimize method with the generations.
+    """
+    optimizer = get_worker_task(task_key, modules, payload)
+    optimizer_args, optimizer_additional_args = [], arguments
+    with contextlib.ExitStack() as stack:
+        if "random_state" in island:
+            set_random_state(island["random_state"])
+            optimizer_args, optimizer_additional_args = stack.enter_context(
+                resume_execution(
+                    optimizer,
+                    {**island, "generation": 0},
+                    optimizer_args,
+                    optimizer_additional_args,
+                )
+            )
+        else:
+            np.random.seed(island["seed"])
+        optimizer.optimize(*optimizer_args, **optimizer_additional_args)
+    return {
+        "population_x": optimizer.logger["parent_population_x"],
+        "population_sigma": optimizer.logger.get("parent_population_sigma"),
+        "population_f": optimizer.logger["parent_population_f"],
+        "random_state": get_random_state(),
+    }
+
+
+def get_sources(islands: int, topology: Topology) -> typing.List[typing.List[int]]:
+    """
+    Return the islands that send their best individuals to every island.
+
+    Arguments:
+        - islands: number of islands.
+        - topology: ring sends to the next island, complete to every island and
+            random to an island chosen every migration.
+    """
+    if topology == Topology.RING:
+        return [[(index - 1) % islands] for index in range(islands)]
+    if topology == Topology.COMPLETE:
+        return [
+            [source for source in range(islands) if source != index]
+            for index in range(islands)
+        ]
+    sources = []
+    for index in range(islands):
+        source = np.random.randint(islands - 1)
+        sources.append([source + int(source >= index)])
+    return sources
+
+
+def migrate(islands: typing.List[dict], migrants: int, topology: Topology) -> None:
+    """
+    Replace the worst individuals of every island with the best of its sources.
+
+    Arguments:
+        - islands: populations of the islands after the last generations.
+        - migrants: number of individuals that every island sends.
+        - topology: connections between the islands, see get_sources.
+    """
+    keys = ["population_x", "population_f"]
+    if islands[0]["population_sigma"] is not None:
+        keys.append("population_sigma")
+    best = [
+        {
+            key: island[key][np.argsort(island["population_f"])[:migrants]]
+            for key in keys
+        }
+        for island in islands
+    ]
+    for island, sources in zip(islands, get_sources(len(islands), topology)):
+        size = len(island["population_f"])
+        worst = np.argsort(island["population_f"])[::-1][: size - 1]
+        for key in keys:
+            arrivals = np.concatenate([best[source][key] for source in sources])
+            arrivals = arrivals[: len(worst)]
+            island[key] = island[key].copy()
+            island[key][worst[: len(arrivals)]] = arrivals
+
+
+class IslandModel:
+    """
+    Evolutionary algorithm that evolves several populations in the worker pool.
+
+    Every island evolves its own population with the configured operators for
+    migration_interval generations, then the islands exchange their best
+    individuals and continue. The model follows the loop of the pyristic
+    evolutionary algorithms, survivor_selection joins the populations once per
+    migration, so the progress events and the stopping criteria are checked
+    every migration.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        optimizer: typing.Union[Genetic, EvolutionStrategy, EvolutionaryProgramming],
+        modules: typing.Optional[ModulesHandler],
+        islands: int,
+        migration_interval: int,
+        migrants: int,
+        topology: Topology,
+    ):
+        """
+        Create the island model of an algorithm.
+
+        Arguments:
+            - optimizer: evolutionary algorithm performed by every island.
+            - modules: handler pinned to the module versions of the algorithm.
+            - islands: number of populations.
+            - migration_interval: generations between two migrations.
+            - migrants: number of individuals that every island sends.
+            - topology: connections between the islands, see get_sources.
+        """
+        self.optimizer = optimizer
+        self.modules = None if modules is None else modules.snapshot()
+        self.islands = islands
+        self.migration_interval = migration_interval
+        self.migrants = migrants
+        self.topology = Topology(topology)
+        self.logger = {}
+
+    def optimize(self, generations: int, **arguments) -> None:
+        """
+        Evolve the islands for the generations given.
+
+        Arguments:
+            - generations: number of generations of every island.
+            - arguments: the rest of key arguments for the optimize method of the
+                algorithm, the population size is the size of every island.
+        """
+        generations = int(generations)
+        task_key = ("islands", next(RUN_IDS))
+        payload = pickle.dumps(self.optimizer)
+        islands = [
+            {"seed": int(np.random.randint(2**32, dtype=np.int64))}
+            for _ in range(self.islands)
+        ]
+        self.logger = {"current_iter": 0}
+        pool = get_worker_pool()
+        done = 0
+        try:
+            while done < generations:
+                epoch = min(self.migration_interval, generations - done)
+                futures = [
+                    pool.submit(
+                        evolve_island,
+                        task_key,
+                        self.modules,
+                        payload,
+                        island,
+                        {**arguments, "generations": epoch},
+                    )
+                    for island in islands
+                ]
+                islands = [future.result() for future in futures]
+                done += epoch
+                keep_generation(self.logger, self.survivor_selection(islands=islands))
+                if done < generations:
+                    migrate(islands, self.migrants, self.topology)
+        except BrokenProcessPool:
+            discard_worker_pool(pool)
+            raise
+        keep_best(self.logger)
+
+    def survivor_selection(self, islands: typing.List[dict]) -> dict:
+        """
+        Join the populations of the islands.
+
+        Arguments:
+            - islands: populations of the islands after the last generations.
+        """
+        return {
+            "parent_population_x": np.concatenate(
+                [island["population_x"] for island in islands]
+            ),
+            "parent_population_f": np.concatenate(
+                [island["population_f"] for island in islands]
+            ),
+        }
@@ -0,0 +1,935 @@
+"""Background jobs that perform the optimizations outside of the request."""
+import math
+import time
+import uuid
+import heapq
+import typing
+import asyncio
+import logging
+import secrets
+import functools
+import itertools
+import threading
+import traceback
+import contextlib
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from app.constants import (
+    MAX_CONCURRENT_JOBS,
+    MAX_QUEUED_JOBS,
+    MAX_QUEUED_COST,
+    RETRY_AFTER_SECONDS,
+    MAX_RETRY_AFTER_SECONDS,
+    MAX_STORED_JOBS,
+    MAX_JOB_EVENTS,
+    DEFAULT_NAMESPACE,
+    RESULT_CACHE_SIZE,
+    RESULT_CACHE_FOLDER,
+    MAX_RESULT_CACHE_FILES,
+    HISTORY_FOLDER,
+)
+from app.models import (
+    JobStatus,
+    Priority,
+    EvolutionaryAlgorithm,
+    EvolutionaryOperators,
+    EvolutionaryOperatorConfig,
+    OptimizerArguments,
+)
+from app.services import evolutionary as ea_utils
+from app.services import simulated_annealing as sa_utils
+from app.services import profiling
+from app.services.execution import ExecutionCancelled, get_execution_seeds
+from app.services.checkpoints import (
+    Checkpoint,
+    get_checkpoint_folder,
+    forget_old_checkpoints,
+    run_checkpointed,
+)
+from app.services.history import HistoryRecorder
+from app.utils.generic import ModulesHandler
+from app.utils.cache import ResultCache, get_digest
+from app.utils.metrics import QUEUED_JOBS, REJECTED_JOBS
+
+LOGGER = logging.getLogger(__name__)
+PRIORITY_ORDER = {Priority.HIGH: 0, Priority.NORMAL: 1, Priority.LOW: 2}
+THROUGHPUT_SMOOTHING = 0.2
+POPULATION_ARGUMENTS = ["size_population", "population_size", "offspring_size"]
+SA_COOLING_FACTOR = 0.99
+
+
+class JobQueueFull(Exception):
+    """The job can't wait for a free slot because the queue is full."""
+
+    def __init__(self, retry_after: int):
+        """
+        Create the exception with the seconds that the client should wait.
+
+        Arguments:
+            - retry_after: estimated seconds until the queue has room.
+        """
+        super().__init__("Too many optimizations are waiting, retry later.")
+        self.retry_after = retry_after
+
+
+class Job:  # pylint: disable=too-many-instance-attributes
+    """State of an optimization submitted to the job manager."""
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        description: str,
+        total_executions: int,
+        namespace: str = DEFAULT_NAMESPACE,
+        job_id: typing.Optional[str] = None,
+        cost: float = 0.0,
+        priority: Priority = Priority.NORMAL,
+    ):
+        """
+        Create a pending job.
+
+        Arguments:
+            - description: string that helps us to recognize the job.
+            - total_executions: number of executions that the job will perform.
+            - namespace: string that isolates the jobs of a user.
+            - job_id: identifier of a job resumed, a new one is created by default.
+            - cost: estimated evaluations of the objective, see estimate_cost.
+            - priority: class that orders the job while it waits for a slot.
+        """
+        self.job_id = job_id or uuid.uuid4().hex
+        self.cost = cost
+        self.priority = Priority(priority)
+        self.description = description
+        self.namespace = namespace
+        self.status = JobStatus.PENDING
+        self.total_executions = total_executions
+        self.completed_executions = 0
+        self.events = deque(maxlen=MAX_JOB_EVENTS)
+        self.events_count = 0
+        self.result = None
+        self.error = None
+        self.cancel_event = threading.Event()
+        self.future = Future()
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        """Check if the job won't change anymore."""
+        return self.status in (
+            JobStatus.COMPLETED,
+            JobStatus.FAILED,
+            JobStatus.CANCELLED,
+        )
+
+    def execution_done(self, _execution: dict) -> None:
+        """Count an execution finished, it is used as run_executions callback."""
+        self.completed_executions += 1
+
+    def progress_done(self, event: dict) -> None:
+        """Keep a progress event, it is used as run_executions callback."""
+        self.events.append((self.events_count, event))
+        self.events_count += 1
+
+    def events_after(self, event_id: int) -> typing.List[typing.Tuple[int, dict]]:
+        """
+        Return the progress events kept that come after an event.
+
+        Arguments:
+            - event_id: identifier of the last event received, -1 to get all.
+        """
+        return [
+            (index, event) for index, event in list(self.events) if index > event_id
+        ]
+
+    async def wait(self) -> dict:
+        """Wait without blocking the event loop until the job finishes."""
+        return await asyncio.wrap_future(self.future)
+
+    def to_dict(self) -> dict:
+        """Summary of the job without its result."""
+        return {
+            "job_id": self.job_id,
+            "description": self.description,
+            "namespace": self.namespace,
+            "status": self.status.value,
+            "priority": self.priority.value,
+            "progress": {
+                "completed_executions": self.completed_executions,
+                "total_executions": self.total_executions,
+            },
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:  # pylint: disable=too-many-instance-attributes
+    """
+    Schedule the jobs in a bounded pool of threads and keep their state.
+
+    The jobs that don't find a free slot wait in a bounded queue sorted by priority
+    and arrival. When the queue is full the job is rejected with the seconds that
+    the pending work takes at the throughput observed, so the latency of the jobs
+    admitted stays predictable under a burst.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        max_workers: int,
+        max_stored_jobs: int,
+        max_queued_jobs: int = MAX_QUEUED_JOBS,
+        max_queued_cost: float = MAX_QUEUED_COST,
+    ):
+        """
+        Create the executor.
+
+        Arguments:
+            - max_workers: number of jobs that can run at the same time.
+            - max_stored_jobs: number of jobs kept in memory, the oldest finished
+                jobs are forgotten first.
+            - max_queued_jobs: number of jobs that can wait for a slot, the low
+                priority jobs can only take half of them.
+            - max_queued_cost: estimated evaluations that can wait for a slot, a
+                job is admitted regardless of its cost when the queue is empty.
+        """
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="pyristic-job"
+        )
+        self.max_workers = max_workers
+        self.max_stored_jobs = max_stored_jobs
+        self.max_queued_jobs = max_queued_jobs
+        self.max_queued_cost = max_queued_cost
+        self.jobs = OrderedDict()
+        self.queue = []
+        self.running = set()
+        self.sequence = itertools.count()
+        self.throughput = None
+        self.lock = threading.Lock()
+
+    def submit(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        description: str,
+        total_executions: int,
+        task: typing.Callable[..., dict],
+        namespace: str = DEFAULT_NAMESPACE,
+        result: typing.Any = None,
+        job_id: typing.Optional[str] = None,
+        cost: float = 0.0,
+        priority: Priority = Priority.NORMAL,
+    ) -> Job:
+        """
+        Schedule a task as a new job, JobQueueFull is raised when it can't wait.
+
+        Arguments:
+            - description: string that helps us to recognize the job.
+            - total_executions: number of executions that the task will perform.
+            - task: callable that accepts the on_execution, cancel_event and
+                on_progress key arguments of run_executions and returns the
+                statistics.
+            - namespace: string that isolates the jobs of a user.
+            - result: partial result that the task fills while it runs.
+            - job_id: identifier of a job resumed, it replaces the finished job.
+            - cost: estimated evaluations of the objective, see estimate_cost.
+            - priority: class that orders the job while it waits for a slot.
+        """
+        job = Job(description, total_executions, namespace, job_id, cost, priority)
+        job.result = result
+        with self.lock:
+            if not self._has_room(job):
+                REJECTED_JOBS.inc(priority=job.priority.value)
+                raise JobQueueFull(self._get_retry_after())
+            self.jobs.pop(job.job_id, None)
+            self.jobs[job.job_id] = job
+            self._forget_finished_jobs()
+            heapq.heappush(
+                self.queue,
+                (PRIORITY_ORDER[job.priority], next(self.sequence), job, task),
+            )
+            QUEUED_JOBS.inc()
+            self._dispatch()
+        return job
+
+    def get(self, job_id: str, namespace: typing.Optional[str] = None) -> Job:
+        """
+        Find a job by its identifier.
+
+        Arguments:
+            - job_id: string returned when the job was submitted.
+            - namespace: when it is given, the jobs of other namespaces aren't found.
+        """
+        with self.lock:
+            job = self.jobs[job_id]
+        if namespace is not None and job.namespace != namespace:
+            raise KeyError(job_id)
+        return job
+
+    def list(self, namespace: typing.Optional[str] = None) -> typing.List[Job]:
+        """
+        Return the jobs kept in memory.
+
+        Arguments:
+            - namespace: when it is given, only the jobs of the namespace are returned.
+        """
+        with self.lock:
+            return [
+                job
+                for job in self.jobs.values()
+                if namespace is None or job.namespace == namespace
+            ]
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        Request the cancellation of a job.
+
+        A pending job is cancelled right away, a running job stops before its next
+        execution. In both cases the future of the job raises ExecutionCancelled.
+
+        Arguments:
+            - job_id: string returned when the job was submitted.
+        """
+        job = self.get(job_id)
+        if job.finished:
+            return job
+        job.cancel_event.set()
+        with self.lock:
+            entries = [entry for entry in self.queue if entry[2] is job]
+            if entries:
+                self.queue.remove(entries[0])
+                heapq.heapify(self.queue)
+                QUEUED_JOBS.dec()
+                job.future.set_exception(ExecutionCancelled())
+                job.status = JobStatus.CANCELLED
+                job.finished_at = time.time()
+        return job
+
+    def _has_room(self, job: Job) -> bool:
+        """Check if the job can start or wait in the queue."""
+        if len(self.running) < self.max_workers:
+            return True
+        max_queued_jobs = self.max_queued_jobs
+        if job.priority == Priority.LOW:
+            max_queued_jobs //= 2
+        if len(self.queue) >= max_queued_jobs:
+            return False
+        queued_cost = sum(entry[2].cost for entry in self.queue)
+        return not self.queue or queued_cost + job.cost <= self.max_queued_cost
+
+    def _get_retry_after(self) -> int:
+        """Estimate the seconds that the jobs running and waiting take."""
+        pending_cost = sum(job.cost for job in self.running) + sum(
+            entry[2].cost for entry in self.queue
+        )
+        if not self.throughput or not pending_cost:
+            return RETRY_AFTER_SECONDS
+        seconds = math.ceil(pending_cost / (self.throughput * self.max_workers))
+        return min(max(seconds, 1), MAX_RETRY_AFTER_SECONDS)
+
+    def _dispatch(self) -> None:
+        """Start the jobs of the queue while there are free slots."""
+        while self.queue and len(self.running) < self.max_workers:
+            job, task = heapq.heappop(self.queue)[2:]
+            QUEUED_JOBS.dec()
+            self.running.add(job)
+            self.executor.submit(self._run, job, task)
+
+    def _run(self, job: Job, task: typing.Callable[..., dict]) -> None:
+        """Perform the task updating the job state and start the next job."""
+        job.future.set_running_or_notify_cancel()
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = task(
+                on_execution=job.execution_done,
+                cancel_event=job.cancel_event,
+                on_progress=job.progress_done,
+            )
+            job.status = JobStatus.COMPLETED
+            job.future.set_result(job.result)
+        except ExecutionCancelled as exc:
+            LOGGER.info("Job %s cancelled.", job.job_id)
+            job.status = JobStatus.CANCELLED
+            job.future.set_exception(exc)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            LOGGER.error(traceback.format_exc())
+            job.error = str(exc)
+            job.status = JobStatus.FAILED
+            job.future.set_exception(exc)
+        finally:
+            job.finished_at = time.time()
+            with self.lock:
+                self.running.discard(job)
+                self._observe_throughput(job)
+                self._dispatch()
+
+    def _observe_throughput(self, job: Job) -> None:
+        """Update the evaluations per second of a slot with a completed job."""
+        elapsed_time = job.finished_at - job.started_at
+        if job.status != JobStatus.COMPLETED or not job.cost or elapsed_time <= 0:
+            return
+        throughput = job.cost / elapsed_time
+        if self.throughput is None:
+            self.throughput = throughput
+        else:
+            self.throughput += THROUGHPUT_SMOOTHING * (throughput - self.throughput)
+
+    def _forget_finished_jobs(self) -> None:
+        """Remove the oldest finished jobs when there are too many stored."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[: max(len(self.jobs) - self.max_stored_jobs, 0)]:
+            del self.jobs[job_id]
+
+
+JOB_MANAGER = JobManager(MAX_CONCURRENT_JOBS, MAX_STORED_JOBS)
+RESULT_CACHE = ResultCache(
+    RESULT_CACHE_SIZE, RESULT_CACHE_FOLDER or None, MAX_RESULT_CACHE_FILES
+)
+
+
+def estimate_cost(
+    num_executions: int, arguments: dict, islands: typing.Optional[dict] = None
+) -> float:
+    """
+    Estimate the evaluations of the objective that the executions perform.
+
+    The evolutionary algorithms evaluate a population every generation and
+    simulated annealing evaluates a neighbor every temperature step, cooled as
+    pyristic does by default.
+
+    Arguments:
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments: dictionary with the key arguments for the optimize method.
+        - islands: key arguments of the island model, every island evaluates its
+            own population.
+    """
+    if "generations" in arguments:
+        population = max(arguments.get(name, 1.0) for name in POPULATION_ARGUMENTS)
+        steps = arguments["generations"] * population
+    else:
+        temperature = arguments.get("initial_temperature", 0.0)
+        eps = arguments.get("eps", 0.0)
+        steps = 1.0
+        if 0 < eps < temperature:
+            steps = math.log(eps / temperature) / math.log(SA_COOLING_FACTOR)
+    return float(num_executions * steps * (islands["islands"] if islands else 1))
+
+
+def get_result_key(
+    modules: ModulesHandler,
+    module_names: typing.List[str],
+    seed: typing.Optional[int],
+    **request,
+) -> typing.Optional[str]:
+    """
+    Identify the result of a request, only the requests with a seed are repeatable.
+
+    Only the versions of the modules used by the request are part of the key, so
+    uploading an unrelated module keeps the results cached.
+
+    Arguments:
+        - modules: handler pinned to the module versions used by the request.
+        - module_names: names of the modules that the request uses.
+        - seed: integer number that makes the executions reproducible.
+        - request: arguments, operators, algorithm and number of executions.
+    """
+    if seed is None or not RESULT_CACHE.enabled:
+        return None
+    versions = {name: modules.get_version(name) for name in sorted(module_names)}
+    return get_digest({**request, "seed": seed, "modules": versions})
+
+
+def submit_evolutionary_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    arguments: dict,
+    config: EvolutionaryOperators,
+    namespace: str = DEFAULT_NAMESPACE,
+    profile: bool = False,
+    modules: typing.Optional[ModulesHandler] = None,
+    checkpoint: bool = False,
+    job_id: typing.Optional[str] = None,
+    priority: Priority = Priority.NORMAL,
+    **execution_options,
+) -> Job:
+    """
+    Schedule the executions of an evolutionary algorithm.
+
+    The job uses the module versions active when it is submitted, unless a pinned
+    handler is given.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments: dictionary with the key arguments for the optimize method.
+        - config: dictionary with the operators applied to the algorithm.
+        - namespace: string that isolates the modules of a user.
+        - profile: perform the executions under the profiler, see create_task.
+        - modules: handler pinned to the module versions of the namespace.
+        - checkpoint: save the executions in the disk, so the job can be resumed.
+        - job_id: identifier of the job resumed.
+        - priority: class that orders the job while it waits for a slot.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    modules = modules or ModulesHandler(namespace).snapshot()
+    job_id = job_id or uuid.uuid4().hex
+    request = {
+        "algorithm": optimizer.value,
+        "num_executions": num_executions,
+        "arguments": arguments,
+        "priority": Priority(priority).value,
+        "methods": {name: operator.dict() for name, operator in config.items()},
+    }
+    if checkpoint:
+        execution_options = create_checkpoint(
+            job_id, namespace, modules, request, execution_options
+        )
+    execution_options = add_history(
+        job_id, namespace, modules, [request], execution_options
+    )
+    return JOB_MANAGER.submit(
+        f"{optimizer.value} - {num_executions}",
+        num_executions,
+        create_task(
+            functools.partial(
+                ea_utils.run_evolutionary_algorithm,
+                optimizer,
+                config,
+                num_executions,
+                arguments,
+                modules,
+            ),
+            namespace,
+            profile,
+            **execution_options,
+        ),
+        namespace,
+        job_id=job_id,
+        cost=estimate_cost(num_executions, arguments, execution_options.get("islands")),
+        priority=priority,
+    )
+
+
+def get_request_options(arguments_optimizer: OptimizerArguments) -> dict:
+    """
+    Return the stopping criteria, islands and memo of a request as execution options.
+
+    Arguments:
+        - arguments_optimizer: the arguments of the request body.
+    """
+    return {
+        "stopping": arguments_optimizer.stopping.dict(exclude_none=True),
+        "islands": arguments_optimizer.islands and arguments_optimizer.islands.dict(),
+        "memo": arguments_optimizer.memo,
+    }
+
+
+def submit_evolutionary_request(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    arguments_optimizer: OptimizerArguments,
+    config_operators: EvolutionaryOperators,
+    namespace: str = DEFAULT_NAMESPACE,
+    profile: bool = False,
+    **options,
+) -> Job:
+    """
+    Schedule the evolutionary algorithm of a request body.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments_optimizer: the arguments, stopping criteria, islands and memo of
+            the body.
+        - config_operators: the operators of the body.
+        - namespace: string that isolates the modules of a user.
+        - profile: perform the executions under the profiler, see create_task.
+        - options: key arguments forwarded to submit_evolutionary_job.
+    """
+    return submit_evolutionary_job(
+        optimizer,
+        num_executions,
+        arguments_optimizer.arguments,
+        config_operators.methods,
+        namespace,
+        profile,
+        **get_request_options(arguments_optimizer),
+        **options,
+    )
+
+
+def submit_sa_request(
+    num_executions: int,
+    arguments_optimizer: OptimizerArguments,
+    namespace: str = DEFAULT_NAMESPACE,
+    profile: bool = False,
+    **options,
+) -> Job:
+    """
+    Schedule simulated annealing with the arguments of a request body.
+
+    The islands of the body are ignored by simulated annealing.
+
+    Arguments:
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments_optimizer: the arguments, stopping criteria and memo of the body.
+        - namespace: string that isolates the modules of a user.
+        - profile: perform the executions under the profiler, see create_task.
+        - options: key arguments forwarded to submit_sa_job.
+    """
+    request_options = get_request_options(arguments_optimizer)
+    return submit_sa_job(
+        num_executions,
+        arguments_optimizer.arguments,
+        namespace,
+        profile,
+        stopping=request_options["stopping"],
+        memo=request_options["memo"],
+        **options,
+    )
+
+
+def create_checkpoint(
+    job_id: str,
+    namespace: str,
+    modules: ModulesHandler,
+    request: dict,
+    execution_options: dict,
+) -> dict:
+    """
+    Save the request of a job and return the execution options with its checkpoint.
+
+    A job without seed receives one, so the executions that didn't start before
+    the job stopped use the same seeds when it is resumed.
+
+    Arguments:
+        - job_id: identifier of the job.
+        - namespace: string that isolates the modules of a user.
+        - modules: handler pinned to the module versions of the job.
+        - request: algorithm, number of executions, arguments and operators.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    if execution_options.get("seed") is None:
+        execution_options = {**execution_options, "seed": secrets.randbits(32)}
+    checkpoint = Checkpoint(get_checkpoint_folder(namespace, job_id))
+    checkpoint.save_request(
+        {
+            **request,
+            "execution_options": execution_options,
+            "modules": modules.versions,
+        }
+    )
+    forget_old_checkpoints(namespace)
+    return {**execution_options, "checkpoint": checkpoint}
+
+
+def add_history(
+    job_id: str,
+    namespace: str,
+    modules: ModulesHandler,
+    requests: typing.List[dict],
+    execution_options: dict,
+) -> dict:
+    """
+    Return the execution options with the recorder that saves the job in the history.
+
+    The history is disabled when PYRISTIC_HISTORY_FOLDER is empty.
+
+    Arguments:
+        - job_id: identifier of the job.
+        - namespace: string that isolates the modules of a user.
+        - modules: handler pinned to the module versions of the job.
+        - requests: algorithm, number of executions, arguments and operators of
+            every task of the job.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    if not HISTORY_FOLDER:
+        return execution_options
+    recorder = HistoryRecorder(
+        namespace,
+        modules.versions,
+        [
+            {
+                **request,
+                "stopping": execution_options.get("stopping"),
+                "islands": execution_options.get("islands"),
+            }
+            for request in requests
+        ],
+        job_id,
+        execution_options.get("seed"),
+    )
+    return {**execution_options, "history": recorder}
+
+
+def record_cached_run(
+    namespace: str,
+    modules: ModulesHandler,
+    request: dict,
+    seed: int,
+    statistics: dict,
+) -> None:
+    """
+    Save in the history a request answered with cached statistics.
+
+    The run doesn't have job nor convergence, its executions are the cached ones,
+    with the seeds derived from the seed of the request.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - modules: handler pinned to the module versions of the request.
+        - request: algorithm, number of executions, arguments, operators, stopping
+            criteria and islands of the request.
+        - seed: integer number that made the executions reproducible.
+        - statistics: cached statistics with the information of every execution.
+    """
+    if not HISTORY_FOLDER or "individual_f" not in statistics:
+        return
+    executions = [
+        {
+            "individual_f": individual_f,
+            "execution_time": execution_time,
+            "individual_x": x,
+        }
+        for individual_f, execution_time, x in zip(
+            statistics["individual_f"],
+            statistics["execution_time"],
+            statistics["individual_x"],
+        )
+    ]
+    HistoryRecorder(namespace, modules.versions, [request], seed=seed).record(
+        0, executions, get_execution_seeds(len(executions), seed), time.time()
+    )
+
+
+def resume_job(job_id: str, namespace: str = DEFAULT_NAMESPACE) -> Job:
+    """
+    Submit again a checkpointed job that stopped before finishing.
+
+    The job keeps its identifier and module versions, the executions finished are
+    taken from the checkpoint and the executions in progress continue from their
+    last saved state.
+
+    Arguments:
+        - job_id: identifier of the job.
+        - namespace: string that isolates the modules of a user.
+
+    Raises KeyError when the job doesn't have a checkpoint and ValueError when
+    the job is still running.
+    """
+    request = Checkpoint(get_checkpoint_folder(namespace, job_id)).load_request()
+    if request is None:
+        raise KeyError(job_id)
+    with contextlib.suppress(KeyError):
+        if not JOB_MANAGER.get(job_id, namespace).finished:
+            raise ValueError(f"The job {job_id} is still running.")
+    modules = ModulesHandler(namespace, request["modules"])
+    modules.load_versions()
+    options = {
+        **request["execution_options"],
+        "checkpoint": True,
+        "job_id": job_id,
+        "priority": Priority(request["priority"]),
+    }
+    if request["algorithm"] == "SA":
+        return submit_sa_job(
+            request["num_executions"],
+            request["arguments"],
+            namespace,
+            modules=modules,
+            **options,
+        )
+    return submit_evolutionary_job(
+        EvolutionaryAlgorithm(request["algorithm"]),
+        request["num_executions"],
+        request["arguments"],
+        {
+            name: EvolutionaryOperatorConfig(**operator)
+            for name, operator in request["methods"].items()
+        },
+        namespace,
+        modules=modules,
+        **options,
+    )
+
+
+def create_task(
+    run: typing.Callable[..., dict],
+    namespace: str,
+    profile: bool = False,
+    **execution_options,
+) -> typing.Callable[..., dict]:
+    """
+    Bind the execution options to the task of a job.
+
+    A profiled task runs the executions in the thread of the job, because the
+    profiler doesn't follow the worker processes. A checkpointed task removes its
+    checkpoint when it finishes successfully.
+
+    Arguments:
+        - run: callable that performs the executions and returns the statistics.
+        - namespace: string that isolates the modules of a user.
+        - profile: include the summary of the profile in the statistics.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    if not profile:
+        task = functools.partial(run, **execution_options)
+    else:
+        task = functools.partial(
+            profiling.run_profiled,
+            functools.partial(run, **{**execution_options, "workers": 1}),
+            namespace,
+        )
+    if execution_options.get("checkpoint") is None:
+        return task
+    return functools.partial(run_checkpointed, task, execution_options["checkpoint"])
+
+
+def collect_batch_entries(
+    entries: list, run_batch: typing.Callable[..., typing.Iterator[dict]], **monitor
+) -> list:
+    """
+    Save every entry of the batch when it finishes.
+
+    Arguments:
+        - entries: list shared with the job where the entries are saved.
+        - run_batch: callable that yields the entries of the batch.
+        - monitor: key arguments forwarded to run_batch by the job manager.
+    """
+    for entry in run_batch(**monitor):
+        entries.append(entry)
+    return entries
+
+
+def submit_evolutionary_batch_job(
+    optimizer: EvolutionaryAlgorithm,
+    num_executions: int,
+    combinations: typing.List[dict],
+    namespace: str = DEFAULT_NAMESPACE,
+    priority: Priority = Priority.NORMAL,
+    **execution_options,
+) -> Job:
+    """
+    Schedule the combinations of a batch sharing the workers.
+
+    The job result is the list of entries finished so far, sorted as they finish.
+    All the combinations use the module versions active when it is submitted.
+
+    Arguments:
+        - optimizer: the evolutionary algorithm selected.
+        - num_executions: integer number that is the number of times executed every
+            combination.
+        - combinations: list of dictionaries with the arguments and methods.
+        - namespace: string that isolates the modules of a user.
+        - priority: class that orders the job while it waits for a slot.
+        - execution_options: key arguments forwarded to run_batch_executions.
+    """
+    entries = []
+    job_id = uuid.uuid4().hex
+    modules = ModulesHandler(namespace).snapshot()
+    execution_options = add_history(
+        job_id,
+        namespace,
+        modules,
+        [
+            {
+                "algorithm": optimizer.value,
+                "num_executions": num_executions,
+                "arguments": combination["arguments"],
+                "methods": {
+                    name: operator.dict()
+                    for name, operator in combination["methods"].items()
+                },
+            }
+            for combination in combinations
+        ],
+        execution_options,
+    )
+    return JOB_MANAGER.submit(
+        f"{optimizer.value} batch - {len(combinations)} x {num_executions}",
+        len(combinations) * num_executions,
+        functools.partial(
+            collect_batch_entries,
+            entries,
+            functools.partial(
+                ea_utils.run_evolutionary_batch,
+                optimizer,
+                combinations,
+                num_executions,
+                modules,
+                **execution_options,
+            ),
+        ),
+        namespace,
+        entries,
+        job_id=job_id,
+        cost=sum(
+            estimate_cost(num_executions, combination["arguments"])
+            for combination in combinations
+        ),
+        priority=priority,
+    )
+
+
+def submit_sa_job(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    num_executions: int,
+    arguments: dict,
+    namespace: str = DEFAULT_NAMESPACE,
+    profile: bool = False,
+    modules: typing.Optional[ModulesHandler] = None,
+    checkpoint: bool = False,
+    job_id: typing.Optional[str] = None,
+    priority: Priority = Priority.NORMAL,
+    **execution_options,
+) -> Job:
+    """
+    Schedule the executions of simulated annealing.
+
+    The job uses the module versions active when it is submitted, unless a pinned
+    handler is given.
+
+    Arguments:
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments: dictionary with the key arguments for the optimize method.
+        - namespace: string that isolates the modules of a user.
+        - profile: perform the executions under the profiler, see create_task.
+        - modules: handler pinned to the module versions of the namespace.
+        - checkpoint: save the executions in the disk, so the job can be resumed.
+        - job_id: identifier of the job resumed.
+        - priority: class that orders the job while it waits for a slot.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    modules = modules or ModulesHandler(namespace).snapshot()
+    job_id = job_id or uuid.uuid4().hex
+    request = {
+        "algorithm": "SA",
+        "num_executions": num_executions,
+        "arguments": arguments,
+        "priority": Priority(priority).value,
+    }
+    if checkpoint:
+        execution_options = create_checkpoint(
+            job_id, namespace, modules, request, execution_options
+        )
+    execution_options = add_history(
+        job_id, namespace, modules, [request], execution_options
+    )
+    return JOB_MANAGER.submit(
+        f"SA - {num_executions}",
+        num_executions,
+        create_task(
+            functools.partial(
+                sa_utils.run_simulatedannealing_algorithm,
+                num_executions,
+                arguments,
+                modules,
+            ),
+            namespace,
+            profile,
+            **execution_options,
+        ),
+        namespace,
+        job_id=job_id,
+        cost=estimate_cost(num_executions, arguments, execution_options.get("islands")),
+        priority=priority,
+    )
@@ -0,0 +1,132 @@
+"""Profiling of the optimizations to find where the time goes."""
+import os
+import uuid
+import typing
+import cProfile
+import pstats
+import pyristic
+from app.constants import (
+    LOCAL_FILE_STORAGE,
+    PROFILES_FOLDER,
+    MAX_STORED_PROFILES,
+    PROFILE_HOTSPOTS,
+)
+from app.utils.generic import get_storage_path
+
+PYRISTIC_PATH = os.path.dirname(os.path.abspath(pyristic.__file__))
+APP_PATH = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILE_CATEGORIES = ["user", "pyristic", "app", "other"]
+
+
+def get_profile_path(namespace: str, profile_id: str) -> str:
+    """
+    Location where a profile of the namespace is saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - profile_id: identifier returned with the profile summary.
+    """
+    return os.path.join(
+        get_storage_path(namespace), PROFILES_FOLDER, f"{profile_id}.prof"
+    )
+
+
+def get_category(file_name: str) -> str:
+    """
+    Classify a profiled function by the file where it is defined.
+
+    The uploaded modules are compiled with the path of their version in the
+    storage, the built-in functions have no file and are classified as other.
+
+    Arguments:
+        - file_name: file of the function reported by the profiler.
+    """
+    path = os.path.abspath(file_name)
+    if path.startswith(os.path.abspath(LOCAL_FILE_STORAGE) + os.sep):
+        return "user"
+    if path.startswith(PYRISTIC_PATH + os.sep):
+        return "pyristic"
+    if path.startswith(APP_PATH + os.sep):
+        return "app"
+    return "other"
+
+
+def summarize_profile(stats: pstats.Stats, limit: int = PROFILE_HOTSPOTS) -> dict:
+    """
+    Split the time of a profile by category and find its hotspots.
+
+    Arguments:
+        - stats: statistics collected by the profiler.
+        - limit: number of functions with the highest own time returned.
+    """
+    categories = {category: 0.0 for category in PROFILE_CATEGORIES}
+    hotspots = []
+    for (file_name, line, function), statistics in stats.stats.items():
+        _, calls, own_time, total_time, _ = statistics
+        category = get_category(file_name)
+        categories[category] += own_time
+        hotspots.append(
+            {
+                "function": function,
+                "file": file_name,
+                "line": line,
+                "category": category,
+                "calls": calls,
+                "own_time": own_time,
+                "cumulative_time": total_time,
+            }
+        )
+    hotspots.sort(key=lambda hotspot: hotspot["own_time"], reverse=True)
+    return {
+        "total_time": stats.total_tt,
+        "categories": categories,
+        "hotspots": hotspots[:limit],
+    }
+
+
+def forget_old_profiles(namespace: str) -> None:
+    """
+    Remove the oldest profiles of the namespace when there are too many.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+    """
+    folder = os.path.join(get_storage_path(namespace), PROFILES_FOLDER)
+    profiles = sorted(
+        (os.path.join(folder, file_name) for file_name in os.listdir(folder)),
+        key=os.path.getmtime,
+    )
+    for file_path in profiles[: max(len(profiles) - MAX_STORED_PROFILES, 0)]:
+        os.remove(file_path)
+
+
+def run_profiled(task: typing.Callable[..., dict], namespace: str, **monitor) -> dict:
+    """
+    Perform the task under a deterministic profiler.
+
+    The profiler only follows the thread of the task, so the executions must run
+    in that thread instead of the worker processes. The profile is saved in the
+    storage of the namespace to download it, and its summary is included in the
+    statistics returned.
+
+    Arguments:
+        - task: callable that returns the statistics of the executions.
+        - namespace: string that isolates the modules of a user.
+        - monitor: key arguments forwarded to the task by the job manager.
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        statistics = task(**monitor)
+    finally:
+        profiler.disable()
+    stats = pstats.Stats(profiler)
+    profile_id = uuid.uuid4().hex
+    file_path = get_profile_path(namespace, profile_id)
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    stats.dump_stats(file_path)
+    forget_old_profiles(namespace)
+    return {
+        **statistics,
+        "profile": {"profile_id": profile_id, **summarize_profile(stats)},
+    }
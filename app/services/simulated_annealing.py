@@ -1,24 +1,85 @@
 """Method required to implement simulated annealing algorithm of pyristic."""
+import typing
+import logging
 from fastapi import HTTPException
 from pyristic.heuristic import SimulatedAnnealing
 from app.utils.generic import ModulesHandler
+from app.utils.cache import Memo
+from app.services.execution import run_executions, track_run
+from app.utils.metrics import PHASE_DURATION
+from app.constants import MEMO_CACHE_SIZE
 
+LOGGER = logging.getLogger(__name__)
 
-def create_simulatedannealing_algorithm() -> SimulatedAnnealing:
+
+def create_simulatedannealing_algorithm(
+    modules: typing.Optional[ModulesHandler] = None,
+    memo_size: typing.Optional[int] = None,
+) -> SimulatedAnnealing:
     """
     Create a search algorithm based on simulated annealing algorithm.
 
+    The objective and constraints are memoized when the memo size is positive, the
+    memo is saved in the memo attribute of the algorithm.
+
     Arguments:
-        - optimizer_arguments: dictionary with the keys required to perform the search.
+        - modules: handler pinned to the module versions, by default the active ones.
+        - memo_size: results kept by the memo, by default PYRISTIC_MEMO_CACHE_SIZE.
     """
+    modules = modules or ModulesHandler()
+    memo_size = MEMO_CACHE_SIZE if memo_size is None else memo_size
     try:
-        function = ModulesHandler().get_method_by_module("function", "function")
-        constraints = ModulesHandler().get_method_by_module(
-            "constraints", "ARRAY_CONSTRAINTS"
-        )
-        generator = ModulesHandler().get_method_by_module(
-            "SA_neighbor_generator", "neighbor_generator"
-        )
-        return SimulatedAnnealing(function, constraints, generator)
+        with PHASE_DURATION.time(phase="algorithm"):
+            function = modules.get_method_by_module("function", "function")
+            constraints = modules.get_method_by_module(
+                "constraints", "ARRAY_CONSTRAINTS"
+            )
+            generator = modules.get_method_by_module(
+                "SA_neighbor_generator", "neighbor_generator"
+            )
+            if memo_size <= 0:
+                return SimulatedAnnealing(function, constraints, generator)
+            memo = Memo(memo_size)
+            algorithm = SimulatedAnnealing(
+                *memo.memoize(function, constraints), generator
+            )
+            algorithm.memo = memo
+            return algorithm
     except Exception as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+
+
+def run_simulatedannealing_algorithm(
+    num_executions: int,
+    arguments: dict,
+    modules: typing.Optional[ModulesHandler] = None,
+    memo: typing.Optional[int] = None,
+    **execution_options,
+) -> dict:
+    """
+    Create the simulated annealing algorithm and perform it several times.
+
+    Arguments:
+        - num_executions: integer number that is the number of times executed the algorithm.
+        - arguments: dictionary with the key arguments for the optimize method.
+        - modules: handler pinned to the module versions, by default the active ones.
+        - memo: results kept by the memo of every execution, by default
+            PYRISTIC_MEMO_CACHE_SIZE, 0 turns it off.
+        - execution_options: key arguments forwarded to run_executions.
+    """
+    LOGGER.info("Starting SA optimization execution")
+    modules = modules or ModulesHandler()
+    with modules.in_use(), track_run("SA"):
+        get_initial_solution = modules.get_method_by_module(
+            "generator_initial_solution", "generate_initial_solution"
+        )
+        sa_algorithm = create_simulatedannealing_algorithm(modules, memo)
+        LOGGER.info("created SA algorithm")
+        return run_executions(
+            sa_algorithm,
+            num_executions,
+            [get_initial_solution],
+            arguments,
+            modules=modules,
+            **execution_options,
+        )
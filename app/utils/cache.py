@@ -0,0 +1,326 @@
+"""Bounded caches shared by the services."""
+import os
+import json
+import pickle
+import typing
+import hashlib
+import weakref
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+class LRUCache:
+    """Thread safe cache that evicts the least recently used entry."""
+
+    instances = weakref.WeakSet()
+
+    def __init__(self, max_size: int):
+        """
+        Create an empty cache.
+
+        Arguments:
+            - max_size: maximum number of entries kept in memory.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.tags = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        LRUCache.instances.add(self)
+
+    def get(self, key: typing.Hashable, default=None):
+        """
+        Return the value saved with the key and mark it as the most recent.
+
+        Arguments:
+            - key: hashable object that identifies the entry.
+            - default: value returned when the key isn't found.
+        """
+        with self.lock:
+            if key not in self.entries:
+                self.misses += 1
+                return default
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+    def put(
+        self, key: typing.Hashable, value, tags: typing.Iterable[typing.Hashable] = ()
+    ) -> None:
+        """
+        Save a value evicting the oldest entries when the cache is full.
+
+        Arguments:
+            - key: hashable object that identifies the entry.
+            - value: object to save.
+            - tags: hashable objects that allow us to invalidate the entry later,
+                usually the namespace and name of the modules used.
+        """
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            self.tags[key] = frozenset(tags)
+            while len(self.entries) > self.max_size:
+                oldest_key, _ = self.entries.popitem(last=False)
+                del self.tags[oldest_key]
+
+    def get_or_create(
+        self,
+        key: typing.Hashable,
+        factory: typing.Callable[[], typing.Any],
+        tags: typing.Iterable[typing.Hashable] = (),
+    ):
+        """
+        Return the cached value or create and save it with the factory.
+
+        Arguments:
+            - key: hashable object that identifies the entry.
+            - factory: callable without arguments that creates the value.
+            - tags: hashable objects that allow us to invalidate the entry later,
+                usually the namespace and name of the modules used.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = factory()
+            self.put(key, value, tags)
+        return value
+
+    def invalidate(self, tag: typing.Hashable) -> None:
+        """
+        Remove the entries saved with the tag.
+
+        Arguments:
+            - tag: hashable object used when the entries were saved.
+        """
+        with self.lock:
+            for key in [key for key, tags in self.tags.items() if tag in tags]:
+                del self.entries[key]
+                del self.tags[key]
+
+    def clear(self) -> None:
+        """Remove all the entries."""
+        with self.lock:
+            self.entries.clear()
+            self.tags.clear()
+
+    def stats(self) -> dict:
+        """Size and usage counters of the cache."""
+        with self.lock:
+            return {
+                "size": len(self.entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+    @classmethod
+    def invalidate_all(cls, tag: typing.Hashable) -> None:
+        """
+        Remove the entries saved with the tag in every cache created.
+
+        Arguments:
+            - tag: hashable object used when the entries were saved.
+        """
+        for cache in list(cls.instances):
+            cache.invalidate(tag)
+
+
+def freeze(value) -> typing.Hashable:
+    """
+    Convert nested lists and dictionaries in tuples to use them as cache keys.
+
+    Arguments:
+        - value: object to convert.
+    """
+    if isinstance(value, dict):
+        return tuple(sorted((key, freeze(item)) for key, item in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def get_digest(value) -> str:
+    """
+    Identify a json serializable object, the order of the dictionary keys is ignored.
+
+    Arguments:
+        - value: object to identify, usually a request body.
+    """
+    content = json.dumps(value, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """Results kept in a memory LRU cache and optionally in a folder of the disk."""
+
+    def __init__(
+        self, max_size: int, folder: typing.Optional[str] = None, max_files: int = 0
+    ):
+        """
+        Create the cache.
+
+        Arguments:
+            - max_size: maximum number of results kept in memory.
+            - folder: location where the results are saved, None to keep them only
+                in memory.
+            - max_files: maximum number of results saved in the folder, the oldest
+                are removed first.
+        """
+        self.memory = LRUCache(max_size)
+        self.folder = folder
+        self.max_files = max_files
+
+    @property
+    def enabled(self) -> bool:
+        """Check if any tier can keep results."""
+        return self.memory.max_size > 0 or bool(self.folder)
+
+    def get_path(self, key: str) -> str:
+        """
+        Location of the file of a result.
+
+        Arguments:
+            - key: digest that identifies the result.
+        """
+        return os.path.join(self.folder, f"{key}.pickle")
+
+    def get(self, key: str) -> typing.Optional[dict]:
+        """
+        Return the result from memory, or from the disk moving it to memory.
+
+        Arguments:
+            - key: digest that identifies the result.
+        """
+        value = self.memory.get(key)
+        if value is not None or not self.folder:
+            return value
+        try:
+            with open(self.get_path(key), "rb") as result_file:
+                value = pickle.load(result_file)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        self.memory.put(key, value)
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        """
+        Save a result in every tier.
+
+        Arguments:
+            - key: digest that identifies the result.
+            - value: statistics of the executions.
+        """
+        self.memory.put(key, value)
+        if not self.folder:
+            return
+        os.makedirs(self.folder, exist_ok=True)
+        file_path = self.get_path(key)
+        temporal_path = f"{file_path}.{threading.get_ident()}.tmp"
+        with open(temporal_path, "wb") as result_file:
+            pickle.dump(value, result_file)
+        os.replace(temporal_path, file_path)
+        self._forget_old_files()
+
+    def _forget_old_files(self) -> None:
+        """Remove the oldest files when there are too many."""
+        files = [
+            os.path.join(self.folder, file_name)
+            for file_name in os.listdir(self.folder)
+            if file_name.endswith(".pickle")
+        ]
+        if len(files) <= self.max_files:
+            return
+        files.sort(key=os.path.getmtime)
+        for file_path in files[: len(files) - self.max_files]:
+            os.remove(file_path)
+
+
+class Memo:
+    """
+    Results of the objective and constraints of an optimizer by solution.
+
+    The functions of the problem are deterministic, so the solutions revisited by
+    the discrete problems don't call them again. Every optimizer owns its memo, so
+    it doesn't need a lock and it can be pickled to the worker processes.
+    """
+
+    def __init__(self, max_size: int):
+        """
+        Create an empty memo.
+
+        Arguments:
+            - max_size: maximum number of results kept, the least recently used
+                are evicted first.
+        """
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(
+        self, name: str, function: typing.Callable, solution: typing.Any
+    ) -> typing.Any:
+        """
+        Return the result saved for the solution or compute and save it.
+
+        Arguments:
+            - name: identifies the function in the memo.
+            - function: objective or constraint of the problem.
+            - solution: array received by the function, its bytes are the key.
+        """
+        array = np.asarray(solution)
+        key = (name, array.dtype.char, array.tobytes())
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        self.misses += 1
+        value = function(solution)
+        self.entries[key] = value
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+        return value
+
+    def memoize(
+        self, function: typing.Callable, constraints: typing.List[typing.Callable]
+    ) -> typing.Tuple[typing.Callable, typing.List[typing.Callable]]:
+        """
+        Wrap the objective and the constraints of a problem.
+
+        Arguments:
+            - function: objective of the problem.
+            - constraints: callables that check if a solution is valid.
+        """
+        return MemoizedFunction(self, "function", function), [
+            MemoizedFunction(self, f"constraint_{index}", constraint)
+            for index, constraint in enumerate(constraints)
+        ]
+
+    def stats(self) -> dict:
+        """Size and usage counters of the memo."""
+        return {"size": len(self.entries), "hits": self.hits, "misses": self.misses}
+
+
+class MemoizedFunction:
+    """Function of the problem that looks up its results in a memo."""
+
+    def __init__(self, memo: Memo, name: str, function: typing.Callable):
+        """
+        Wrap the function keeping its documentation, pyristic prints it.
+
+        Arguments:
+            - memo: memo shared by the functions of the problem.
+            - name: identifies the function in the memo.
+            - function: objective or constraint of the problem.
+        """
+        self.memo = memo
+        self.name = name
+        self.function = function
+        self.__doc__ = function.__doc__
+
+    def __call__(self, solution: typing.Any) -> typing.Any:
+        """Return the result of the function for the solution."""
+        return self.memo.get_or_compute(self.name, self.function, solution)
@@ -1,80 +1,656 @@
 """Methods for general porpouse."""
+import io
 import os
+import re
+import sys
+import queue
+import atexit
+import time
+import types
 import typing
+import hashlib
+import zipfile
 import logging
-from importlib import import_module, reload
+import logging.handlers
+import threading
+import contextlib
 import numpy as np
-from app.constants import LOCAL_FILE_STORAGE
+from app.constants import (
+    LOCAL_FILE_STORAGE,
+    VERSIONS_FOLDER,
+    MAX_MODULE_VERSIONS,
+    MAX_BUNDLE_BYTES,
+    NAMESPACES_FOLDER,
+    DEFAULT_NAMESPACE,
+    NAMESPACE_PATTERN,
+    NAMESPACE_IDLE_SECONDS,
+    EVICTION_INTERVAL_SECONDS,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOGS_FORMAT,
+    LOGS_DATE_FORMAT,
+    LOGS_JSON,
+    LOGS_DEBUG_SAMPLE_RATE,
+    LOGS_MAX_BYTES,
+    LOGS_BACKUP_COUNT,
+)
+from app.utils.cache import LRUCache
+from app.utils.metrics import Gauge, MODULE_UPLOADS, PHASE_DURATION
+from app.utils.logs import JSONFormatter, DebugSampler, parse_log_levels
+
+LOGGER = logging.getLogger(__name__)
+
+
+class BundleError(Exception):
+    """Modules of a bundle that can't be compiled, none of them is activated."""
+
+    def __init__(self, errors: typing.Dict[str, str]):
+        """
+        Keep the error of every module.
+
+        Arguments:
+            - errors: dictionary with the module name and its error.
+        """
+        super().__init__(f"The modules {', '.join(sorted(errors))} are invalid.")
+        self.errors = errors
 
 
 class ModulesHandler:
-    """Helper class to save the most recent python script in memory."""
+    """
+    Helper class to keep in memory the versions of the python scripts uploaded.
+
+    The modules are isolated by namespace and every version is identified by the hash
+    of its content. An instance resolves the active versions of its namespace, unless
+    it was pinned to specific versions with snapshot.
+    """
 
     modules = {}
+    active = {}
+    uploaded_at = {}
+    last_access = {}
+    leases = {}
+    evicted = set()
+    loading = {}
+    last_eviction = 0.0
+    lock = threading.RLock()
 
-    @classmethod
-    def upload_module(cls, module_name: str) -> None:
+    def __init__(
+        self,
+        namespace: str = DEFAULT_NAMESPACE,
+        versions: typing.Optional[typing.Dict[str, str]] = None,
+    ):
         """
-        Save the most recent information in the files uploaded.
+        Create a handler of the namespace pinned to the versions given.
+
+        The first handler of an evicted namespace compiles its modules again, the
+        other handlers of the namespace created meanwhile wait until they are loaded.
+
+        Arguments:
+            - namespace: string that isolates the modules of a user.
+            - versions: dictionary with the module name and the hash of the version
+                to use, the modules not included use the active version.
+        """
+        self.namespace = namespace
+        self.versions = versions or {}
+        with self.lock:
+            ModulesHandler.last_access[namespace] = time.time()
+            reload = namespace in self.evicted
+            loading = self.loading.get(namespace)
+            if reload:
+                self.evicted.discard(namespace)
+                # Reentrant, load_namespace creates handlers of the same namespace.
+                loading = self.loading[namespace] = threading.RLock()
+                loading.acquire()  # pylint: disable=consider-using-with
+        if reload:
+            try:
+                self.load_namespace(namespace)
+            finally:
+                with self.lock:
+                    del self.loading[namespace]
+                loading.release()
+        elif loading is not None:
+            with loading:
+                pass
+
+    def upload_module(self, module_name: str, content: str) -> str:
+        """
+        Compile the content and set it as the active version of the module.
+
+        When the content was uploaded before, the compiled version is reused. The
+        module is compiled without holding the lock, so a slow module doesn't stop
+        the other namespaces. The cached objects created with the previous version
+        are invalidated.
 
         Arguments:
             - module_name: is the key name which we will identify the file.
+            - content: python code of the module.
         """
-        if module_name in cls.modules:
-            cls.modules[module_name] = reload(cls.modules[module_name])
+        digest = get_content_hash(content)
+        with self.lock:
+            if self.active.get(self.namespace, {}).get(module_name) == digest:
+                return digest
+            compiled = self._get_stored(module_name, digest)
+        if compiled is None:
+            with PHASE_DURATION.time(phase="module_compile"):
+                compiled = compile_module(self.namespace, module_name, digest, content)
+        with self.lock:
+            self._store_version(module_name, digest, compiled)
+            self.uploaded_at[(self.namespace, module_name, digest)] = time.time()
+            self.active.setdefault(self.namespace, {})[module_name] = digest
+            self._forget_old_versions(module_name)
+        LRUCache.invalidate_all((self.namespace, module_name))
+        return digest
+
+    def upload_modules(self, contents: typing.Dict[str, str]) -> typing.Dict[str, str]:
+        """
+        Compile every module of a bundle and set them as the active versions together.
+
+        Every module is compiled before any of them is activated, so an optimization
+        never sees a half-updated problem. When a module can't be compiled nothing
+        is activated and BundleError is raised with the error of every module. The
+        cached objects are invalidated once for the whole bundle.
+
+        Arguments:
+            - contents: dictionary with the module name and its python code.
+        """
+        digests = {
+            module_name: get_content_hash(content)
+            for module_name, content in contents.items()
+        }
+        with self.lock:
+            compiled = {
+                module_name: self._get_stored(module_name, digest)
+                for module_name, digest in digests.items()
+            }
+        errors = {}
+        for module_name, content in contents.items():
+            if compiled[module_name] is not None:
+                continue
+            try:
+                with PHASE_DURATION.time(phase="module_compile"):
+                    compiled[module_name] = compile_module(
+                        self.namespace, module_name, digests[module_name], content
+                    )
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                errors[module_name] = f"{type(exc).__name__}: {exc}"
+        if errors:
+            with self.lock:
+                for module_name, module in compiled.items():
+                    if module is not None and not self._get_stored(
+                        module_name, digests[module_name]
+                    ):
+                        sys.modules.pop(module.__name__, None)
+            raise BundleError(errors)
+        with self.lock:
+            active = self.active.setdefault(self.namespace, {})
+            changed = [
+                module_name
+                for module_name, digest in digests.items()
+                if active.get(module_name) != digest
+            ]
+            for module_name in changed:
+                self._store_version(
+                    module_name, digests[module_name], compiled[module_name]
+                )
+                self.uploaded_at[
+                    (self.namespace, module_name, digests[module_name])
+                ] = time.time()
+                active[module_name] = digests[module_name]
+                self._forget_old_versions(module_name)
+        for module_name in changed:
+            LRUCache.invalidate_all((self.namespace, module_name))
+        return digests
+
+    def _get_stored(
+        self, module_name: str, digest: str
+    ) -> typing.Optional[types.ModuleType]:
+        """Return a version compiled before, the lock must be held."""
+        return self.modules.get(self.namespace, {}).get(module_name, {}).get(digest)
+
+    def _store_version(
+        self, module_name: str, digest: str, module: types.ModuleType
+    ) -> None:
+        """
+        Keep a version compiled without the lock, the lock must be held.
+
+        When another thread stored the same version meanwhile, its module is kept
+        and registered again in sys.modules.
+        """
+        stored = self.modules.setdefault(self.namespace, {}).setdefault(module_name, {})
+        if digest in stored:
+            sys.modules[stored[digest].__name__] = stored[digest]
         else:
-            cls.modules[module_name] = import_module(
-                f"{LOCAL_FILE_STORAGE}.{module_name}"
+            stored[digest] = module
+
+    def _forget_old_versions(self, module_name: str) -> None:
+        """Remove the oldest inactive versions when there are too many."""
+        stored = self.modules[self.namespace][module_name]
+        versions = sorted(
+            stored,
+            key=lambda digest: self.uploaded_at[(self.namespace, module_name, digest)],
+        )
+        active = self.active.get(self.namespace, {}).get(module_name)
+        if active in versions:
+            versions.remove(active)
+        for digest in versions[: max(len(versions) + 1 - MAX_MODULE_VERSIONS, 0)]:
+            module = stored.pop(digest)
+            del self.uploaded_at[(self.namespace, module_name, digest)]
+            sys.modules.pop(module.__name__, None)
+
+    def list_versions(self) -> dict:
+        """Return the versions kept in memory of every module in the namespace."""
+        with self.lock:
+            return {
+                module_name: {
+                    "active": self.active[self.namespace][module_name],
+                    "versions": [
+                        {
+                            "version": digest,
+                            "uploaded_at": self.uploaded_at[
+                                (self.namespace, module_name, digest)
+                            ],
+                        }
+                        for digest in versions
+                    ],
+                }
+                for module_name, versions in self.modules.get(
+                    self.namespace, {}
+                ).items()
+            }
+
+    def get_version(self, module_name: str) -> typing.Optional[str]:
+        """
+        Return the hash of the version used for a module.
+
+        Arguments:
+            - module_name: string that represents the name of the python file.
+        """
+        return self.versions.get(
+            module_name, self.active.get(self.namespace, {}).get(module_name)
+        )
+
+    def snapshot(self) -> "ModulesHandler":
+        """Return a handler pinned to the versions used right now."""
+        with self.lock:
+            return ModulesHandler(
+                self.namespace,
+                {**self.active.get(self.namespace, {}), **self.versions},
             )
 
-    @classmethod
-    def get_method_by_module(cls, module_name: str, method: str) -> typing.Callable:
+    def get_method_by_module(self, module_name: str, method: str) -> typing.Callable:
         """
-        Import a local file during the execution.
+        Get an object of the module version used by the handler.
 
         Arguments:
             - module_name: string that represents the name of the python file.
             - method: string that represent the function or variable to find in
                 the file.
         """
-        return getattr(cls.modules[module_name], method)
+        return getattr(
+            self.modules[self.namespace][module_name][self.get_version(module_name)],
+            method,
+        )
+
+    def load_versions(self) -> None:
+        """
+        Compile the pinned versions that this process doesn't have from their files.
+
+        The workers of the pool receive the handler of every task, so the versions
+        uploaded after the worker started are loaded once, the first time they are
+        used, without changing the active versions of the worker.
+        """
+        with self.lock:
+            missing = [
+                (module_name, digest)
+                for module_name, digest in self.versions.items()
+                if self._get_stored(module_name, digest) is None
+            ]
+        for module_name, digest in missing:
+            with open(
+                get_version_path(self.namespace, module_name, digest),
+                "r",
+                encoding="utf-8",
+            ) as python_file:
+                compiled = compile_module(
+                    self.namespace, module_name, digest, python_file.read()
+                )
+            with self.lock:
+                self._store_version(module_name, digest, compiled)
+                self.uploaded_at[(self.namespace, module_name, digest)] = time.time()
+                self._forget_old_versions(module_name)
+
+    def has_method(self, module_name: str, method: str) -> bool:
+        """
+        Check if the module version used by the handler defines an object.
+
+        Arguments:
+            - module_name: string that represents the name of the python file.
+            - method: string that represent the function or variable to find in
+                the file.
+        """
+        return hasattr(
+            self.modules[self.namespace][module_name][self.get_version(module_name)],
+            method,
+        )
+
+    @contextlib.contextmanager
+    def in_use(self):
+        """Avoid the eviction of the namespace while the context is open."""
+        with self.lock:
+            self.leases[self.namespace] = self.leases.get(self.namespace, 0) + 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.leases[self.namespace] -= 1
+                self.last_access[self.namespace] = time.time()
+
+    @classmethod
+    def load_storage(cls) -> None:
+        """
+        Load the modules saved in the storage of every namespace as active versions.
+
+        It is called at startup, so the modules uploaded before a restart or mounted
+        in the storage folder are compiled before the first request. The modules
+        that can't be compiled are logged and skipped.
+        """
+        namespaces_path = os.path.join(LOCAL_FILE_STORAGE, NAMESPACES_FOLDER)
+        namespaces = [DEFAULT_NAMESPACE]
+        if os.path.isdir(namespaces_path):
+            namespaces += [
+                namespace
+                for namespace in sorted(os.listdir(namespaces_path))
+                if re.fullmatch(NAMESPACE_PATTERN, namespace)
+            ]
+        for namespace in namespaces:
+            cls.load_namespace(namespace)
+
+    @classmethod
+    def load_namespace(cls, namespace: str) -> None:
+        """
+        Load the modules saved in the storage of a namespace as active versions.
+
+        The modules that can't be compiled are logged and skipped.
+
+        Arguments:
+            - namespace: string that isolates the modules of a user.
+        """
+        storage_path = get_storage_path(namespace)
+        if not os.path.isdir(storage_path):
+            return
+        for file_name in sorted(os.listdir(storage_path)):
+            module_name, extension = os.path.splitext(file_name)
+            if extension != ".py":
+                continue
+            try:
+                with open(
+                    os.path.join(storage_path, file_name), "r", encoding="utf-8"
+                ) as python_file:
+                    content = python_file.read()
+                digest = cls(namespace).upload_module(module_name, content)
+                write_file(get_version_path(namespace, module_name, digest), content)
+            except Exception:  # pylint: disable=broad-exception-caught
+                LOGGER.exception("Module %s of %s not loaded.", module_name, namespace)
+
+    @classmethod
+    def count_modules(cls) -> int:
+        """Count the module versions compiled in memory."""
+        with cls.lock:
+            return sum(
+                len(versions)
+                for namespace_modules in cls.modules.values()
+                for versions in namespace_modules.values()
+            )
+
+    @classmethod
+    def evict_idle_namespaces(
+        cls,
+        idle_seconds: float = NAMESPACE_IDLE_SECONDS,
+        interval: float = EVICTION_INTERVAL_SECONDS,
+    ):
+        """
+        Free the compiled modules of the namespaces that weren't used recently.
+
+        The files are kept in the storage, so the modules of an evicted namespace
+        are compiled again the next time it is used. The default namespace and the
+        namespaces with running optimizations are kept.
+
+        Arguments:
+            - idle_seconds: time without use before a namespace is evicted.
+            - interval: minimum time between two scans of the namespaces.
+        """
+        now = time.time()
+        limit = now - idle_seconds
+        with cls.lock:
+            if now - cls.last_eviction < interval:
+                return
+            cls.last_eviction = now
+            idle_namespaces = [
+                namespace
+                for namespace, last_access in list(cls.last_access.items())
+                if namespace != DEFAULT_NAMESPACE
+                and last_access < limit
+                and not cls.leases.get(namespace)
+            ]
+            for namespace in idle_namespaces:
+                for versions in cls.modules.pop(namespace, {}).values():
+                    for module in versions.values():
+                        sys.modules.pop(module.__name__, None)
+                cls.active.pop(namespace, None)
+                cls.leases.pop(namespace, None)
+                del cls.last_access[namespace]
+                for key in [key for key in cls.uploaded_at if key[0] == namespace]:
+                    del cls.uploaded_at[key]
+                cls.evicted.add(namespace)
+                LOGGER.info("Namespace %s evicted.", namespace)
+
 
+LOADED_MODULES = Gauge(
+    "pyristic_loaded_modules",
+    "Module versions compiled in memory.",
+    function=ModulesHandler.count_modules,
+)
 
-def create_file(suffix_name: str, content: typing.Union[str, typing.List[str]]):
+
+def get_storage_path(namespace: str = DEFAULT_NAMESPACE) -> str:
+    """
+    Location where the files of a namespace are saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+    """
+    if namespace == DEFAULT_NAMESPACE:
+        return LOCAL_FILE_STORAGE
+    return os.path.join(LOCAL_FILE_STORAGE, NAMESPACES_FOLDER, namespace)
+
+
+def get_content_hash(content: str) -> str:
+    """
+    Identify the content of a module.
+
+    Arguments:
+        - content: python code of the module.
+    """
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_version_path(namespace: str, module_name: str, digest: str) -> str:
+    """
+    Location where a version of the module is saved.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - module_name: string that represents the name of the python file.
+        - digest: hash of the content of the module.
+    """
+    return os.path.join(
+        get_storage_path(namespace), VERSIONS_FOLDER, module_name, f"{digest}.py"
+    )
+
+
+def compile_module(
+    namespace: str, module_name: str, digest: str, content: str
+) -> types.ModuleType:
+    """
+    Execute the content in a new module registered with a name unique per version.
+
+    The module is registered in sys.modules, so its functions can be sent to
+    the worker processes.
+
+    Arguments:
+        - namespace: string that isolates the modules of a user.
+        - module_name: string that represents the name of the python file.
+        - digest: hash of the content of the module.
+        - content: python code of the module.
     """
-    Create a file python file using the content.
+    module = types.ModuleType(
+        f"{LOCAL_FILE_STORAGE}_{namespace}_{module_name}_{digest[:16]}"
+    )
+    module.__file__ = get_version_path(namespace, module_name, digest)
+    code = compile(content, module.__file__, "exec")
+    sys.modules[module.__name__] = module
+    try:
+        exec(code, module.__dict__)  # pylint: disable=exec-used
+    except BaseException:
+        del sys.modules[module.__name__]
+        raise
+    return module
+
+
+def write_file(file_path: str, content: str) -> None:
+    """
+    Replace the file content in a single step, it isn't written when it is the same.
+
+    Arguments:
+        - file_path: location of the file.
+        - content: string to save.
+    """
+    if os.path.exists(file_path):
+        with open(file_path, "r", encoding="utf-8") as current_file:
+            if current_file.read() == content:
+                return
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    temporal_path = f"{file_path}.{threading.get_ident()}.tmp"
+    with open(temporal_path, "w", encoding="utf-8") as python_file:
+        python_file.write(content)
+    os.replace(temporal_path, file_path)
+
+
+def create_file(
+    suffix_name: str,
+    content: typing.Union[str, typing.List[str]],
+    namespace: str = DEFAULT_NAMESPACE,
+) -> str:
+    """
+    Create a file python file using the content and load it as the active version.
+
+    The versions are saved by the hash of their content, so uploading the same
+    content again doesn't compile the module again.
 
     Arguments:
         - suffix_name: this is the name to save the content.
         - content: This is an string or list of strings that will be saved.
+        - namespace: string that isolates the modules of a user.
     """
-    with open(
-        os.path.join(LOCAL_FILE_STORAGE, f"{suffix_name}.py"),
-        "w",
-        encoding="utf-8",
-    ) as python_file:
-        for item in content:
-            python_file.write(item)
-    ModulesHandler().upload_module(suffix_name)
+    content = "".join(content)
+    MODULE_UPLOADS.inc(module=suffix_name)
+    digest = ModulesHandler(namespace).upload_module(suffix_name, content)
+    write_file(get_version_path(namespace, suffix_name, digest), content)
+    write_file(os.path.join(get_storage_path(namespace), f"{suffix_name}.py"), content)
+    return digest
+
+
+def create_files(
+    contents: typing.Dict[str, typing.Union[str, typing.List[str]]],
+    namespace: str = DEFAULT_NAMESPACE,
+) -> typing.Dict[str, str]:
+    """
+    Create the python files of a bundle and load them as the active versions together.
+
+    The versions are saved before the active files are replaced, so a restart in
+    the middle loads the previous or the new content of every file.
+
+    Arguments:
+        - contents: dictionary with the file name and its string or list of strings.
+        - namespace: string that isolates the modules of a user.
+    """
+    contents = {
+        suffix_name: "".join(content) for suffix_name, content in contents.items()
+    }
+    digests = ModulesHandler(namespace).upload_modules(contents)
+    for suffix_name, content in contents.items():
+        MODULE_UPLOADS.inc(module=suffix_name)
+        write_file(
+            get_version_path(namespace, suffix_name, digests[suffix_name]), content
+        )
+    for suffix_name, content in contents.items():
+        write_file(
+            os.path.join(get_storage_path(namespace), f"{suffix_name}.py"), content
+        )
+    return digests
+
+
+def read_bundle_archive(
+    data: bytes, file_names: typing.Iterable[str]
+) -> typing.Dict[str, str]:
+    """
+    Return the content of every python file in a zip archive.
+
+    The files are identified by their name without the .py extension, the
+    folders inside the archive are ignored. BundleError is raised with the
+    files that aren't accepted or can't be decoded.
+
+    Arguments:
+        - data: bytes of the zip archive.
+        - file_names: names accepted for the files.
+    """
+    try:
+        archive = zipfile.ZipFile(io.BytesIO(data))
+    except zipfile.BadZipFile as exc:
+        raise BundleError({"bundle": f"{type(exc).__name__}: {exc}"}) from exc
+    with archive:
+        members = [member for member in archive.infolist() if not member.is_dir()]
+        if sum(member.file_size for member in members) > MAX_BUNDLE_BYTES:
+            raise BundleError(
+                {"bundle": f"The files exceed the limit of {MAX_BUNDLE_BYTES} bytes."}
+            )
+        contents = {}
+        errors = {}
+        for member in members:
+            suffix_name, extension = os.path.splitext(os.path.basename(member.filename))
+            if extension != ".py" or suffix_name not in file_names:
+                errors[member.filename] = "The file name isn't accepted."
+                continue
+            try:
+                contents[suffix_name] = archive.read(member).decode("utf-8")
+            except UnicodeDecodeError as exc:
+                errors[member.filename] = f"{type(exc).__name__}: {exc}"
+    if errors:
+        raise BundleError(errors)
+    return contents
 
 
 def transform_values_dict(data_obj: dict | list | np.ndarray) -> dict:
     """
     In nested dictionaries convert the numpy arrays in floating python list.
 
+    A new object is returned, the original object isn't modified.
+
     Arguments:
         - data_obj: this is an object that replace the numpy arrays for floating list.
     """
     if isinstance(data_obj, dict):
-        for key, value in data_obj.items():
-            data_obj.update({key: transform_values_dict(value)})
+        return {key: transform_values_dict(value) for key, value in data_obj.items()}
 
-    elif isinstance(data_obj, np.ndarray):
-        return list(data_obj.astype(float))
+    if isinstance(data_obj, np.ndarray):
+        return data_obj.astype(float).tolist()
 
-    elif isinstance(data_obj, list):
+    if isinstance(data_obj, list):
         return [transform_values_dict(item) for item in data_obj]
 
+    if isinstance(data_obj, np.generic):
+        return data_obj.item()
+
     return data_obj
 
 
@@ -82,21 +658,71 @@ def create_logger(file_name: str):
     """
     Create a logging object.
 
+    The root logger only puts the records in a queue, a background thread writes
+    them to the console and to the file, so the requests don't wait for the disk.
+    The file has a json record per line, unless LOGS_JSON is false, and it is
+    rotated when it reaches LOGS_MAX_BYTES keeping LOGS_BACKUP_COUNT old files
+    with the suffixes .1, .2 and so on. The DEBUG records of the same line are
+    sampled with LOGS_DEBUG_SAMPLE_RATE and the levels of every logger can be set
+    with LOG_LEVELS.
+
     Arguments:
-        - logger_name: string that helps us to recognize the logger.
         - file_name: string that indicates the file name where to save the logs.
     """
-    logger = logging.getLogger()
-    logger.setLevel(logging.DEBUG)
-    file_handler = logging.FileHandler(file_name)
-    file_handler.setLevel(logging.DEBUG)
-    stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(logging.DEBUG)
-    formatter = logging.Formatter(
-        "%(asctime)s - %(levelname)s: %(message)s", datefmt="%m/%d/%Y %I:%M:%S %p"
+    formatter = logging.Formatter(LOGS_FORMAT, datefmt=LOGS_DATE_FORMAT)
+    file_handler = logging.handlers.RotatingFileHandler(
+        file_name,
+        maxBytes=LOGS_MAX_BYTES,
+        backupCount=LOGS_BACKUP_COUNT,
+        encoding="utf-8",
     )
+    file_handler.setFormatter(JSONFormatter() if LOGS_JSON else formatter)
+    stream_handler = logging.StreamHandler()
     stream_handler.setFormatter(formatter)
-    file_handler.setFormatter(formatter)
-    logger.addHandler(stream_handler)
-    logger.addHandler(file_handler)
+    records = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        records, stream_handler, file_handler, respect_handler_level=True
+    )
+    queue_handler = logging.handlers.QueueHandler(records)
+    queue_handler.addFilter(DebugSampler(LOGS_DEBUG_SAMPLE_RATE))
+    logger = logging.getLogger()
+    logger.setLevel(LOG_LEVEL)
+    logger.addHandler(queue_handler)
+    for name, level in parse_log_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+    listener.start()
+    atexit.register(listener.stop)
+    return logger
+
+
+class ForwardHandler(logging.Handler):
+    """Handle the records of the workers with the loggers of the parent process."""
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Pass a record to the logger that created it in the worker.
+
+        Arguments:
+            - record: record received from a worker.
+        """
+        logging.getLogger(record.name).handle(record)
+
+
+def create_worker_logger(records) -> logging.Logger:
+    """
+    Make the root logger of a worker put the records in a queue read by the parent.
+
+    The handlers inherited from the parent are removed, their queue is only read by
+    a thread of the parent, so the records of the worker would be lost.
+
+    Arguments:
+        - records: multiprocessing queue that the parent reads with ForwardHandler.
+    """
+    logger = logging.getLogger()
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(LOG_LEVEL)
+    for name, level in parse_log_levels(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
     return logger
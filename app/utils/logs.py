@@ -0,0 +1,396 @@
+"""Write the logs as json records and read regions of the log files."""
+import os
+import re
+import json
+import typing
+import asyncio
+import logging
+import datetime
+from fastapi.concurrency import run_in_threadpool
+from app.constants import (
+    LOGS_FILE,
+    LOGS_DATE_FORMAT,
+    LOGS_CHUNK_SIZE,
+    LOGS_SCAN_BYTES,
+    LOGS_FOLLOW_INTERVAL,
+)
+
+RECORD_PATTERN = re.compile(
+    rb"(\d{2}/\d{2}/\d{4} \d{2}:\d{2}:\d{2} [AP]M) - ([A-Z]+): |\{\"time\": \""
+)
+
+
+class JSONFormatter(logging.Formatter):
+    """Write every record as a json line, the traceback is part of the message."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        """
+        Serialize the record, the time is the first key to find the records fast.
+
+        Arguments:
+            - record: record emitted by a logger.
+        """
+        message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message = f"{message}\n{record.exc_text}"
+        return json.dumps(
+            {
+                "time": datetime.datetime.fromtimestamp(record.created).isoformat(
+                    timespec="milliseconds"
+                ),
+                "level": record.levelname,
+                "logger": record.name,
+                "thread": record.threadName,
+                "message": message,
+            }
+        )
+
+
+class DebugSampler(logging.Filter):
+    """Keep one of every rate DEBUG records emitted by the same line of code."""
+
+    def __init__(self, rate: int):
+        """
+        Create the filter.
+
+        Arguments:
+            - rate: number of DEBUG records of a line for every record kept, 1 keeps
+                all of them.
+        """
+        super().__init__()
+        self.rate = rate
+        self.counts = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        """
+        Decide if the record is kept, the first record of every line is always kept.
+
+        Arguments:
+            - record: record emitted by a logger.
+        """
+        if record.levelno > logging.DEBUG or self.rate <= 1:
+            return True
+        key = (record.pathname, record.lineno)
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count % self.rate == 0
+
+
+def parse_log_levels(value: str) -> typing.Dict[str, str]:
+    """
+    Read the levels by logger with the format name=LEVEL,name=LEVEL.
+
+    Arguments:
+        - value: string with the levels, usually from PYRISTIC_LOG_LEVELS.
+    """
+    levels = {}
+    for item in value.split(","):
+        if item.strip():
+            name, level = item.split("=")
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def get_log_path(rotation: int = 0) -> str:
+    """
+    Location of the current log file or of one of its rotated files.
+
+    Arguments:
+        - rotation: 0 for the current file, n for the file with the suffix .n.
+    """
+    return LOGS_FILE if rotation == 0 else f"{LOGS_FILE}.{rotation}"
+
+
+def parse_header(
+    line: bytes,
+) -> typing.Optional[typing.Tuple[datetime.datetime, str, str]]:
+    """
+    Get the time, the level and the message of the first line of a record.
+
+    The lines can be json records or records written with LOGS_FORMAT.
+
+    Arguments:
+        - line: line of the log file, the continuation lines return None.
+    """
+    match = RECORD_PATTERN.match(line)
+    if match is None:
+        return None
+    try:
+        if match.group(1) is None:
+            record = json.loads(line)
+            return (
+                datetime.datetime.fromisoformat(record["time"]),
+                record["level"],
+                record["message"],
+            )
+        created = datetime.datetime.strptime(
+            match.group(1).decode("ascii"), LOGS_DATE_FORMAT
+        )
+    except (ValueError, KeyError):
+        return None
+    message = line[match.end() :].decode("utf-8", errors="replace")
+    return created, match.group(2).decode("ascii"), message
+
+
+def get_level_number(level: typing.Optional[str]) -> int:
+    """
+    Sort the levels of the records, the unknown levels are the lowest.
+
+    Arguments:
+        - level: name of the level.
+    """
+    number = logging.getLevelName(level or "NOTSET")
+    return number if isinstance(number, int) else logging.NOTSET
+
+
+def to_local_time(
+    value: typing.Optional[datetime.datetime],
+) -> typing.Optional[datetime.datetime]:
+    """
+    Compare the times given with the timezone written in the records.
+
+    Arguments:
+        - value: naive times are considered local times.
+    """
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def align_offset(log_file: typing.BinaryIO, offset: int) -> int:
+    """
+    Move a byte offset to the start of the next record.
+
+    Arguments:
+        - log_file: log file opened in binary mode.
+        - offset: position given by the user, it can be in the middle of a line.
+    """
+    if offset == 0:
+        return 0
+    log_file.seek(offset - 1)
+    if log_file.read(1) != b"\n":
+        log_file.readline()
+    while True:
+        position = log_file.tell()
+        line = log_file.readline()
+        if not line.endswith(b"\n") or parse_header(line) is not None:
+            return position
+
+
+def find_time_offset(
+    log_file: typing.BinaryIO, size: int, since: datetime.datetime
+) -> int:
+    """
+    Search the first record written after a time, the records are sorted by time.
+
+    Arguments:
+        - log_file: log file opened in binary mode.
+        - size: bytes of the file.
+        - since: time searched.
+    """
+    low, high = 0, size
+    while high - low > LOGS_CHUNK_SIZE:
+        middle = (low + high) // 2
+        log_file.seek(align_offset(log_file, middle))
+        header = parse_header(log_file.readline())
+        if header is not None and header[0] < since:
+            low = middle
+        else:
+            high = middle
+    return align_offset(log_file, low)
+
+
+def find_tail_offset(log_file: typing.BinaryIO, size: int, count: int) -> int:
+    """
+    Read the file backwards by chunks until the last records are found.
+
+    A last line without line break is still being written, so it isn't counted.
+
+    Arguments:
+        - log_file: log file opened in binary mode.
+        - size: bytes of the file.
+        - count: number of records searched from the end.
+    """
+    position = size
+    buffer = b""
+    cursor = 0
+    found = 0
+    while True:
+        newline = buffer.rfind(b"\n", 0, max(cursor - 1, 0))
+        if newline < 0 < position:
+            chunk = min(LOGS_CHUNK_SIZE, position)
+            position -= chunk
+            log_file.seek(position)
+            buffer = log_file.read(chunk) + buffer
+            cursor += chunk
+            continue
+        start = newline + 1
+        if RECORD_PATTERN.match(buffer, start) and buffer.find(b"\n", start) >= 0:
+            found += 1
+            if found == count:
+                return position + start
+        if start == 0 and position == 0:
+            return 0
+        cursor = start
+
+
+def iter_records(
+    log_file: typing.BinaryIO, offset: int
+) -> typing.Iterator[typing.Tuple[dict, int]]:
+    """
+    Read the records from an offset with the offset where every record ends.
+
+    The lines without header, like the tracebacks, belong to the previous record.
+    A last line without line break is still being written, so it isn't read.
+
+    Arguments:
+        - log_file: log file opened in binary mode.
+        - offset: position where a record starts.
+    """
+    log_file.seek(offset)
+    record, lines = None, []
+    position = offset
+    while True:
+        line = log_file.readline()
+        if not line.endswith(b"\n"):
+            break
+        message = line.decode("utf-8", errors="replace")
+        header = parse_header(line)
+        if header is not None or record is None:
+            if record is not None:
+                yield create_record(record, lines), position
+            created, level, message = header or (None, None, message)
+            record = {"offset": position, "time": created, "level": level}
+            lines = [message]
+        else:
+            lines.append(message)
+        position += len(line)
+    if record is not None:
+        yield create_record(record, lines), position
+
+
+def create_record(record: dict, lines: typing.List[str]) -> dict:
+    """
+    Join the lines of a record in its message.
+
+    Arguments:
+        - record: offset, time and level of the record.
+        - lines: lines of the record without the header.
+    """
+    return {
+        **record,
+        "message": "".join(lines).rstrip("\n"),
+    }
+
+
+def read_records(  # pylint: disable=too-many-arguments
+    file_path: str,
+    *,
+    offset: int = 0,
+    limit: int = 100,
+    tail: typing.Optional[int] = None,
+    level: typing.Optional[str] = None,
+    since: typing.Optional[datetime.datetime] = None,
+    until: typing.Optional[datetime.datetime] = None,
+) -> dict:
+    """
+    Read a page of records of a log file.
+
+    Only the region of the page is read. The start is found by seeking from the
+    end for the tail, or by a binary search over the file for the since time.
+    At most LOGS_SCAN_BYTES are scanned per page, then next_offset allows to read
+    the next page even if fewer records than the limit were found.
+
+    Arguments:
+        - file_path: location of the log file.
+        - offset: byte offset where the page starts.
+        - limit: maximum number of records returned.
+        - tail: read the last records instead of starting at the offset.
+        - level: minimum level of the records returned.
+        - since: ignore the records written before this time.
+        - until: ignore the records written after this time.
+    """
+    since, until = to_local_time(since), to_local_time(until)
+    minimum_level = get_level_number(level)
+    records = []
+    with open(file_path, "rb") as log_file:
+        size = os.fstat(log_file.fileno()).st_size
+        if tail is not None:
+            offset = find_tail_offset(log_file, size, tail)
+        elif offset == 0 and since is not None:
+            offset = find_time_offset(log_file, size, since)
+        else:
+            offset = align_offset(log_file, min(offset, size))
+        next_offset = offset
+        for record, end in iter_records(log_file, offset):
+            created = record["time"]
+            if until is not None and created is not None and created > until:
+                break
+            next_offset = end
+            if (
+                since is None or created is None or created >= since
+            ) and get_level_number(record["level"]) >= minimum_level:
+                records.append({**record, "time": created and created.isoformat()})
+            if len(records) == limit or end - offset >= LOGS_SCAN_BYTES:
+                break
+    return {"records": records, "next_offset": next_offset, "size": size}
+
+
+def read_new_records(
+    file_path: str,
+    offset: int,
+    identity: typing.Optional[tuple],
+    level: typing.Optional[str] = None,
+) -> typing.Optional[typing.Tuple[tuple, dict]]:
+    """
+    Read a page of the records written since the offset, None without the file.
+
+    When the file isn't the same one, or it is smaller than the offset, it was
+    rotated, so the new file is read from the start. The identity of the file read
+    is returned with the page.
+
+    Arguments:
+        - file_path: location of the log file.
+        - offset: byte offset where the page starts.
+        - identity: device and inode of the file read before, None the first time.
+        - level: minimum level of the records returned.
+    """
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    file_identity = (stat.st_dev, stat.st_ino)
+    if identity not in (None, file_identity) or stat.st_size < offset:
+        offset = 0
+    return file_identity, read_records(file_path, offset=offset, level=level)
+
+
+async def follow_records(
+    file_path: str, offset: int, level: typing.Optional[str] = None
+) -> typing.AsyncIterator[str]:
+    """
+    Send a json line for every record written since the offset, as tail -f.
+
+    The file is read in the thread pool so the event loop isn't blocked, and the
+    rotated files are detected with read_new_records.
+
+    Arguments:
+        - file_path: location of the log file.
+        - offset: byte offset where the stream starts.
+        - level: minimum level of the records sent.
+    """
+    identity = None
+    while True:
+        new_records = await run_in_threadpool(
+            read_new_records, file_path, offset, identity, level
+        )
+        if new_records is not None:
+            identity, page = new_records
+            if page["records"]:
+                yield "".join(json.dumps(record) + "\n" for record in page["records"])
+            if page["next_offset"] != offset:
+                offset = page["next_offset"]
+                continue
+        await asyncio.sleep(LOGS_FOLLOW_INTERVAL)
@@ -0,0 +1,363 @@
+"""Metrics of the service exposed with the Prometheus text format."""
+import time
+import bisect
+import typing
+import threading
+import contextlib
+from app.constants import METRICS_ENABLED
+
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    300.0,
+)
+
+
+class Registry:
+    """Keep the metrics and write them in the Prometheus text format."""
+
+    def __init__(self, enabled: bool = True):
+        """
+        Create an empty registry.
+
+        Arguments:
+            - enabled: when it is false, the metrics ignore every update.
+        """
+        self.enabled = enabled
+        self.metrics = []
+
+    def register(self, metric: "Metric") -> None:
+        """
+        Add a metric to the exposition.
+
+        Arguments:
+            - metric: counter, gauge or histogram.
+        """
+        self.metrics.append(metric)
+
+    def render(self) -> str:
+        """Write every metric in the Prometheus text format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry(METRICS_ENABLED)
+
+
+def format_labels(labels: typing.Dict[str, typing.Any]) -> str:
+    """
+    Write the labels of a sample.
+
+    Arguments:
+        - labels: dictionary with the label names and values.
+    """
+    if not labels:
+        return ""
+    values = ",".join(
+        f'{name}="{escape_label(value)}"' for name, value in labels.items()
+    )
+    return f"{{{values}}}"
+
+
+def escape_label(value: typing.Any) -> str:
+    """
+    Escape a label value as the text format requires.
+
+    Arguments:
+        - value: label value.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metric:
+    """Values of a metric for every combination of labels."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: typing.Sequence[str] = (),
+        registry: Registry = REGISTRY,
+    ):
+        """
+        Create the metric and add it to the registry.
+
+        Arguments:
+            - name: metric name.
+            - documentation: help text of the metric.
+            - labels: names of the labels that every update receives.
+            - registry: registry where the metric is exposed.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(labels)
+        self.registry = registry
+        self.values = {}
+        self.lock = threading.Lock()
+        registry.register(self)
+
+    def get_key(self, labels: typing.Dict[str, typing.Any]) -> tuple:
+        """Identify the values of a combination of labels."""
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def get_labels(self, key: tuple) -> dict:
+        """Return the labels of a combination identified with get_key."""
+        return dict(zip(self.label_names, key))
+
+    def collect(self) -> typing.List[str]:
+        """Write the samples of the metric in the text format."""
+        with self.lock:
+            values = list(self.values.items())
+        return [
+            f"{self.name}{format_labels(self.get_labels(key))} {value}"
+            for key, value in values
+        ]
+
+
+class Counter(Metric):
+    """Value that only increases."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increase the counter.
+
+        Arguments:
+            - amount: positive number added.
+            - labels: values of the labels of the metric.
+        """
+        if not self.registry.enabled:
+            return
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that goes up and down, or that is read when the metrics are collected."""
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: typing.Sequence[str] = (),
+        registry: Registry = REGISTRY,
+        function: typing.Optional[typing.Callable[[], float]] = None,
+    ):
+        """
+        Create the gauge.
+
+        Arguments:
+            - name: metric name.
+            - documentation: help text of the metric.
+            - labels: names of the labels that every update receives.
+            - registry: registry where the metric is exposed.
+            - function: callable that returns the value when the metrics are
+                collected, so the value costs nothing while nobody reads it.
+        """
+        super().__init__(name, documentation, labels, registry)
+        self.function = function
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        """
+        Increase the gauge.
+
+        Arguments:
+            - amount: number added.
+            - labels: values of the labels of the metric.
+        """
+        if not self.registry.enabled:
+            return
+        key = self.get_key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        """
+        Decrease the gauge.
+
+        Arguments:
+            - amount: number subtracted.
+            - labels: values of the labels of the metric.
+        """
+        self.inc(-amount, **labels)
+
+    def collect(self) -> typing.List[str]:
+        """Write the samples of the metric in the text format."""
+        if self.function is not None:
+            return [f"{self.name} {float(self.function())}"]
+        return super().collect()
+
+
+class Histogram(Metric):
+    """Distribution of the observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: typing.Sequence[str] = (),
+        registry: Registry = REGISTRY,
+        buckets: typing.Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        """
+        Create the histogram.
+
+        Arguments:
+            - name: metric name.
+            - documentation: help text of the metric.
+            - labels: names of the labels that every update receives.
+            - registry: registry where the metric is exposed.
+            - buckets: sorted upper bounds of the buckets.
+        """
+        super().__init__(name, documentation, labels, registry)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, **labels) -> None:
+        """
+        Count a value in its bucket.
+
+        Arguments:
+            - value: observed value, usually seconds.
+            - labels: values of the labels of the metric.
+        """
+        if not self.registry.enabled:
+            return
+        key = self.get_key(labels)
+        with self.lock:
+            counts = self.values.get(key)
+            if counts is None:
+                counts = self.values[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            counts[-1] += value
+
+    def time(self, **labels) -> typing.ContextManager:
+        """
+        Observe the seconds that the context takes.
+
+        Arguments:
+            - labels: values of the labels of the metric.
+        """
+        if not self.registry.enabled:
+            return contextlib.nullcontext()
+        return self._timer(labels)
+
+    @contextlib.contextmanager
+    def _timer(self, labels: dict):
+        """Measure the context with a monotonic clock."""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def collect(self) -> typing.List[str]:
+        """Write the samples of the metric in the text format."""
+        with self.lock:
+            values = [(key, list(counts)) for key, counts in self.values.items()]
+        lines = []
+        for key, counts in values:
+            labels = self.get_labels(key)
+            cumulative = 0
+            for upper_bound, count in zip(
+                [*map(str, self.buckets), "+Inf"], counts[:-1]
+            ):
+                cumulative += count
+                bucket_labels = format_labels({**labels, "le": upper_bound})
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{format_labels(labels)} {counts[-1]}")
+            lines.append(f"{self.name}_count{format_labels(labels)} {cumulative}")
+        return lines
+
+
+class MetricsMiddleware:
+    """ASGI middleware that observes the duration of every request by route."""
+
+    def __init__(self, app):
+        """
+        Wrap the application.
+
+        Arguments:
+            - app: ASGI application.
+        """
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        """Forward the request and observe its duration when it finishes."""
+        if scope["type"] != "http" or not REGISTRY.enabled:
+            await self.app(scope, receive, send)
+            return
+        start_time = time.perf_counter()
+        response = {"status": 500}
+
+        async def send_message(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_message)
+        finally:
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                time.perf_counter() - start_time,
+                method=scope["method"],
+                route=getattr(route, "path", "unmatched"),
+                status=response["status"],
+            )
+
+
+REQUEST_DURATION = Histogram(
+    "pyristic_request_duration_seconds",
+    "Duration of the requests by route.",
+    ["method", "route", "status"],
+)
+PHASE_DURATION = Histogram(
+    "pyristic_phase_duration_seconds",
+    "Duration of the phases of an optimization.",
+    ["phase"],
+)
+RUNS = Counter(
+    "pyristic_runs_total", "Optimizations started by algorithm.", ["algorithm"]
+)
+RUN_FAILURES = Counter(
+    "pyristic_run_failures_total", "Optimizations failed by algorithm.", ["algorithm"]
+)
+RUN_CANCELLATIONS = Counter(
+    "pyristic_run_cancellations_total",
+    "Optimizations cancelled by algorithm.",
+    ["algorithm"],
+)
+EXECUTIONS = Counter("pyristic_executions_total", "Executions finished.")
+MODULE_UPLOADS = Counter(
+    "pyristic_module_uploads_total", "Modules uploaded by name.", ["module"]
+)
+QUEUED_JOBS = Gauge("pyristic_queued_jobs", "Jobs waiting for a free slot.")
+REJECTED_JOBS = Counter(
+    "pyristic_rejected_jobs_total",
+    "Jobs rejected because the queue is full by priority.",
+    ["priority"],
+)
+OPTIMIZATIONS_IN_FLIGHT = Gauge(
+    "pyristic_optimizations_in_flight", "Optimizations running right now."
+)
@@ -0,0 +1,236 @@
+"""Responses that serialize the numpy results as json or binary formats."""
+import io
+import typing
+import orjson
+import numpy as np
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+from app.utils.metrics import PHASE_DURATION
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+except ImportError:
+    pyarrow = None
+
+
+def serialize_default(value: typing.Any) -> typing.Any:
+    """
+    Convert the objects that orjson doesn't serialize natively.
+
+    orjson writes the contiguous numpy arrays of the common dtypes in bulk, the
+    rest of arrays and the numpy scalars are converted here.
+
+    Arguments:
+        - value: object found in the content.
+    """
+    if isinstance(value, (np.ndarray, np.generic)):
+        return value.tolist()
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content: typing.Any) -> bytes:
+    """
+    Serialize the content as json writing the numpy arrays straight from their buffer.
+
+    Arguments:
+        - content: object to serialize.
+    """
+    return orjson.dumps(
+        content,
+        default=serialize_default,
+        option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+    )
+
+
+class NumpyJSONResponse(JSONResponse):
+    """Json response that writes the numpy arrays straight from their buffer."""
+
+    def render(self, content: typing.Any) -> bytes:
+        """Serialize the content with orjson."""
+        return dumps(content)
+
+
+def get_statistics_arrays(statistics: dict) -> typing.Dict[str, np.ndarray]:
+    """
+    Flatten the statistics returned by the executions in named numpy arrays.
+
+    Arguments:
+        - statistics: dictionary with the same keys that pyristic get_stats returns.
+    """
+    arrays = {
+        "best_x": statistics["Best solution"]["x"],
+        "best_f": statistics["Best solution"]["f"],
+        "worst_x": statistics["Worst solution"]["x"],
+        "worst_f": statistics["Worst solution"]["f"],
+        "mean": statistics["Mean"],
+        "standard_deviation": statistics["Standard deviation"],
+        "median": statistics["Median"],
+    }
+    for key in ["execution_time", "individual_x", "individual_f"]:
+        if key in statistics:
+            arrays[key] = statistics[key]
+    return {key: np.asarray(value, dtype=float) for key, value in arrays.items()}
+
+
+def encode_npz(arrays: typing.Dict[str, np.ndarray]) -> bytes:
+    """
+    Save the arrays in a compressed numpy file.
+
+    Arguments:
+        - arrays: dictionary with the name and the array to save.
+    """
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def encode_msgpack(arrays: typing.Dict[str, np.ndarray]) -> bytes:
+    """
+    Pack every array as its dtype, shape and raw buffer.
+
+    The client rebuilds the arrays with numpy.frombuffer without copying them.
+
+    Arguments:
+        - arrays: dictionary with the name and the array to save.
+    """
+    if msgpack is None:
+        raise HTTPException(status_code=406, detail="msgpack is not installed.")
+    return msgpack.packb(
+        {
+            key: {
+                "dtype": array.dtype.str,
+                "shape": list(array.shape),
+                "data": np.ascontiguousarray(array).data,
+            }
+            for key, array in arrays.items()
+        }
+    )
+
+
+def encode_arrow(arrays: typing.Dict[str, np.ndarray]) -> bytes:
+    """
+    Write the executions as a record batch of an Arrow IPC stream.
+
+    Every row is an execution, the individuals are a fixed size list column and
+    the summary statistics are saved in the schema metadata.
+
+    Arguments:
+        - arrays: dictionary with the name and the array to save.
+    """
+    if pyarrow is None:
+        raise HTTPException(status_code=406, detail="pyarrow is not installed.")
+    columns = {
+        key: pyarrow.array(arrays[key])
+        for key in ["execution_time", "individual_f"]
+        if key in arrays
+    }
+    if "individual_x" in arrays:
+        individuals = arrays["individual_x"]
+        columns["individual_x"] = pyarrow.FixedSizeListArray.from_arrays(
+            pyarrow.array(individuals.reshape(-1)), individuals.shape[-1]
+        )
+    summary = {
+        key: array.tolist() for key, array in arrays.items() if key not in columns
+    }
+    table = pyarrow.table(columns, metadata={"statistics": orjson.dumps(summary)})
+    sink = pyarrow.BufferOutputStream()
+    with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+BINARY_FORMATS = {
+    "application/x-npz": encode_npz,
+    "application/msgpack": encode_msgpack,
+    "application/x-msgpack": encode_msgpack,
+    "application/vnd.apache.arrow.stream": encode_arrow,
+}
+OPTIONAL_PACKAGES = {
+    "application/msgpack": "msgpack",
+    "application/x-msgpack": "msgpack",
+    "application/vnd.apache.arrow.stream": "pyarrow",
+}
+JSON_MEDIA_TYPES = ["application/json", "application/*", "*/*"]
+RESULT_RESPONSES = {
+    200: {
+        "content": {
+            media_type: {
+                "schema": {
+                    "type": "string",
+                    "format": "binary",
+                    "description": (
+                        f"Requires the {OPTIONAL_PACKAGES[media_type]} package."
+                        if media_type in OPTIONAL_PACKAGES
+                        else "Arrays saved with numpy.savez_compressed."
+                    ),
+                }
+            }
+            for media_type in BINARY_FORMATS
+        },
+        "description": (
+            "Statistics as json or one of the binary formats, msgpack needs the "
+            "msgpack package and arrow the pyarrow package."
+        ),
+    },
+    406: {
+        "description": (
+            "None of the accepted media types is supported or its package isn't "
+            "installed."
+        )
+    },
+}
+
+
+def parse_accept(accept: str) -> typing.List[str]:
+    """
+    Order the media types of the Accept header by their quality.
+
+    Arguments:
+        - accept: value of the Accept header.
+    """
+    media_ranges = []
+    for position, item in enumerate(accept.split(",")):
+        media_type, *parameters = [part.strip() for part in item.split(";")]
+        quality = 1.0
+        for parameter in parameters:
+            name, _, value = parameter.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if media_type and quality > 0:
+            media_ranges.append((-quality, position, media_type.lower()))
+    return [media_type for *_, media_type in sorted(media_ranges)]
+
+
+def create_result_response(statistics: dict, accept: str = "*/*") -> Response:
+    """
+    Answer with the statistics in the first media type accepted that is supported.
+
+    Arguments:
+        - statistics: dictionary with the same keys that pyristic get_stats returns.
+        - accept: value of the Accept header.
+    """
+    for media_type in parse_accept(accept or "*/*"):
+        if media_type in JSON_MEDIA_TYPES:
+            with PHASE_DURATION.time(phase="serialization"):
+                return NumpyJSONResponse(content=statistics)
+        if media_type in BINARY_FORMATS:
+            with PHASE_DURATION.time(phase="serialization"):
+                return Response(
+                    content=BINARY_FORMATS[media_type](
+                        get_statistics_arrays(statistics)
+                    ),
+                    media_type=media_type,
+                )
+    raise HTTPException(
+        status_code=406,
+        detail=f"Supported media types: {', '.join(['application/json', *BINARY_FORMATS])}.",
+    )
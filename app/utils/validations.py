@@ -1,8 +1,33 @@
 """Validations applied to the heuristic routes."""
-import os
 import typing
-from fastapi import HTTPException
-from app.constants import LOCAL_FILE_STORAGE
+from fastapi import HTTPException, Header, Depends
+from app.constants import (
+    DEFAULT_NAMESPACE,
+    NAMESPACE_HEADER,
+    NAMESPACE_PATTERN,
+    MAX_BATCH_COMBINATIONS,
+)
+from app.models import EvolutionaryBatch, OptimizerArguments
+from app.services.evolutionary import count_combinations, expand_combinations
+from app.utils.generic import ModulesHandler
+
+
+def get_namespace(
+    namespace: str = Header(
+        DEFAULT_NAMESPACE, alias=NAMESPACE_HEADER, regex=NAMESPACE_PATTERN
+    )
+) -> str:
+    """
+    Read the namespace that isolates the problem of the user from the headers.
+
+    The idle namespaces are evicted before answering, at most once a minute by
+    default.
+
+    Arguments:
+        - namespace: header with the namespace identifier.
+    """
+    ModulesHandler.evict_idle_namespaces()
+    return namespace
 
 
 class ValidateFiles:
@@ -17,21 +42,71 @@ class ValidateFiles:
         """
         self.files = file_list
 
-    def __call__(self):
-        """Validate the files are in the expected location."""
-        validate_required_files(self.files)
+    def __call__(self, namespace: str = Depends(get_namespace)):
+        """Validate the modules of the files were uploaded to the namespace."""
+        validate_required_files(self.files, namespace)
 
 
-def validate_required_files(files: typing.List[str]) -> bool:
+def validate_required_files(
+    files: typing.List[str], namespace: str = DEFAULT_NAMESPACE
+) -> bool:
     """
-    Check if the required files exist.
+    Check if the required files were uploaded.
+
+    The lookup is done in the modules loaded in memory, which are loaded from the
+    storage at startup and updated by create_file.
 
     Arguments:
         - files: list of strings to check.
+        - namespace: string that isolates the modules of a user.
     """
+    modules = ModulesHandler(namespace)
     for file in files:
-        file_path = os.path.join(LOCAL_FILE_STORAGE, f"{file}.py")
-        if not os.path.exists(file_path):
+        if modules.get_version(file) is None:
             raise HTTPException(
                 status_code=404, detail=f"The file called {file}.py not found."
             )
+
+
+def validate_batch_combinations(batch: EvolutionaryBatch) -> typing.List[dict]:
+    """
+    Expand the combinations of the batch checking they aren't too many.
+
+    The combinations are counted before expanding them, so a large grid is
+    rejected without creating it.
+
+    Arguments:
+        - batch: base arguments and operators with the combinations and grid to sweep.
+    """
+    total = count_combinations(batch)
+    if total > MAX_BATCH_COMBINATIONS:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"The batch has {total} combinations, "
+                f"the maximum is {MAX_BATCH_COMBINATIONS}."
+            ),
+        )
+    return expand_combinations(batch)
+
+
+def validate_memo(
+    arguments_optimizer: OptimizerArguments, namespace: str = DEFAULT_NAMESPACE
+) -> None:
+    """
+    Check the memo requested can be used by the function module.
+
+    The populations evaluated with batch_aptitude_function aren't memoized, so a
+    positive memo is rejected instead of being ignored.
+
+    Arguments:
+        - arguments_optimizer: the arguments of the request body.
+        - namespace: string that isolates the modules of a user.
+    """
+    if arguments_optimizer.memo and ModulesHandler(namespace).has_method(
+        "function", "batch_aptitude_function"
+    ):
+        raise HTTPException(
+            status_code=422,
+            detail="The memo isn't available with batch_aptitude_function.",
+        )
@@ -0,0 +1 @@
+"""Benchmarks and load tests of the service."""
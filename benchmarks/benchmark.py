@@ -0,0 +1,561 @@
+"""
+Benchmarks of the optimization service.
+
+Run them from the root of the repository, the report is a json file that can be
+compared with the report of another release:
+
+    python -m benchmarks.benchmark run --output report.json
+    python -m benchmarks.benchmark compare baseline.json report.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import typing
+import argparse
+import platform
+import resource
+import datetime
+import functools
+import tempfile
+import subprocess
+import urllib.error
+import urllib.request
+from pathlib import Path
+from importlib import metadata
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from fastapi.responses import JSONResponse
+from app.constants import EXECUTION_WORKERS
+from app.models import EvolutionaryOperatorConfig
+from app.services import evolutionary as ea_utils
+from app.services import simulated_annealing as sa_utils
+from app.services.execution import execute_once, compute_statistics
+from app.utils.generic import ModulesHandler, create_file, transform_values_dict
+from app.utils import responses
+from benchmarks import problems
+
+ROOT_FOLDER = Path(__file__).resolve().parents[1]
+NAMESPACE = "benchmark"
+ALGORITHMS = ["GA", "EE", "EP"]
+# Metrics checked by compare, the value is True when the lower is better.
+CHECKED_METRICS = {
+    "median": True,
+    "p95": True,
+    "bytes": True,
+    "peak_rss_kb": True,
+    "server_peak_rss_kb": True,
+    "throughput": False,
+}
+
+
+def measure(function: typing.Callable[[], typing.Any], repeat: int) -> dict:
+    """
+    Time several calls of a function.
+
+    Arguments:
+        - function: callable without arguments.
+        - repeat: number of calls.
+    """
+    times = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start_time)
+    return summarize(times)
+
+
+def summarize(times: typing.List[float]) -> dict:
+    """
+    Statistics of a list of times in seconds.
+
+    Arguments:
+        - times: list of measures.
+    """
+    return {
+        "runs": len(times),
+        "mean": float(np.mean(times)),
+        "median": float(np.median(times)),
+        "p95": float(np.percentile(times, 95)),
+        "min": float(np.min(times)),
+        "max": float(np.max(times)),
+    }
+
+
+def upload_problem(modules: typing.Dict[str, str]) -> ModulesHandler:
+    """
+    Upload the modules of a problem in the namespace of the benchmarks.
+
+    Arguments:
+        - modules: dictionary with the module name and its content.
+    """
+    for module_name, content in modules.items():
+        create_file(module_name, content, NAMESPACE)
+    return ModulesHandler(NAMESPACE).snapshot()
+
+
+def get_operators(algorithm: str) -> dict:
+    """
+    Operators of the evolutionary example as the routes receive them.
+
+    Arguments:
+        - algorithm: GA, EE or EP.
+    """
+    methods = problems.get_evolutionary_request(algorithm, 1)["config_operators"]
+    return {
+        operator_type: EvolutionaryOperatorConfig(**operator)
+        for operator_type, operator in methods["methods"].items()
+    }
+
+
+def bench_config_build(repeat: int) -> dict:
+    """
+    Time the creation of the configurations with and without the cache.
+
+    Arguments:
+        - repeat: number of measures of every algorithm.
+    """
+    results = {}
+    for algorithm in ALGORITHMS:
+        operators = get_operators(algorithm)
+        ea_utils.create_evolutionary_config(algorithm, operators)
+        results[algorithm] = {
+            "build": measure(
+                functools.partial(
+                    ea_utils.build_evolutionary_config, algorithm, operators
+                ),
+                repeat,
+            ),
+            "cached": measure(
+                functools.partial(
+                    ea_utils.create_evolutionary_config, algorithm, operators
+                ),
+                repeat,
+            ),
+        }
+    return results
+
+
+def bench_executions(optimizer, optimizer_args: list, arguments: dict, repeat: int):
+    """
+    Time every execution of an optimizer in this process.
+
+    Arguments:
+        - optimizer: pyristic search algorithm.
+        - optimizer_args: positional arguments for the optimize method.
+        - arguments: key arguments for the optimize method.
+        - repeat: number of executions.
+    """
+    times = []
+    for seed in range(repeat):
+        times.append(
+            execute_once(optimizer, optimizer_args, arguments, seed)["execution_time"]
+        )
+    return summarize(times)
+
+
+def bench_evolutionary(
+    modules: typing.Dict[str, str], algorithm: str, generations: int, repeat: int
+) -> dict:
+    """
+    Time the executions of an evolutionary algorithm over a problem.
+
+    Arguments:
+        - modules: dictionary with the module name and its content.
+        - algorithm: GA, EE or EP.
+        - generations: number of generations of every execution.
+        - repeat: number of executions.
+    """
+    handler = upload_problem(modules)
+    request = problems.get_evolutionary_request(algorithm, generations)
+    optimizer = ea_utils.create_evolutionary_algorithm(
+        algorithm,
+        ea_utils.create_evolutionary_config(
+            algorithm, get_operators(algorithm), handler
+        ),
+        handler,
+    )
+    return bench_executions(
+        optimizer, [], request["arguments_optimizer"]["arguments"], repeat
+    )
+
+
+def bench_optimize(repeat: int, generations: int, dimensions: typing.List[int]):
+    """
+    Time an execution of every problem and algorithm.
+
+    Arguments:
+        - repeat: number of executions of every problem.
+        - generations: number of generations of the evolutionary algorithms.
+        - dimensions: number of decision variables of the synthetic functions.
+    """
+    results = {}
+    for algorithm in ALGORITHMS:
+        results[f"beale_{algorithm}"] = bench_evolutionary(
+            problems.get_evolutionary_example(), algorithm, generations, repeat
+        )
+    for name in problems.SYNTHETIC_FUNCTIONS:
+        for dimension in dimensions:
+            results[f"{name}_{dimension}_GA"] = bench_evolutionary(
+                problems.get_synthetic_problem(name, dimension),
+                "GA",
+                generations,
+                repeat,
+            )
+    handler = upload_problem(problems.get_tsp_problem())
+    results["tsp_SA"] = bench_executions(
+        sa_utils.create_simulatedannealing_algorithm(handler),
+        [
+            handler.get_method_by_module(
+                "generator_initial_solution", "generate_initial_solution"
+            )
+        ],
+        problems.TSP_ARGUMENTS,
+        repeat,
+    )
+    return results
+
+
+def create_statistics(num_executions: int, dimension: int) -> dict:
+    """
+    Statistics with random executions like the ones returned by the routes.
+
+    Arguments:
+        - num_executions: number of executions.
+        - dimension: number of decision variables.
+    """
+    generator = np.random.default_rng(0)
+    return compute_statistics(
+        [
+            {
+                "execution_time": float(generator.random()),
+                "individual_x": generator.random(dimension),
+                "individual_f": float(generator.random()),
+            }
+            for _ in range(num_executions)
+        ]
+    )
+
+
+def bench_serialization(
+    repeat: int, executions: typing.List[int], dimensions: typing.List[int]
+) -> dict:
+    """
+    Time the encoding of the results in every format and keep their size.
+
+    Arguments:
+        - repeat: number of measures of every format.
+        - executions: number of executions of the results.
+        - dimensions: number of decision variables of the results.
+    """
+    encoders = {
+        "json_lists": lambda stats: JSONResponse(transform_values_dict(stats)).body,
+        "orjson_numpy": responses.dumps,
+    }
+    for media_type, encoder in responses.BINARY_FORMATS.items():
+        if media_type == "application/msgpack" and responses.msgpack is None:
+            continue
+        if media_type.endswith("arrow.stream") and responses.pyarrow is None:
+            continue
+        encoders[
+            media_type.rsplit("/", 1)[-1]
+        ] = lambda stats, encoder=encoder: encoder(
+            responses.get_statistics_arrays(stats)
+        )
+    results = {}
+    for num_executions in executions:
+        for dimension in dimensions:
+            stats = create_statistics(num_executions, dimension)
+            results[f"{num_executions}x{dimension}"] = {
+                name: {
+                    **measure(functools.partial(encoder, stats), repeat),
+                    "bytes": len(encoder(stats)),
+                }
+                for name, encoder in encoders.items()
+            }
+    return results
+
+
+def post(url: str, content: typing.Any = None) -> bytes:
+    """
+    Send a json post request to the service.
+
+    Arguments:
+        - url: address of the route.
+        - content: object sent as json.
+    """
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(content).encode("utf-8"),
+        headers={"Content-Type": "application/json", "X-Pyristic-Namespace": NAMESPACE},
+        method="POST",
+    )
+    with urllib.request.urlopen(request, timeout=600) as response:
+        return response.read()
+
+
+def start_server(workdir: str) -> typing.Tuple[subprocess.Popen, str]:
+    """
+    Start the service with uvicorn in a free port and wait until it answers.
+
+    Arguments:
+        - workdir: folder where the service saves its files.
+    """
+    with socket.socket() as free_socket:
+        free_socket.bind(("127.0.0.1", 0))
+        port = free_socket.getsockname()[1]
+    environment = {
+        **os.environ,
+        "PYTHONPATH": os.pathsep.join([str(ROOT_FOLDER), str(ROOT_FOLDER / "app")]),
+    }
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app.main:app",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=workdir,
+        env=environment,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            post(f"{url}/pyristic/connected")
+            return server, url
+        except (urllib.error.URLError, ConnectionError):
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("The service didn't start.")
+
+
+def get_peak_memory(pid: int) -> typing.Optional[int]:
+    """
+    Peak resident memory in kilobytes of a process, it is only available in Linux.
+
+    Arguments:
+        - pid: identifier of the process.
+    """
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def bench_requests(  # pylint: disable=too-many-locals
+    url: str,
+    concurrency: typing.List[int],
+    num_requests: int,
+    num_executions: int,
+    generations: int,
+) -> dict:
+    """
+    Measure the latency of the optimize route with several clients at the same time.
+
+    Arguments:
+        - url: address of the service.
+        - concurrency: numbers of clients sending requests at the same time.
+        - num_requests: number of requests sent with every concurrency.
+        - num_executions: executions performed by every request.
+        - generations: number of generations of every execution.
+    """
+    for module_name, content in problems.get_evolutionary_example().items():
+        post(f"{url}/create-file/{module_name}", {"content": content})
+    request = problems.get_evolutionary_request("GA", generations)
+
+    def send(seed: int) -> float:
+        start_time = time.perf_counter()
+        post(
+            f"{url}/optimize/evolutionary/GA?num_executions={num_executions}"
+            f"&seed={seed}",
+            request,
+        )
+        return time.perf_counter() - start_time
+
+    results = {}
+    for clients in concurrency:
+        latencies, errors = [], 0
+        start_time = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=clients) as executor:
+            futures = [executor.submit(send, seed) for seed in range(num_requests)]
+            for future in futures:
+                try:
+                    latencies.append(future.result())
+                except (urllib.error.URLError, ConnectionError):
+                    errors += 1
+        elapsed_time = time.perf_counter() - start_time
+        results[f"clients_{clients}"] = {
+            "latency": summarize(latencies) if latencies else None,
+            "throughput": len(latencies) / elapsed_time,
+            "errors": errors,
+        }
+    return results
+
+
+def get_metadata() -> dict:
+    """Information of the environment where the benchmarks ran."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=ROOT_FOLDER,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    versions = {}
+    for package in ["numpy", "pyristic", "fastapi", "orjson"]:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "execution_workers": EXECUTION_WORKERS,
+        "versions": versions,
+    }
+
+
+def run(arguments: argparse.Namespace) -> dict:
+    """
+    Perform every benchmark and return the report.
+
+    Arguments:
+        - arguments: options of the command line.
+    """
+    dimensions = [2, 10] if arguments.quick else [2, 10, 50, 100]
+    generations = 20 if arguments.quick else 100
+    report = {"metadata": get_metadata(), "results": {}}
+    workdir = tempfile.mkdtemp(prefix="pyristic-benchmark-")
+    os.chdir(workdir)
+    report["results"]["config_build"] = bench_config_build(arguments.repeat * 20)
+    report["results"]["optimize"] = bench_optimize(
+        arguments.repeat, generations, dimensions
+    )
+    report["results"]["serialization"] = bench_serialization(
+        arguments.repeat * 4, [10, 100], [2, 100] if arguments.quick else [2, 100, 1000]
+    )
+    report["results"]["memory"] = {
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    }
+    if arguments.skip_requests:
+        return report
+    server, url = (None, arguments.url) if arguments.url else start_server(workdir)
+    try:
+        report["results"]["requests"] = bench_requests(
+            url,
+            arguments.concurrency,
+            arguments.requests,
+            arguments.executions,
+            generations,
+        )
+        if server is not None:
+            report["results"]["memory"]["server_peak_rss_kb"] = get_peak_memory(
+                server.pid
+            )
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+    return report
+
+
+def flatten(report: dict, prefix: str = "") -> typing.Dict[str, float]:
+    """
+    Convert the nested results in a dictionary of metric names and numbers.
+
+    Arguments:
+        - report: nested dictionary of results.
+        - prefix: name of the parent keys.
+    """
+    metrics = {}
+    for key, value in report.items():
+        name = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, dict):
+            metrics.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            metrics[name] = value
+    return metrics
+
+
+def compare(baseline: dict, report: dict, threshold: float) -> bool:
+    """
+    Print the change of every metric and return if there are regressions.
+
+    Only the medians, the 95 percentiles, the sizes, the memory and the throughput
+    are checked against the threshold.
+
+    Arguments:
+        - baseline: report used as reference.
+        - report: report of the new version.
+        - threshold: relative change considered a regression.
+    """
+    baseline_metrics = flatten(baseline["results"])
+    metrics = flatten(report["results"])
+    regression = False
+    for name in sorted(set(baseline_metrics) & set(metrics)):
+        before, after = baseline_metrics[name], metrics[name]
+        change = (after - before) / before if before else 0.0
+        leaf = name.rsplit(".", 1)[-1]
+        lower_is_better = CHECKED_METRICS.get(leaf)
+        worse = lower_is_better is not None and (
+            change > threshold if lower_is_better else change < -threshold
+        )
+        regression = regression or worse
+        print(
+            f"{'REGRESSION ' if worse else ''}{name}: "
+            f"{before:.6g} -> {after:.6g} ({change:+.1%})"
+        )
+    return regression
+
+
+def main() -> None:
+    """Read the command line and perform the selected command."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run", help="perform the benchmarks")
+    run_parser.add_argument("--output", default="benchmark-report.json")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--quick", action="store_true")
+    run_parser.add_argument("--url", help="address of a running service")
+    run_parser.add_argument("--skip-requests", action="store_true")
+    run_parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    run_parser.add_argument("--requests", type=int, default=8)
+    run_parser.add_argument("--executions", type=int, default=4)
+    compare_parser = commands.add_parser("compare", help="compare two reports")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("report")
+    compare_parser.add_argument("--threshold", type=float, default=0.1)
+    arguments = parser.parse_args()
+    if arguments.command == "run":
+        output = Path(arguments.output).resolve()
+        report = run(arguments)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Report saved in {output}")
+        return
+    with open(arguments.baseline, "r", encoding="utf-8") as baseline_file:
+        baseline = json.load(baseline_file)
+    with open(arguments.report, "r", encoding="utf-8") as report_file:
+        report = json.load(report_file)
+    sys.exit(1 if compare(baseline, report, arguments.threshold) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Optimization problems used by the benchmarks, written as the uploaded modules."""
+import json
+import typing
+from pathlib import Path
+
+EXAMPLES_FOLDER = Path(__file__).resolve().parents[1] / "input_example"
+
+# Distance matrix of the salesman example in input_example/SA_example.
+TSP_DISTANCES = [
+    [0, 49, 30, 53, 72, 19, 76, 87, 45, 48],
+    [49, 0, 19, 38, 32, 31, 75, 69, 61, 25],
+    [30, 19, 0, 41, 98, 56, 6, 6, 45, 53],
+    [53, 38, 41, 0, 52, 29, 46, 90, 23, 98],
+    [72, 32, 98, 52, 0, 63, 90, 69, 50, 82],
+    [19, 31, 56, 29, 63, 0, 60, 88, 41, 95],
+    [76, 75, 6, 46, 90, 60, 0, 61, 92, 10],
+    [87, 69, 6, 90, 69, 88, 61, 0, 82, 73],
+    [45, 61, 45, 23, 50, 41, 92, 82, 0, 5],
+    [48, 25, 53, 98, 82, 95, 10, 73, 5, 0],
+]
+
+SYNTHETIC_FUNCTIONS = {
+    "sphere": "def function(X) -> float:\n\treturn float(np.sum(X ** 2))\n",
+    "rastrigin": (
+        "def function(X) -> float:\n"
+        "\treturn float(10 * len(X) + np.sum(X ** 2 - 10 * np.cos(2 * np.pi * X)))\n"
+    ),
+}
+
+
+def read_example(folder: str, file_name: str) -> dict:
+    """
+    Read a json file of the examples.
+
+    Arguments:
+        - folder: name of the example folder.
+        - file_name: name of the json file.
+    """
+    with open(EXAMPLES_FOLDER / folder / file_name, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def get_evolutionary_example() -> typing.Dict[str, str]:
+    """Modules of the evolutionary example, the Beale function in two dimensions."""
+    return {
+        module_name: "".join(read_example("evolutionary_example", file_name)["content"])
+        for module_name, file_name in [
+            ("function", "function.json"),
+            ("constraints", "constraint.json"),
+            ("search_space", "search_space.json"),
+        ]
+    }
+
+
+def get_evolutionary_request(algorithm: str, generations: int) -> dict:
+    """
+    Arguments and operators of the evolutionary example.
+
+    Arguments:
+        - algorithm: GA, EE or EP.
+        - generations: number of generations performed by every execution.
+    """
+    request = read_example("evolutionary_example", f"{algorithm}_arguments.json")
+    request["arguments_optimizer"]["arguments"]["generations"] = generations
+    request["arguments_optimizer"]["arguments"]["verbose"] = 0
+    return request
+
+
+def get_synthetic_problem(name: str, dimension: int) -> typing.Dict[str, str]:
+    """
+    Modules of a continuous function minimized in [-5.12, 5.12] for every variable.
+
+    Arguments:
+        - name: sphere or rastrigin.
+        - dimension: number of decision variables.
+    """
+    return {
+        "function": (
+            "import numpy as np\n"
+            f"{SYNTHETIC_FUNCTIONS[name]}"
+            "aptitude_function = function\n"
+        ),
+        "constraints": (
+            "import numpy as np\n"
+            "def inside_bounds(X) -> bool:\n"
+            "\treturn bool(np.all(np.abs(X) <= 5.12))\n"
+            "ARRAY_CONSTRAINTS = [inside_bounds]\n"
+        ),
+        "search_space": f"BOUNDS = [-5.12, 5.12]\nDECISION_VARIABLES = {dimension}\n",
+    }
+
+
+def get_tsp_problem() -> typing.Dict[str, str]:
+    """
+    Modules of the salesman example solved with simulated annealing.
+
+    The files of input_example/SA_example can't be compiled, so the problem is
+    written again with the same distances and the names the service expects.
+    """
+    return {
+        "function": (
+            f"DISTANCES = {TSP_DISTANCES}\n"
+            "def function(x) -> float:\n"
+            "\ttotal = DISTANCES[x[-1]][x[0]]\n"
+            "\tfor i in range(1, len(x)):\n"
+            "\t\ttotal += DISTANCES[x[i]][x[i - 1]]\n"
+            "\treturn float(total)\n"
+        ),
+        "constraints": (
+            "import numpy as np\n"
+            "def all_cities(x) -> bool:\n"
+            "\treturn len(np.unique(x)) == len(x)\n"
+            "ARRAY_CONSTRAINTS = [all_cities]\n"
+        ),
+        "SA_neighbor_generator": (
+            "import numpy as np\n"
+            "def neighbor_generator(x):\n"
+            "\tneighbor = x.copy()\n"
+            "\tfirst, second = np.random.choice(np.arange(1, len(x)), 2, replace=False)\n"
+            "\tneighbor[first], neighbor[second] = x[second], x[first]\n"
+            "\treturn neighbor\n"
+        ),
+        "generator_initial_solution": (
+            "import numpy as np\n"
+            "def generate_initial_solution():\n"
+            f"\tcities = np.random.permutation(np.arange(1, {len(TSP_DISTANCES)}))\n"
+            "\treturn np.concatenate(([0], cities))\n"
+        ),
+    }
+
+
+TSP_ARGUMENTS = {"initial_temperature": 1000, "eps": 0.01}